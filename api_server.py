@@ -1,17 +1,21 @@
 import os
 import json
-import time
 import uuid
+import sqlite3
 import threading
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from typing import Optional
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 import uvicorn
 
 # Import your custom functions
 from github_process import validate_github_url, clone_github_repo, setup_github_repo_files_dir
-from src.main import main as run_main_pipeline
+from src import config
+from src.processors.sqlite_processor import query_vulnerabilities
+from src.processors.search_index import search
+from src.utils.metrics import stage, render_prometheus
 
 app = FastAPI(title="GitHub Repository Analyzer API")
 
@@ -26,6 +30,8 @@ app.add_middleware(
 
 # In-memory store for job results
 job_results = {}
+# Output directory of every job, for the endpoints that query its analysis database
+job_files_dirs = {}
 
 class GitHubRepoRequest(BaseModel):
     url: str
@@ -40,40 +46,43 @@ def process_job(job_id: str, url: str):
     The thread will update the global `job_results` when finished.
     """
     try:
-        os.environ["GITHUB_REPO_URL"] = url
         if not validate_github_url(url):
             job_results[job_id] = {"status": "error", "detail": "Invalid GitHub repository URL."}
             return
 
-        repo_dir = clone_github_repo(url)
+        with stage("clone"):
+            repo_dir = clone_github_repo(url)
         if not repo_dir:
             job_results[job_id] = {"status": "error", "detail": "Failed to clone the repository."}
             return
 
         files_dir = setup_github_repo_files_dir(repo_dir)
-        os.environ['GITHUB_PROJECT_DIR'] = repo_dir
-        os.environ['FILES_DIR'] = files_dir
+        job_files_dirs[job_id] = files_dir
+        # Passed to this job's pipeline only: os.environ is shared by every job of the server
+        job_environ = {
+            "GITHUB_REPO_URL": url,
+            "GITHUB_PROJECT_DIR": repo_dir,
+            "FILES_DIR": files_dir,
+        }
 
         def heavy_task():
             try:
-                # Run the long analysis (this may take 40+ seconds)
-                run_main_pipeline(is_github_repo=True)
-                
-                # Define the expected output paths
-                main_files_dir = "/home/prajwalak/Desktop/CodeAnaa"
-                main_files_dir = os.path.join(main_files_dir, "files")
-                json_file_path = os.path.join(main_files_dir, "aider_repomap.json")
-                csv_file_path = os.path.join(main_files_dir, "output.csv")
-                
-                # Wait until the files appear (with a timeout)
-                timeout = 60  # seconds
-                start_time = time.time()
-                while ((not os.path.exists(json_file_path) or not os.path.exists(csv_file_path))
-                       and (time.time() - start_time < timeout)):
-                    time.sleep(2)
+                # The pipeline and its dependencies are loaded with the first job, not at startup
+                from src.main import main as run_main_pipeline
+
+                # Run the long analysis (this may take 40+ seconds); it writes to the job's files_dir
+                try:
+                    run_main_pipeline(is_github_repo=True, environ=job_environ)
+                except SystemExit:
+                    # The pipeline exits on fatal errors; the reason is in the server log
+                    job_results[job_id] = {"status": "error", "detail": "The analysis pipeline failed."}
+                    return
                 
+                # The pipeline has finished, so its output files are complete
+                json_file_path = os.path.join(files_dir, "aider_repomap.json")
+                csv_file_path = os.path.join(files_dir, "output.csv")
                 if not os.path.exists(json_file_path) or not os.path.exists(csv_file_path):
-                    job_results[job_id] = {"status": "error", "detail": "Analysis results not found after timeout."}
+                    job_results[job_id] = {"status": "error", "detail": "Analysis results not found."}
                     return
 
                 with open(json_file_path, "r") as f:
@@ -117,5 +126,53 @@ async def get_result(job_id: str):
         return JSONResponse(content={"status": "processing"}, status_code=200)
     return job_results[job_id]
 
+def analysis_db_file(job_id: Optional[str]) -> str:
+    """
+    Path of the analysis database of a job, or of the server's FILES_DIR without a job.
+    Raises a 404 if the job is unknown or its database does not exist.
+    """
+    if job_id is None:
+        db_file = config.ANALYSIS_DB_FILE
+    elif job_id in job_files_dirs:
+        db_file = os.path.join(job_files_dirs[job_id], "analysis.db")
+    else:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if not os.path.exists(db_file):
+        raise HTTPException(status_code=404, detail="Analysis database not found.")
+    return db_file
+
+@app.get("/vulnerabilities")
+async def get_vulnerabilities(job_id: Optional[str] = None, risk_level: Optional[str] = None,
+                              path: Optional[str] = None,
+                              limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """
+    Returns vulnerabilities from the analysis database of a job, filtered by risk level and directory.
+    """
+    results = query_vulnerabilities(analysis_db_file(job_id), risk_level, path, limit, offset)
+    return {"results": results, "limit": limit, "offset": offset}
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus endpoint with stage durations, item counts, LLM request metrics and peak RSS.
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/search")
+async def search_analysis(q: str, job_id: Optional[str] = None, kind: Optional[str] = None,
+                          limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0)):
+    """
+    Full-text search over method code, sink labels and summaries, and fix messages of a job's
+    analysis, best match first.
+    """
+    db_file = analysis_db_file(job_id)
+    try:
+        hits = search(db_file, q, kind, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except sqlite3.OperationalError:
+        raise HTTPException(status_code=404, detail="Search index not found in the analysis database.")
+    return {"query": q, "total": hits["total"], "results": hits["results"], "limit": limit, "offset": offset}
+
 if __name__ == "__main__":
     uvicorn.run("api_server:app", host="0.0.0.0", port=8000, reload=True)
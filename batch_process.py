@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Script to analyze many GitHub repositories in one batch.
+This script reads a manifest of repository URLs, clones each repository and
+runs the analysis pipeline on it, without asking any questions.
+
+The manifest has one repository per line: its URL, optionally followed by a
+branch, tag or commit. Empty lines and lines starting with "#" are ignored:
+
+    https://github.com/username/repo
+    https://github.com/username/other-repo v1.2.0
+
+Every repository gets a directory in the output directory with the clone
+("repo") and the pipeline's output files and log ("files"). The pipelines run
+in separate processes, up to --jobs at once. They share global limits: at
+most --clone-concurrency clones at once, --scanner-concurrency scanners and
+--llm-concurrency OpenAI API calls in flight across all pipelines (see
+src/utils/resource_limits.py).
+
+The progress of the batch is kept in batch_state.json. After an interruption,
+run the same command with --resume: finished repositories are skipped,
+existing clones are reused and unfinished pipelines continue from their
+checkpoints. The summary of all repositories is written to
+batch_summary.json and batch_summary.csv.
+"""
+
+import os
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+import shutil
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from github_process import validate_github_url
+from src.utils.checkpoints import write_json_atomic
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Directory to store the batch runs
+BATCH_RUNS_DIR = os.path.join(ROOT_DIR, 'batch_runs')
+
+SUMMARY_FIELDS = ["repository", "ref", "commit", "status", "attempts", "duration_seconds",
+                  "sinks", "model_labelled", "vulnerabilities", "llm_requests", "llm_tokens", "files_dir"]
+
+def parse_manifest(manifest_file):
+    """
+    Read the repositories of a batch from its manifest.
+
+    Args:
+        manifest_file (str): Path to the manifest
+
+    Returns:
+        list: (url, ref) tuples, ref being None for the default branch, or None if
+            the manifest is invalid
+    """
+    entries = []
+    seen = set()
+    valid = True
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split()
+            if len(parts) > 2:
+                print(f"Error: Line {line_number} of {manifest_file} has more than a URL and a ref: {line}")
+                valid = False
+                continue
+            url = parts[0]
+            ref = parts[1] if len(parts) == 2 else None
+            if not validate_github_url(url):
+                valid = False
+                continue
+            # Two spellings of the same repository (e.g. with and without ".git") share a directory
+            if repo_key(url, ref) in seen:
+                print(f"Skipping duplicate repository on line {line_number}: {line}")
+                continue
+            seen.add(repo_key(url, ref))
+            entries.append((url, ref))
+    return entries if valid else None
+
+def repo_key(url, ref=None):
+    """
+    Name of the directory of a repository in the batch.
+
+    Args:
+        url (str): Repository URL
+        ref (str, optional): Branch, tag or commit. Defaults to None.
+
+    Returns:
+        str: "owner__repo", followed by "@ref" when a ref is given
+    """
+    path = url.rstrip('/').split('://', 1)[-1].split('/', 1)[-1]
+    if path.endswith('.git'):
+        path = path[:-4]
+    key = '__'.join(path.split('/')[:2])
+    if ref:
+        key += '@' + ref
+    return re.sub(r'[^\w.@-]', '_', key)
+
+class BatchState:
+    """
+    Progress of every repository of a batch, saved to batch_state.json on every change.
+
+    Args:
+        state_file (str): Path to batch_state.json
+        resume (bool): Whether to keep the progress of the previous batch
+    """
+
+    def __init__(self, state_file, resume):
+        self.state_file = state_file
+        self.repos = {}
+        self._lock = threading.Lock()
+        if resume and os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    self.repos = json.load(f).get("repos", {})
+            except (OSError, ValueError) as e:
+                print(f"Error reading {state_file}, starting the batch over: {e}")
+
+    def get(self, key):
+        with self._lock:
+            return dict(self.repos.get(key, {}))
+
+    def update(self, key, **fields):
+        """
+        Update the entry of a repository and save the state.
+
+        Args:
+            key (str): Repository key
+            **fields: Fields to set
+        """
+        with self._lock:
+            self.repos.setdefault(key, {}).update(fields)
+            write_json_atomic(self.state_file, {"repos": self.repos})
+
+def clone_repo(url, ref, repo_dir):
+    """
+    Fetch a single commit of a repository, without its history.
+
+    Args:
+        url (str): Repository URL
+        ref (str): Branch, tag or commit, or None for the default branch
+        repo_dir (str): Directory to clone into; replaced if it exists
+
+    Returns:
+        str: The commit checked out, or None if an error occurred
+    """
+    if os.path.exists(repo_dir):
+        shutil.rmtree(repo_dir)
+    os.makedirs(repo_dir)
+    # Never wait for credentials: a private or missing repository fails at once
+    env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+    commands = [
+        ['git', 'init', '-q'],
+        ['git', 'remote', 'add', 'origin', url],
+        ['git', 'fetch', '-q', '--depth', '1', 'origin', ref or 'HEAD'],
+        ['git', 'checkout', '-q', '--detach', 'FETCH_HEAD'],
+    ]
+    try:
+        for command in commands:
+            subprocess.run(command, cwd=repo_dir, env=env, check=True, capture_output=True, text=True)
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo_dir,
+                                check=True, capture_output=True, text=True)
+        return result.stdout.strip()
+    except subprocess.CalledProcessError as e:
+        print(f"Error cloning {url}{' at ' + ref if ref else ''}: {(e.stderr or '').strip() or e}")
+        return None
+
+def run_pipeline(repo_dir, files_dir, limits_env, resume):
+    """
+    Run the analysis pipeline on a repository in a child process.
+
+    The pipeline changes the working directory and reads its settings from the
+    environment, so every repository needs its own process.
+
+    Args:
+        repo_dir (str): Path to the repository
+        files_dir (str): Directory for the output files
+        limits_env (dict): Resource limit settings shared by the batch
+        resume (bool): Whether to continue from the checkpoints of a previous run
+
+    Returns:
+        int: Exit code of the pipeline
+    """
+    os.makedirs(files_dir, exist_ok=True)
+    env = dict(os.environ, PROJECT_DIR=repo_dir, FILES_DIR=files_dir, **limits_env)
+    env.pop('GITHUB_PROJECT_DIR', None)
+    command = [sys.executable, os.path.join(ROOT_DIR, 'main.py')]
+    if resume:
+        command.append('--resume')
+    with open(os.path.join(files_dir, 'pipeline.log'), 'a', encoding='utf-8') as log:
+        return subprocess.run(command, cwd=ROOT_DIR, env=env, stdin=subprocess.DEVNULL,
+                              stdout=log, stderr=subprocess.STDOUT).returncode
+
+def count_csv_rows(csv_file, column=None, value=None):
+    """
+    Count the rows of a CSV file, or the rows with a given value in a column.
+
+    Returns:
+        int: Number of rows, or None if the file does not exist
+    """
+    if not os.path.exists(csv_file):
+        return None
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        return sum(1 for row in csv.DictReader(f) if column is None or row.get(column) == value)
+
+def read_llm_usage(metrics_file):
+    """
+    Read the LLM requests and tokens of a pipeline run from its metrics.json.
+
+    Returns:
+        tuple: (requests, tokens), zeros if the metrics cannot be read
+    """
+    try:
+        with open(metrics_file, 'r', encoding='utf-8') as f:
+            llm = json.load(f).get("llm", {})
+    except (OSError, ValueError):
+        return 0, 0
+    tokens = llm.get("tokens", {})
+    return llm.get("requests", 0), tokens.get("prompt", 0) + tokens.get("completion", 0)
+
+def process_repo(url, ref, output_dir, state, clone_slots, limits_env, resume):
+    """
+    Clone a repository and run the pipeline on it, recording the progress in the state.
+
+    Args:
+        url (str): Repository URL
+        ref (str): Branch, tag or commit, or None
+        output_dir (str): Output directory of the batch
+        state (BatchState): Progress of the batch
+        clone_slots (threading.Semaphore): Limits the clones running at once
+        limits_env (dict): Resource limit settings shared by the batch
+        resume (bool): Whether to reuse the progress of a previous batch
+
+    Returns:
+        str: Final status of the repository
+    """
+    key = repo_key(url, ref)
+    repo_dir = os.path.join(output_dir, key, 'repo')
+    files_dir = os.path.join(output_dir, key, 'files')
+    entry = state.get(key)
+    if resume and entry.get("status") == "done":
+        print(f"[{key}] Skipping: completed in the previous batch.")
+        return "done"
+
+    start = time.perf_counter()
+    attempts = entry.get("attempts", 0) + 1
+    state.update(key, url=url, ref=ref, files_dir=files_dir, attempts=attempts, status="cloning")
+
+    commit = entry.get("commit") if resume else None
+    if commit and os.path.isdir(os.path.join(repo_dir, '.git')):
+        print(f"[{key}] Reusing the clone at {commit[:12]}.")
+    else:
+        if not resume and os.path.exists(files_dir):
+            shutil.rmtree(files_dir)
+        with clone_slots:
+            print(f"[{key}] Cloning {url}{' at ' + ref if ref else ''}...")
+            commit = clone_repo(url, ref, repo_dir)
+        if not commit:
+            state.update(key, status="failed", error="clone failed",
+                         seconds=round(time.perf_counter() - start, 3))
+            return "failed"
+        state.update(key, commit=commit)
+
+    # Continue from the pipeline's checkpoints if a previous attempt got that far
+    continue_run = resume and entry.get("status") in ("running", "failed") and entry.get("commit") == commit
+    state.update(key, status="running")
+    print(f"[{key}] Running the analysis pipeline{' (resuming)' if continue_run else ''}...")
+    exit_code = run_pipeline(repo_dir, files_dir, limits_env, continue_run)
+
+    # A resumed pipeline only reports what it did itself; add what the interrupted attempt did
+    previous = entry if continue_run else {}
+    requests, tokens = read_llm_usage(os.path.join(files_dir, 'metrics.json'))
+    status = "done" if exit_code == 0 else "failed"
+    state.update(key, status=status, error=None if exit_code == 0 else f"pipeline exited with {exit_code}",
+                 seconds=round(previous.get("seconds", 0) + time.perf_counter() - start, 3),
+                 llm_requests=previous.get("llm_requests", 0) + requests,
+                 llm_tokens=previous.get("llm_tokens", 0) + tokens)
+    print(f"[{key}] {'Completed' if status == 'done' else 'Failed, see ' + os.path.join(files_dir, 'pipeline.log')}.")
+    return status
+
+def summarize(entries, output_dir, state):
+    """
+    Write the summary of the batch to batch_summary.json and batch_summary.csv and print it.
+
+    Args:
+        entries (list): (url, ref) tuples of the manifest
+        output_dir (str): Output directory of the batch
+        state (BatchState): Progress of the batch
+
+    Returns:
+        list: Summary row of every repository
+    """
+    rows = []
+    for url, ref in entries:
+        entry = state.get(repo_key(url, ref))
+        files_dir = entry.get("files_dir") or os.path.join(output_dir, repo_key(url, ref), 'files')
+        privado_csv = os.path.join(files_dir, 'privado_output.csv')
+        rows.append({
+            "repository": url,
+            "ref": ref or "",
+            "commit": entry.get("commit") or "",
+            "status": entry.get("status", "pending"),
+            "attempts": entry.get("attempts", 0),
+            "duration_seconds": entry.get("seconds", 0),
+            "sinks": count_csv_rows(privado_csv),
+            "model_labelled": count_csv_rows(privado_csv, "Label Source", "model"),
+            "vulnerabilities": count_csv_rows(os.path.join(files_dir, 'bearer_output.csv')),
+            "llm_requests": entry.get("llm_requests", 0),
+            "llm_tokens": entry.get("llm_tokens", 0),
+            "files_dir": files_dir,
+        })
+
+    totals = {
+        "repositories": len(rows),
+        "done": sum(1 for row in rows if row["status"] == "done"),
+        "failed": sum(1 for row in rows if row["status"] == "failed"),
+    }
+    for field in ("sinks", "model_labelled", "vulnerabilities", "llm_requests", "llm_tokens"):
+        totals[field] = sum(row[field] or 0 for row in rows)
+
+    write_json_atomic(os.path.join(output_dir, 'batch_summary.json'), {"totals": totals, "repositories": rows})
+    with open(os.path.join(output_dir, 'batch_summary.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print("\nBatch summary:")
+    print(f"{'Repository':<50} {'Status':<8} {'Seconds':>8} {'Sinks':>7} {'Vulns':>7} {'LLM req':>8} {'Tokens':>9}")
+    for row in rows:
+        name = row["repository"] + (f" @ {row['ref']}" if row["ref"] else "")
+        print(f"{name[-50:]:<50} {row['status']:<8} {row['duration_seconds']:>8.1f} "
+              f"{row['sinks'] if row['sinks'] is not None else '-':>7} "
+              f"{row['vulnerabilities'] if row['vulnerabilities'] is not None else '-':>7} "
+              f"{row['llm_requests']:>8} {row['llm_tokens']:>9}")
+    print(f"{totals['done']} of {totals['repositories']} repositories completed, {totals['failed']} failed; "
+          f"{totals['sinks']} sinks ({totals['model_labelled']} labelled by the model), "
+          f"{totals['vulnerabilities']} vulnerabilities, {totals['llm_requests']} LLM requests, "
+          f"{totals['llm_tokens']} tokens.")
+    print(f"Summary written to {os.path.join(output_dir, 'batch_summary.json')}")
+    return rows
+
+def run_batch(entries, output_dir, jobs, clone_concurrency, scanner_concurrency, llm_concurrency, resume=False):
+    """
+    Analyze every repository of a batch.
+
+    Args:
+        entries (list): (url, ref) tuples
+        output_dir (str): Output directory of the batch
+        jobs (int): Repositories processed at once
+        clone_concurrency (int): Clones running at once
+        scanner_concurrency (int): Scanners running at once across all pipelines
+        llm_concurrency (int): OpenAI API calls in flight at once across all pipelines
+        resume (bool, optional): Continue the previous batch in the output directory. Defaults to False.
+
+    Returns:
+        list: Summary row of every repository
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    state = BatchState(os.path.join(output_dir, 'batch_state.json'), resume)
+    clone_slots = threading.Semaphore(clone_concurrency)
+    limits_env = {
+        'RESOURCE_LIMITS_DIR': os.path.join(output_dir, 'locks'),
+        'SCANNER_CONCURRENCY': str(scanner_concurrency),
+        'LLM_CONCURRENCY': str(llm_concurrency),
+    }
+
+    print(f"Analyzing {len(entries)} repositories, {jobs} at once "
+          f"(clones: {clone_concurrency}, scanners: {scanner_concurrency}, LLM requests: {llm_concurrency})...")
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        futures = {executor.submit(process_repo, url, ref, output_dir, state, clone_slots, limits_env, resume):
+                   (url, ref) for url, ref in entries}
+        for future in as_completed(futures):
+            url, ref = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"[{repo_key(url, ref)}] Unexpected error: {e}")
+                state.update(repo_key(url, ref), status="failed", error=str(e))
+    finally:
+        # Do not start the repositories still waiting when the batch is interrupted
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return summarize(entries, output_dir, state)
+
+def main():
+    """
+    Main function to analyze the repositories of a manifest.
+    """
+    parser = argparse.ArgumentParser(description="Analyze the GitHub repositories of a manifest.")
+    parser.add_argument("manifest", help="File with one repository URL per line, optionally followed by a ref")
+    parser.add_argument("--output-dir", default=BATCH_RUNS_DIR,
+                        help="Directory for the clones, the output files and the summary")
+    parser.add_argument("--jobs", type=int, default=4, help="Repositories processed at once")
+    parser.add_argument("--clone-concurrency", type=int, default=4, help="Clones running at once")
+    parser.add_argument("--scanner-concurrency", type=int, default=os.cpu_count() or 1,
+                        help="Scanners running at once across all repositories")
+    parser.add_argument("--llm-concurrency", type=int, default=8,
+                        help="OpenAI API calls in flight at once across all repositories")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip the repositories completed by the previous batch and continue the others")
+    args = parser.parse_args()
+
+    try:
+        entries = parse_manifest(args.manifest)
+        if entries is None:
+            print("Please fix the manifest and try again.")
+            sys.exit(1)
+        if not entries:
+            print(f"No repositories in {args.manifest}.")
+            sys.exit(1)
+
+        rows = run_batch(entries, os.path.abspath(args.output_dir), max(1, args.jobs),
+                         max(1, args.clone_concurrency), args.scanner_concurrency, args.llm_concurrency,
+                         args.resume)
+        if any(row["status"] != "done" for row in rows):
+            sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nBatch interrupted. Run the same command with --resume to continue it.")
+        sys.exit(1)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
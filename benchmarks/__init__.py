@@ -0,0 +1,13 @@
+"""
+Benchmarks for the processing pipeline.
+
+Each module can be run on its own, e.g. ``python -m benchmarks.bench_bearer``.
+Inputs are generated synthetically by ``benchmarks.synthetic`` so no scanner
+or API key is needed.
+"""
+
+import os
+import tempfile
+
+# Keep benchmark runs from writing into the project's files/ directory
+os.environ.setdefault("FILES_DIR", tempfile.mkdtemp(prefix="codeana-bench-"))
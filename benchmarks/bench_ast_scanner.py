@@ -0,0 +1,95 @@
+"""
+Benchmark the local structure extractor on a synthetic source tree.
+
+A project of Python and TypeScript files is written to a temporary directory
+and its structure is extracted with an increasing number of worker processes.
+
+Usage:
+    python -m benchmarks.bench_ast_scanner [--files 50000] [--workers 1 2 4 8]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from src.scanners.ast_scanner import extract_structures
+
+PYTHON_TEMPLATE = '''import os
+from typing import Optional
+
+
+class Model{index}(Base):
+    """Model {index}."""
+    table = "model_{index}"
+
+    def load(self, key: str) -> Optional[dict]:
+        path = os.path.join(self.root, key)
+        if not os.path.exists(path):
+            return None
+        return self.reader.read(path)
+
+    def save(self, key: str, value: dict) -> None:
+        self.writer.write(os.path.join(self.root, key), value)
+
+
+def helper_{index}(value):
+    return value * {index}
+'''
+
+SCRIPT_TEMPLATE = '''import {{ Api }} from "../api";
+
+export class Service{index} {{
+  private cache = new Map<string, string>();
+
+  constructor(private api: Api) {{
+    this.api = api;
+  }}
+
+  async fetch(id: string): Promise<string> {{
+    if (this.cache.has(id)) {{
+      return this.cache.get(id);
+    }}
+    return this.api.get("/items/" + id);
+  }}
+}}
+'''
+
+
+def write_project(root, files, files_per_dir=100):
+    """
+    Write a project with one TypeScript file for every four Python files.
+    """
+    for index in range(files):
+        directory = os.path.join(root, f"pkg_{index // files_per_dir // 50}", f"mod_{index // files_per_dir}")
+        os.makedirs(directory, exist_ok=True)
+        if index % 5 == 4:
+            name, content = f"service_{index}.ts", SCRIPT_TEMPLATE.format(index=index)
+        else:
+            name, content = f"model_{index}.py", PYTHON_TEMPLATE.format(index=index)
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        write_project(root, args.files)
+        print(f"Wrote {args.files} files in {time.perf_counter() - start:.1f}s")
+        print(f"{'workers':>8} {'seconds':>8} {'files/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            start = time.perf_counter()
+            count = sum(1 for _ in extract_structures(root, workers))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>8.2f} {count / elapsed:>10.0f} {baseline / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
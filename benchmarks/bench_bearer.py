@@ -0,0 +1,59 @@
+"""
+Benchmark Bearer report parsing on synthetic reports.
+
+Usage:
+    python -m benchmarks.bench_bearer [--findings 1000 10000 50000]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic import write_bearer_json_report, write_bearer_text_report
+from src.processors.bearer_processor import parse_bearer_report, parse_bearer_json_report
+
+
+def measure(parser, path):
+    """
+    Consume all records from a parser, timing it and tracking peak memory.
+
+    Args:
+        parser (callable): Report parser
+        path (str): Report file path
+
+    Returns:
+        tuple: (record count, seconds, peak bytes)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = sum(1 for _ in parser(path))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--findings", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--snippet-lines", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'format':<6} {'findings':>9} {'size MB':>8} {'seconds':>8} {'rec/s':>10} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for findings in args.findings:
+            reports = [
+                ("text", os.path.join(tmp_dir, "bearer_output.txt"), write_bearer_text_report, parse_bearer_report),
+                ("json", os.path.join(tmp_dir, "bearer_output.json"), write_bearer_json_report, parse_bearer_json_report),
+            ]
+            for name, path, writer, report_parser in reports:
+                writer(path, findings, snippet_lines=args.snippet_lines)
+                size_mb = os.path.getsize(path) / 1e6
+                count, elapsed, peak = measure(report_parser, path)
+                print(f"{name:<6} {count:>9} {size_mb:>8.1f} {elapsed:>8.3f} {count / elapsed:>10.0f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark peak RSS of Bearer report processing as the report grows.
+
+Each report size is processed in a fresh child process so the peak resident
+set size reported by the OS belongs to that run alone. With streaming parsers
+and an incremental CSV writer the peak should stay flat across sizes.
+
+Usage:
+    python -m benchmarks.bench_bearer_memory [--findings 10000 50000 200000]
+"""
+
+import os
+import sys
+import json
+import argparse
+import resource
+import tempfile
+import subprocess
+
+from benchmarks.synthetic import write_bearer_json_report, write_bearer_text_report
+
+
+def run_child(report_file, csv_file):
+    """
+    Parse a report into a CSV file and print the peak RSS as JSON.
+
+    Args:
+        report_file (str): Bearer report file
+        csv_file (str): Output CSV file
+    """
+    from src.processors.bearer_processor import parse_bearer_report, parse_bearer_json_report, write_to_csv
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if report_file.endswith(".json"):
+        records = parse_bearer_json_report(report_file)
+    else:
+        records = parse_bearer_report(report_file)
+    write_to_csv(records, csv_file)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"baseline_kb": baseline_kb, "peak_kb": peak_kb}))
+
+
+def measure(report_file, csv_file):
+    """
+    Process a report in a child process and return its memory figures.
+
+    Args:
+        report_file (str): Bearer report file
+        csv_file (str): Output CSV file
+
+    Returns:
+        dict: baseline_kb and peak_kb of the child process
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_bearer_memory", "--child", report_file, csv_file],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--findings", type=int, nargs="+", default=[10000, 50000, 200000])
+    parser.add_argument("--child", nargs=2, metavar=("REPORT", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    print(f"{'format':<6} {'findings':>9} {'size MB':>8} {'base MB':>8} {'peak MB':>8} {'delta MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_file = os.path.join(tmp_dir, "bearer_output.csv")
+        for findings in args.findings:
+            reports = [
+                ("text", os.path.join(tmp_dir, "bearer_output.txt"), write_bearer_text_report),
+                ("json", os.path.join(tmp_dir, "bearer_output.json"), write_bearer_json_report),
+            ]
+            for name, path, writer in reports:
+                writer(path, findings)
+                size_mb = os.path.getsize(path) / 1e6
+                usage = measure(path, csv_file)
+                base_mb = usage["baseline_kb"] / 1024
+                peak_mb = usage["peak_kb"] / 1024
+                print(f"{name:<6} {findings:>9} {size_mb:>8.1f} {base_mb:>8.1f} {peak_mb:>8.1f} {peak_mb - base_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+End-to-end benchmark of the pipeline and the API server on stub scanners.
+
+The aider, bearer and privado stubs in ``benchmarks/stubs`` replace the real
+tools and the fake OpenAI server replaces the API, so a full run needs
+neither Docker, network access nor an API key. The pipeline (src.main.main)
+runs in a child process on a small generated project; the time it spends
+outside the recorded stages is reported as orchestration overhead. The API
+server is then started on the run's output and its read endpoints are
+queried concurrently.
+
+Usage:
+    python -m benchmarks.bench_end_to_end [--files 2000] [--paths 20] [--findings 1000]
+                                          [--delay 0] [--llm-latency 0.05]
+                                          [--rate-limit-rate 0] [--extractor aider] [--sink-rules]
+                                          [--api-requests 200] [--api-concurrency 8]
+                                          [--analyze-url URL] [--output bench_end_to_end.json]
+
+process_data pauses one second between batches of OPENAI_BATCH_SIZE rows, so
+the enrichment time grows with --paths (each path adds two rows). The
+synthetic sinks are all Amazon S3 sinks, which the built-in sink rules label
+without a request, so the rules are off unless --sink-rules is given.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import resource
+import tempfile
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_openai import FakeOpenAIServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS_DIR = os.path.join(REPO_ROOT, "benchmarks", "stubs")
+
+GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "bench",
+    "GIT_AUTHOR_EMAIL": "bench@example.com",
+    "GIT_COMMITTER_NAME": "bench",
+    "GIT_COMMITTER_EMAIL": "bench@example.com",
+}
+
+API_ENDPOINTS = [
+    "/vulnerabilities?limit=100",
+    "/vulnerabilities?risk_level=HIGH&path=dir_1/&limit=50",
+    "/search?q=logger&limit=20",
+    "/metrics",
+]
+
+
+def create_project(project_dir):
+    """
+    Create a small committed git project for the pipeline to scan.
+
+    Args:
+        project_dir (str): Directory to create the project in
+    """
+    os.makedirs(os.path.join(project_dir, "app"))
+    with open(os.path.join(project_dir, "app", "storage.py"), "w", encoding="utf-8") as f:
+        f.write("import boto3\n\n\nclass Storage:\n    def put(self, record):\n"
+                "        boto3.client('s3').put_object(Bucket='users', Body=record)\n")
+    env = dict(os.environ, **GIT_IDENTITY)
+    for command in (["git", "init", "-q"], ["git", "add", "-A"], ["git", "commit", "-q", "-m", "Initial commit"]):
+        subprocess.run(command, cwd=project_dir, check=True, env=env)
+
+
+def pipeline_env(args, project_dir, files_dir, base_url):
+    """
+    Build the environment that points the pipeline at the stubs and the fake API.
+    """
+    return dict(
+        os.environ,
+        **GIT_IDENTITY,
+        PATH=STUBS_DIR + os.pathsep + os.environ.get("PATH", ""),
+        PRIVADO_CLI_PATH=STUBS_DIR,
+        PROJECT_DIR=project_dir,
+        FILES_DIR=files_dir,
+        OPENAI_API_KEY="fake",
+        OPENAI_BASE_URL=base_url,
+        STRUCTURE_EXTRACTOR=args.extractor,
+        STUB_FILES=str(args.files),
+        STUB_PATHS=str(args.paths),
+        STUB_FINDINGS=str(args.findings),
+        STUB_DELAY=str(args.delay),
+        SINK_RULES="true" if args.sink_rules else "false",
+        PYTHONPATH=REPO_ROOT,
+    )
+
+
+def run_pipeline(env, log_file):
+    """
+    Run src.main.main in a child process.
+
+    Returns:
+        dict: Wall time, exit code and the largest child peak RSS
+    """
+    start = time.perf_counter()
+    with open(log_file, "w", encoding="utf-8") as log:
+        result = subprocess.run([sys.executable, "-c", "from src.main import main; main()"],
+                                cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                stdin=subprocess.DEVNULL)
+    seconds = time.perf_counter() - start
+    # ru_maxrss of children is the peak of the largest child waited for, in KiB on Linux
+    peak_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {"seconds": round(seconds, 3), "exit_code": result.returncode,
+            "max_child_peak_rss_mb": round(peak_kb / 1024, 1)}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def http_get(url, timeout=30):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def process_peak_rss_mb(pid):
+    """
+    Read the peak RSS of a process from /proc, or None where unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def wait_for_server(base_url, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            http_get(base_url + "/cors-test", timeout=2)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("API server did not start")
+
+
+def benchmark_api(args, env, log_file):
+    """
+    Start the API server on the run's output and query its read endpoints concurrently.
+
+    Returns:
+        dict: Startup time, per-endpoint latencies, analyze job time and server peak RSS
+    """
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    with open(log_file, "w", encoding="utf-8") as log:
+        server = subprocess.Popen([sys.executable, "-m", "uvicorn", "api_server:app", "--port", str(port),
+                                   "--log-level", "warning"], cwd=REPO_ROOT, env=env, stdout=log,
+                                  stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+        try:
+            wait_for_server(base_url, server)
+            results = {"startup_seconds": round(time.perf_counter() - start, 3), "endpoints": {}}
+
+            urls = [base_url + API_ENDPOINTS[n % len(API_ENDPOINTS)] for n in range(args.api_requests)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.api_concurrency) as pool:
+                responses = list(pool.map(http_get, urls))
+            seconds = time.perf_counter() - start
+            results["requests_per_second"] = round(len(urls) / seconds, 1)
+            for endpoint in API_ENDPOINTS:
+                latencies = sorted(latency for url, (latency, _) in zip(urls, responses)
+                                   if url.endswith(endpoint))
+                statuses = sorted({status for url, (_, status) in zip(urls, responses) if url.endswith(endpoint)})
+                if latencies:
+                    results["endpoints"][endpoint] = {
+                        "requests": len(latencies),
+                        "statuses": statuses,
+                        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+                        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2),
+                    }
+
+            if args.analyze_url:
+                results["analyze"] = run_analyze_job(base_url, args.analyze_url, args.analyze_timeout)
+            results["server_peak_rss_mb"] = process_peak_rss_mb(server.pid)
+            return results
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def run_analyze_job(base_url, url, timeout):
+    """
+    Submit a repository to /analyze and poll /result until the job finishes.
+
+    Returns:
+        dict: Job status and seconds until it finished
+    """
+    request = urllib.request.Request(base_url + "/analyze", data=json.dumps({"url": url}).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=30) as response:
+        job_id = json.loads(response.read())["job_id"]
+    status = "processing"
+    while status == "processing" and time.perf_counter() - start < timeout:
+        time.sleep(0.5)
+        with urllib.request.urlopen(f"{base_url}/result/{job_id}", timeout=30) as response:
+            status = json.loads(response.read())["status"]
+    return {"status": status, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000, help="Files in the stub repo map")
+    parser.add_argument("--paths", type=int, default=20, help="Privado paths and occurrences")
+    parser.add_argument("--findings", type=int, default=1000, help="Bearer findings")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds each stub waits before writing")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Median fake OpenAI latency")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of fake OpenAI 429s")
+    parser.add_argument("--extractor", choices=["aider", "ast"], default="aider")
+    parser.add_argument("--sink-rules", action="store_true", help="Label sinks by rule instead of the LLM")
+    parser.add_argument("--api-requests", type=int, default=200)
+    parser.add_argument("--api-concurrency", type=int, default=8)
+    parser.add_argument("--analyze-url", help="GitHub URL to submit to /analyze (needs network access)")
+    parser.add_argument("--analyze-timeout", type=float, default=600)
+    parser.add_argument("--output", default="bench_end_to_end.json", help="JSON results file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        project_dir = os.path.join(work_dir, "project")
+        files_dir = os.path.join(work_dir, "files")
+        create_project(project_dir)
+
+        with FakeOpenAIServer(latency_median=args.llm_latency, rate_limit_rate=args.rate_limit_rate) as llm:
+            env = pipeline_env(args, project_dir, files_dir, llm.base_url)
+            pipeline = run_pipeline(env, os.path.join(work_dir, "pipeline.log"))
+            if pipeline["exit_code"] != 0:
+                with open(os.path.join(work_dir, "pipeline.log"), encoding="utf-8") as f:
+                    print(f.read()[-3000:])
+                sys.exit(f"Pipeline failed with exit code {pipeline['exit_code']}")
+            pipeline["llm_requests"] = llm.stats["requests"]
+
+            with open(os.path.join(files_dir, "metrics.json"), encoding="utf-8") as f:
+                run = json.load(f)
+            stage_seconds = sum(stage["duration_seconds"] for stage in run["stages"])
+            pipeline["stages"] = run["stages"]
+            pipeline["orchestration_overhead_seconds"] = round(pipeline["seconds"] - stage_seconds, 3)
+
+            print(f"Pipeline: {pipeline['seconds']:.2f}s, overhead outside stages "
+                  f"{pipeline['orchestration_overhead_seconds']:.2f}s, "
+                  f"max child peak RSS {pipeline['max_child_peak_rss_mb']} MB, {llm.stats['requests']} LLM requests")
+            print(f"{'stage':<16} {'seconds':>8} {'peak MB':>8}  counts")
+            for stage in run["stages"]:
+                peak = (stage.get("peak_rss_bytes") or 0) / (1024 * 1024)
+                print(f"{stage['name']:<16} {stage['duration_seconds']:>8.3f} {peak:>8.1f}  {stage['counts']}")
+
+            api = benchmark_api(args, env, os.path.join(work_dir, "api.log"))
+
+    print()
+    print(f"API server: started in {api['startup_seconds']:.2f}s, {api['requests_per_second']} requests/s "
+          f"at concurrency {args.api_concurrency}, peak RSS {api['server_peak_rss_mb']} MB")
+    print(f"{'endpoint':<56} {'p50 ms':>8} {'p95 ms':>8}  statuses")
+    for endpoint, result in api["endpoints"].items():
+        print(f"{endpoint:<56} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}  {result['statuses']}")
+    if "analyze" in api:
+        print(f"/analyze job: {api['analyze']['status']} after {api['analyze']['seconds']:.1f}s")
+
+    params = {key: value for key, value in vars(args).items() if key != "output"}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"params": params, "pipeline": pipeline, "api": api}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark the Privado enrichment loop against the local fake OpenAI server.
+
+Rows are extracted from a synthetic privado.json and enriched one at a time
+with process_batch, so the latency of every row, including its retries, is
+measured. The fake server's latency distribution, error rate and 429 rate
+are set from the command line; with the same seed every run sends the same
+sequence of responses. All rows share one RetryPolicy, as the rows of an
+enrichment job do, so its circuit breaker sees every failure.
+
+Usage:
+    python -m benchmarks.bench_enrichment [--rows 200] [--path-length 10] [--concurrency 1]
+                                          [--latency-median 0.05] [--latency-sigma 0.5]
+                                          [--error-rate 0] [--rate-limit-rate 0]
+                                          [--retry-after 1] [--max-retries 5] [--retry-base-delay 0.5]
+                                          [--hedge-after 0] [--timeout 60] [--client-retries 0] [--seed 0]
+"""
+
+import io
+import os
+import time
+import argparse
+import itertools
+import tempfile
+import contextlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+from benchmarks.synthetic import write_privado_json
+from benchmarks.fake_openai import FakeOpenAIServer
+from src.processors.privado_processor import extract_privado_data, process_batch
+from src.utils.llm_retry import RetryPolicy
+
+# Labels process_batch gives rows it could not enrich
+FAILURE_LABELS = ("Error in processing", "Max retries reached", "Token budget exceeded", "LLM unavailable")
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of sorted values.
+    """
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def enrich_row(client, policy, row):
+    """
+    Enrich one row and time it.
+
+    Returns:
+        tuple: (seconds, AI sink label)
+    """
+    start = time.perf_counter()
+    result = process_batch(client, [row], policy=policy)
+    return time.perf_counter() - start, result[0]["AI Sink Label"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--path-length", type=int, default=10, help="Hops per data flow path")
+    parser.add_argument("--concurrency", type=int, default=1, help="Rows enriched in parallel")
+    parser.add_argument("--latency-median", type=float, default=0.05)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries of the RetryPolicy")
+    parser.add_argument("--retry-base-delay", type=float, default=0.5, help="Backoff before the first retry")
+    parser.add_argument("--hedge-after", type=float, default=0.0,
+                        help="Seconds before a slow request is sent again (0 disables hedging)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Request timeout of the OpenAI client")
+    parser.add_argument("--client-retries", type=int, default=0,
+                        help="Retries done by the OpenAI client itself (the pipeline disables them)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, "privado.json")
+        write_privado_json(json_path, occurrences=args.rows, paths=args.rows,
+                           path_length=args.path_length, seed=args.seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows = list(itertools.islice(extract_privado_data(json_path), args.rows))
+
+    server = FakeOpenAIServer(latency_median=args.latency_median, latency_sigma=args.latency_sigma,
+                              error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                              retry_after=args.retry_after, seed=args.seed)
+    with server:
+        client = OpenAI(base_url=server.base_url, api_key="fake", max_retries=args.client_retries,
+                        timeout=args.timeout)
+        policy = RetryPolicy(max_retries=args.max_retries, base_delay=args.retry_base_delay,
+                             hedge_after=args.hedge_after)
+        start = time.perf_counter()
+        # sys.stdout is shared by the threads, so it is redirected once around all of them
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda row: enrich_row(client, policy, row), rows))
+        seconds = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    outcomes = Counter(label if label in FAILURE_LABELS else "enriched" for _, label in results)
+    print(f"Rows:       {len(rows)} in {seconds:.2f}s ({len(rows) / seconds:.1f} rows/s, "
+          f"concurrency {args.concurrency})")
+    print(f"Row ms:     p50 {percentile(latencies, 0.5) * 1000:.1f}  p95 {percentile(latencies, 0.95) * 1000:.1f}  "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f}  max {latencies[-1] * 1000:.1f}")
+    print(f"Outcomes:   {dict(outcomes)}")
+    print(f"Server:     {server.stats['requests']} requests, {server.stats['success']} ok, "
+          f"{server.stats['rate_limited']} rate limited, {server.stats['errors']} errors")
+    print(f"Tokens:     {server.stats['prompt_tokens']} prompt, {server.stats['completion_tokens']} completion "
+          f"(estimated)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark the startup cost of the entry points and packages.
+
+Each module is imported in fresh interpreters with ``-X importtime``; the
+median cumulative import time of the module itself is reported next to the
+slowest modules it pulls in. Every import also runs with FILES_DIR pointing at
+a path that does not exist, and is flagged if it prints anything or creates
+that directory, so side effects at import time show up here too.
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs 5] [--top 3]
+                                           [--modules src.config src.main api_server]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "src.config",
+    "src.models",
+    "src.utils",
+    "src.processors",
+    "src.scanners",
+    "src.main",
+    "github_process",
+    "api_server",
+]
+
+
+def import_once(module, files_dir):
+    """
+    Import a module in a fresh interpreter.
+
+    Args:
+        module (str): Module to import
+        files_dir (str): Nonexistent FILES_DIR given to the interpreter
+
+    Returns:
+        tuple: (cumulative microseconds per imported module, stdout of the import)
+    """
+    env = dict(os.environ, FILES_DIR=files_dir, PYTHONPATH=REPO_ROOT)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package", nested names are indented
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(total)
+    return cumulative, result.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=3, help="Slowest dependencies to list per module")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    args = parser.parse_args()
+
+    print(f"{'module':<16} {'median ms':>10} {'side effects':<14} slowest imports (cumulative ms)")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files_dir = os.path.join(tmp_dir, "files")
+        # Modules the interpreter loads at startup are not charged to any module
+        startup, _ = import_once("sys", files_dir)
+        for module in args.modules:
+            totals = []
+            side_effects = set()
+            for _ in range(args.runs):
+                cumulative, stdout = import_once(module, files_dir)
+                totals.append(cumulative.get(module, 0) / 1000)
+                if stdout.strip():
+                    side_effects.add("prints")
+                if os.path.exists(files_dir):
+                    side_effects.add("mkdir")
+                    os.rmdir(files_dir)
+            # Top-level dependencies outside the module's own package, slowest first
+            root = module.split(".")[0]
+            dependencies = sorted(((total, name) for name, total in cumulative.items()
+                                   if "." not in name and name != root and name not in startup),
+                                  reverse=True)[:args.top]
+            slowest = ", ".join(f"{name} {total / 1000:.0f}" for total, name in dependencies)
+            print(f"{module:<16} {statistics.median(totals):>10.1f} {','.join(sorted(side_effects)) or 'none':<14} "
+                  f"{slowest}")
+
+
+if __name__ == "__main__":
+    main()
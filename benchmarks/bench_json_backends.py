@@ -0,0 +1,46 @@
+"""
+Benchmark aider_repomap.json serialization per backend and layout.
+
+Usage:
+    python -m benchmarks.bench_json_backends [--files 20000]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from benchmarks.synthetic import write_repomap_txt
+from src.models import dump_tree
+from src.utils.json_utils import BACKENDS, orjson
+from src.processors.repomap_processor import iter_file_structures, build_directory_tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = [backend for backend in BACKENDS if backend != "orjson" or orjson is not None]
+    print(f"{'backend':<8} {'layout':<8} {'seconds':>8} {'size MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        txt_path = os.path.join(tmp_dir, "aider_repomap.txt")
+        json_path = os.path.join(tmp_dir, "aider_repomap.json")
+        write_repomap_txt(txt_path, args.files)
+        tree = build_directory_tree(iter_file_structures(txt_path))
+        for backend in backends:
+            for pretty in (False, True):
+                best = None
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    dump_tree(tree, json_path, pretty=pretty, backend=backend)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                size_mb = os.path.getsize(json_path) / 1e6
+                layout = "pretty" if pretty else "compact"
+                print(f"{backend:<8} {layout:<8} {best:>8.3f} {size_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
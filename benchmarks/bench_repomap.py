@@ -0,0 +1,67 @@
+"""
+Benchmark repo map parsing on synthetic aider_repomap.txt files.
+
+Two sweeps are run: one grows the number of files, the other grows the length
+of class bodies and methods. Time per file (or per line) should stay flat in
+both when parsing is linear.
+
+Usage:
+    python -m benchmarks.bench_repomap [--files 10000 100000] [--body-lines 10 100 1000]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from benchmarks.synthetic import write_repomap_txt
+from src.processors.repomap_processor import iter_file_structures, build_directory_tree
+
+
+def measure(path):
+    """
+    Parse a repo map and build its directory tree.
+
+    Args:
+        path (str): Repo map file path
+
+    Returns:
+        tuple: (parse seconds, tree build seconds, file count)
+    """
+    start = time.perf_counter()
+    files = list(iter_file_structures(path))
+    parsed = time.perf_counter()
+    build_directory_tree(files)
+    built = time.perf_counter()
+    return parsed - start, built - parsed, len(files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--body-lines", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "aider_repomap.txt")
+
+        print("Scaling with file count")
+        print(f"{'files':>8} {'size MB':>8} {'parse s':>8} {'tree s':>8} {'us/file':>8}")
+        for files in args.files:
+            write_repomap_txt(path, files)
+            size_mb = os.path.getsize(path) / 1e6
+            parse_s, tree_s, count = measure(path)
+            print(f"{count:>8} {size_mb:>8.1f} {parse_s:>8.2f} {tree_s:>8.2f} {(parse_s + tree_s) / count * 1e6:>8.1f}")
+
+        print("\nScaling with class body length (200 files)")
+        print(f"{'lines':>8} {'size MB':>8} {'parse s':>8} {'us/line':>8}")
+        for body_lines in args.body_lines:
+            write_repomap_txt(path, 200, classes_per_file=1, methods_per_class=1, body_lines=body_lines)
+            size_mb = os.path.getsize(path) / 1e6
+            parse_s, _, count = measure(path)
+            lines_per_file = 2 * body_lines + 6
+            print(f"{body_lines:>8} {size_mb:>8.1f} {parse_s:>8.2f} {parse_s / (count * lines_per_file) * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
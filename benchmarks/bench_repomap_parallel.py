@@ -0,0 +1,56 @@
+"""
+Benchmark parallel repo map parsing against the single-process parser.
+
+The repo map is memory-mapped, sharded by byte range at file headers and
+parsed across a process pool. Speedup should grow with the number of cores
+available.
+
+Usage:
+    python -m benchmarks.bench_repomap_parallel [--files 100000] [--workers 1 2 4 8]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from benchmarks.synthetic import write_repomap_txt
+from src.processors.repomap_processor import iter_file_structures, iter_file_structures_parallel
+
+
+def measure(structures):
+    """
+    Consume a stream of parsed files.
+
+    Returns:
+        tuple: (seconds taken, number of files)
+    """
+    start = time.perf_counter()
+    count = sum(1 for _ in structures)
+    return time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    print(f"Cores available: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        txt_path = os.path.join(tmp_dir, "aider_repomap.txt")
+        write_repomap_txt(txt_path, args.files)
+        size_mb = os.path.getsize(txt_path) / 1e6
+        print(f"Repo map: {args.files} files, {size_mb:.1f} MB")
+        print(f"{'workers':>8} {'seconds':>8} {'MB/s':>8} {'speedup':>8}")
+
+        baseline, count = measure(iter_file_structures(txt_path, workers=1))
+        print(f"{1:>8} {baseline:>8.2f} {size_mb / baseline:>8.1f} {1.0:>8.2f}x")
+        for workers in sorted(set(args.workers) - {1}):
+            elapsed, parsed = measure(iter_file_structures_parallel(txt_path, workers))
+            assert parsed == count
+            print(f"{workers:>8} {elapsed:>8.2f} {size_mb / elapsed:>8.1f} {baseline / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
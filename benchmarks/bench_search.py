@@ -0,0 +1,92 @@
+"""
+Benchmark building and querying the full-text search index.
+
+A synthetic repo map is turned into a tree with sinks and vulnerabilities
+attached, written to an analysis database, and then the index is rebuilt
+and queried.
+
+Usage:
+    python -m benchmarks.bench_search [--files 20000] [--queries 200]
+"""
+
+import os
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+from benchmarks.synthetic import write_repomap_txt
+from src.models import SinkDetail, Vulnerability, iter_files
+from src.processors.repomap_processor import iter_file_structures, build_directory_tree
+from src.processors.sqlite_processor import write_analysis_db
+from src.processors.search_index import build_search_index, search
+
+SINK_LABELS = ["S3 bucket", "PostgreSQL", "Redis cache", "HTTP endpoint", "Log file"]
+
+QUERIES = ["S3", "bucket", "Redis", "user records", "ignore", "method_3", "value + 2", "value"]
+
+
+def add_findings(tree, seed=0):
+    """
+    Attach a sink to every third file and a vulnerability to every fifth.
+    """
+    rng = random.Random(seed)
+    for index, (path, node) in enumerate(iter_files(tree)):
+        if index % 3 == 0:
+            label = rng.choice(SINK_LABELS)
+            node.add_sink_detail(SinkDetail(label, f"Writes user records from {path} to the {label}.",
+                                            "client.put(record)", str(index % 400), "3"))
+        if index % 5 == 0:
+            node.add_vulnerability(Vulnerability("logger.info(user.email)", str(index % 400), "HIGH",
+                                                 "https://docs.bearer.com/reference/rules/",
+                                                 f"bearer ignore add {index:08x}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        txt_path = os.path.join(tmp_dir, "aider_repomap.txt")
+        db_path = os.path.join(tmp_dir, "analysis.db")
+        write_repomap_txt(txt_path, args.files)
+        tree = build_directory_tree(iter_file_structures(txt_path))
+        add_findings(tree)
+
+        start = time.perf_counter()
+        counts = write_analysis_db(tree, db_path, search_index=False)
+        db_seconds = time.perf_counter() - start
+        size_before = os.path.getsize(db_path)
+
+        conn = sqlite3.connect(db_path)
+        start = time.perf_counter()
+        cursor = conn.cursor()
+        build_search_index(cursor)
+        conn.commit()
+        index_seconds = time.perf_counter() - start
+        conn.close()
+        index_mb = (os.path.getsize(db_path) - size_before) / 1e6
+
+        documents = counts["methods"] + counts["sinks"] + counts["vulnerabilities"]
+        print(f"Database: {db_seconds:.2f}s for {sum(counts.values())} rows")
+        print(f"Index:    {index_seconds:.2f}s for {documents} documents, {index_mb:.1f} MB")
+        print()
+        print(f"{'query':<16} {'hits':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for query in QUERIES:
+            latencies = []
+            total = 0
+            for run in range(args.queries):
+                start = time.perf_counter()
+                total = search(db_path, query, offset=(run % 5) * 20)["total"]
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[int(len(latencies) * 0.95)]
+            print(f"{query:<16} {total:>8} {p50:>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
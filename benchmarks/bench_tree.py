@@ -0,0 +1,62 @@
+"""
+Benchmark repo map directory tree construction on wide and deep trees.
+
+Wide trees put every file in its own directory under one parent (the shape of
+generated code or migrations); deep trees nest every file many levels down.
+Time per file should stay flat as the trees grow.
+
+Usage:
+    python -m benchmarks.bench_tree [--files 1000 10000 50000] [--depth 50]
+"""
+
+import time
+import argparse
+
+from src.processors.repomap_processor import build_directory_tree
+
+
+def wide_files(count):
+    """
+    Paths with one sibling directory per file under a shared parent.
+    """
+    return [(f"app/migrations/m{index:06d}/migration.py", {}) for index in range(count)]
+
+
+def deep_files(count, depth):
+    """
+    Paths nested depth levels down, spread over a handful of branches.
+    """
+    return [("/".join(f"level{level}_{index % 4}" for level in range(depth)) + f"/file_{index}.py", {})
+            for index in range(count)]
+
+
+def measure(files):
+    """
+    Build a tree from the given files.
+
+    Args:
+        files (list): Tuples (filepath, structure)
+
+    Returns:
+        float: Seconds taken
+    """
+    start = time.perf_counter()
+    build_directory_tree(files)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--depth", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'shape':<6} {'files':>8} {'seconds':>8} {'us/file':>8}")
+    for count in args.files:
+        for shape, files in (("wide", wide_files(count)), ("deep", deep_files(count, args.depth))):
+            elapsed = measure(files)
+            print(f"{shape:<6} {count:>8} {elapsed:>8.3f} {elapsed / count * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the memory held by aider_repomap.json loaded as plain dicts versus the
+slotted node model in src.models.
+
+Usage:
+    python -m benchmarks.bench_tree_memory [--files 10000 50000 200000]
+"""
+
+import os
+import gc
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic import write_repomap_txt
+from src.models import load_tree, dump_tree
+from src.processors.repomap_processor import iter_file_structures, build_directory_tree
+
+
+def measure(loader, path):
+    """
+    Load a tree and report the memory it keeps alive.
+
+    Args:
+        loader (callable): Function loading the tree from a path
+        path (str): aider_repomap.json path
+
+    Returns:
+        tuple: (retained bytes, peak bytes, seconds)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = loader(path)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return retained, peak, elapsed
+
+
+def load_dicts(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, nargs="+", default=[10000, 50000, 200000])
+    args = parser.parse_args()
+
+    print(f"{'model':<6} {'files':>8} {'kept MB':>8} {'peak MB':>8} {'seconds':>8} {'B/file':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        txt_path = os.path.join(tmp_dir, "aider_repomap.txt")
+        json_path = os.path.join(tmp_dir, "aider_repomap.json")
+        for files in args.files:
+            write_repomap_txt(txt_path, files, classes_per_file=1, methods_per_class=2, body_lines=1)
+            dump_tree(build_directory_tree(iter_file_structures(txt_path)), json_path)
+            for name, loader in (("dict", load_dicts), ("slots", load_tree)):
+                retained, peak, elapsed = measure(loader, json_path)
+                print(f"{name:<6} {files:>8} {retained / 1e6:>8.1f} {peak / 1e6:>8.1f} {elapsed:>8.2f} {retained / files:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Local stand-in for the OpenAI chat-completions endpoint.
+
+The server answers POST /v1/chat/completions with a completion whose content
+conforms to the JSON schema requested in ``response_format``, after a latency
+drawn from a log-normal distribution. A configurable share of requests fails
+with 500, or with 429 and a Retry-After header. Latency and outcome of the
+n-th request depend only on the seed and n, so runs are reproducible however
+the requests are scheduled.
+
+Point the OpenAI client at it with ``OPENAI_BASE_URL=http://127.0.0.1:8765/v1``
+(any OPENAI_API_KEY is accepted), or start it in-process with
+``FakeOpenAIServer`` as a context manager.
+
+Usage:
+    python -m benchmarks.fake_openai [--port 8765] [--latency-median 0.3]
+                                     [--latency-sigma 0.5] [--error-rate 0]
+                                     [--rate-limit-rate 0] [--retry-after 1]
+                                     [--seed 0]
+"""
+
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SINK_LABELS = ["S3 bucket", "PostgreSQL database", "Redis cache", "HTTP endpoint", "Log file",
+               "MongoDB collection", "Kafka topic", "Local file"]
+
+
+def sample_from_schema(schema, rng, name=""):
+    """
+    Build a value that conforms to a JSON schema.
+
+    Covers the subset used for structured outputs: objects, arrays, enums,
+    strings, numbers, integers, booleans and null.
+
+    Args:
+        schema (dict): JSON schema
+        rng (random.Random): Source of the generated values
+        name (str, optional): Property name the value is generated for
+
+    Returns:
+        object: Conforming value
+    """
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((option for option in kind if option != "null"), "null")
+    if kind == "object":
+        return {key: sample_from_schema(value, rng, key)
+                for key, value in schema.get("properties", {}).items()}
+    if kind == "array":
+        count = rng.randint(schema.get("minItems", 1), max(schema.get("minItems", 1), 3))
+        return [sample_from_schema(schema.get("items", {}), rng, name) for _ in range(count)]
+    if kind == "integer":
+        return rng.randint(schema.get("minimum", 0), schema.get("maximum", 100))
+    if kind == "number":
+        return round(rng.uniform(schema.get("minimum", 0), schema.get("maximum", 1)), 3)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    if "label" in name:
+        return rng.choice(SINK_LABELS)
+    return f"Synthetic {name or 'value'} {rng.randint(0, 99999)}: the code writes records to the data sink."
+
+
+class FakeOpenAIServer:
+    """
+    Threaded HTTP server imitating the chat-completions endpoint.
+
+    Args:
+        host (str, optional): Interface to bind. Defaults to "127.0.0.1".
+        port (int, optional): Port to bind; 0 picks a free port. Defaults to 0.
+        latency_median (float, optional): Median response latency in seconds. Defaults to 0.05.
+        latency_sigma (float, optional): Sigma of the log-normal latency; 0 makes
+            every response take the median. Defaults to 0.5.
+        error_rate (float, optional): Share of requests answered with 500. Defaults to 0.
+        rate_limit_rate (float, optional): Share of requests answered with 429. Defaults to 0.
+        retry_after (float, optional): Retry-After seconds sent with 429. Defaults to 1.
+        seed (int, optional): Seed of the latency and outcome draws. Defaults to 0.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency_median=0.05, latency_sigma=0.5,
+                 error_rate=0.0, rate_limit_rate=0.0, retry_after=1.0, seed=0):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.stats = {"requests": 0, "success": 0, "rate_limited": 0, "errors": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def plan(self, number):
+        """
+        Draw the latency and outcome of the n-th request.
+
+        Args:
+            number (int): Sequence number of the request
+
+        Returns:
+            tuple: (latency seconds, "success", "rate_limited" or "error", random.Random)
+        """
+        rng = random.Random(self.seed * 1_000_003 + number)
+        latency = self.latency_median * math.exp(self.latency_sigma * rng.gauss(0, 1))
+        draw = rng.random()
+        if draw < self.rate_limit_rate:
+            return latency, "rate_limited", rng
+        if draw < self.rate_limit_rate + self.error_rate:
+            return latency, "error", rng
+        return latency, "success", rng
+
+    def completion(self, request, rng):
+        """
+        Build a chat completion answering a request body.
+
+        Args:
+            request (dict): Decoded request body
+            rng (random.Random): Source of the generated content
+
+        Returns:
+            dict: Chat completion response body
+        """
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format.get("json_schema", {}).get("schema", {})
+            content = json.dumps(sample_from_schema(schema, rng))
+        elif response_format.get("type") == "json_object":
+            content = json.dumps({"result": "ok"})
+        else:
+            content = "This is a synthetic response."
+        # Roughly four characters per token
+        prompt_chars = sum(len(str(message.get("content", ""))) for message in request.get("messages", []))
+        prompt_tokens = max(1, prompt_chars // 4)
+        completion_tokens = max(1, len(content) // 4)
+        with self._lock:
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+        return {
+            "id": f"chatcmpl-fake-{rng.randrange(16 ** 12):012x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "logprobs": None,
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}",
+                                                    "type": "invalid_request_error"}})
+                    return
+                try:
+                    request = json.loads(body or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body",
+                                                    "type": "invalid_request_error"}})
+                    return
+
+                with server._lock:
+                    number = server.stats["requests"]
+                    server.stats["requests"] += 1
+                latency, outcome, rng = server.plan(number)
+                time.sleep(latency)
+                with server._lock:
+                    server.stats[outcome if outcome != "error" else "errors"] += 1
+
+                if outcome == "rate_limited":
+                    self._send_json(429, {"error": {
+                        "message": "Rate limit reached for requests. Please try again later.",
+                        "type": "requests", "code": "rate_limit_exceeded"}},
+                        {"Retry-After": f"{server.retry_after:g}",
+                         "x-ratelimit-reset-requests": f"{server.retry_after:g}s"})
+                elif outcome == "error":
+                    self._send_json(500, {"error": {"message": "The server had an error processing your request.",
+                                                    "type": "server_error"}})
+                else:
+                    self._send_json(200, server.completion(request, rng))
+
+        return Handler
+
+    def start(self):
+        """
+        Serve requests in a background thread.
+
+        Returns:
+            FakeOpenAIServer: The server itself
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the socket.
+        """
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-median", type=float, default=0.3, help="Median latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Sigma of the log-normal latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency_median, args.latency_sigma,
+                              args.error_rate, args.rate_limit_rate, args.retry_after, args.seed)
+    print(f"Fake OpenAI server listening; set OPENAI_BASE_URL={server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(f"Served: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
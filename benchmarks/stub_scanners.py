@@ -0,0 +1,153 @@
+"""
+Stand-ins for the aider, bearer and privado executables.
+
+The executables in ``benchmarks/stubs/`` call into this module. Each one
+accepts the command line the pipeline's scripts use, waits for a configurable
+delay and writes a synthetic output of configurable size in the place the
+real tool writes it:
+
+- ``aider ... --show-repo-map`` prints a repo map to stdout
+- ``bearer scan ./ [--format json --output FILE]`` writes the report
+- ``privado scan DIR`` writes ``DIR/.privado/privado.json``
+
+Put ``benchmarks/stubs`` first on PATH and set PRIVADO_CLI_PATH to it to run
+the pipeline without the real tools.
+
+Settings are read from the environment; ``STUB_<TOOL>_<NAME>`` overrides
+``STUB_<NAME>`` for one tool (e.g. STUB_PRIVADO_DELAY):
+
+- STUB_FILES: Files in the repo map (default 2000)
+- STUB_PATHS: Privado dataFlow paths and sinkProcessing occurrences (default 100)
+- STUB_PATH_LENGTH: Locations per dataFlow path (default 10)
+- STUB_FINDINGS: Bearer findings (default 1000)
+- STUB_DELAY: Seconds to wait before writing the output (default 0)
+- STUB_SEED: Random seed (default 0)
+
+Privado locations and Bearer findings are placed in the files of the repo
+map generated with the same STUB_FILES and STUB_SEED, so they merge into the
+tree as real findings would.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+from benchmarks.synthetic import (
+    repomap_file_paths,
+    write_repomap_txt,
+    write_privado_json,
+    write_bearer_json_report,
+    write_bearer_text_report
+)
+
+DEFAULTS = {
+    "FILES": 2000,
+    "PATHS": 100,
+    "PATH_LENGTH": 10,
+    "FINDINGS": 1000,
+    "DELAY": 0.0,
+    "SEED": 0,
+}
+
+
+def setting(tool, name):
+    """
+    Read a stub setting from the environment.
+
+    Args:
+        tool (str): Tool name, e.g. "bearer"
+        name (str): Setting name, e.g. "DELAY"
+
+    Returns:
+        int | float: Setting value, with the type of its default
+    """
+    value = os.environ.get(f"STUB_{tool.upper()}_{name}", os.environ.get(f"STUB_{name}"))
+    default = DEFAULTS[name]
+    return default if value is None else type(default)(value)
+
+
+def _file_paths(tool):
+    return list(repomap_file_paths(setting(tool, "FILES"), seed=setting(tool, "SEED")))
+
+
+def run_aider(args):
+    """
+    Print a synthetic repo map to stdout.
+    """
+    time.sleep(setting("aider", "DELAY"))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        map_file = os.path.join(tmp_dir, "repomap.txt")
+        write_repomap_txt(map_file, setting("aider", "FILES"), seed=setting("aider", "SEED"))
+        with open(map_file, "rb") as f:
+            shutil.copyfileobj(f, sys.stdout.buffer)
+    sys.stdout.flush()
+    return 0
+
+
+def run_bearer(args):
+    """
+    Write a synthetic Bearer report to --output, or a text report to stdout.
+    """
+    if not args or args[0] != "scan":
+        print("usage: bearer scan PATH [--format json] [--output FILE]", file=sys.stderr)
+        return 2
+    report_format = args[args.index("--format") + 1] if "--format" in args else "text"
+    output = args[args.index("--output") + 1] if "--output" in args else None
+
+    time.sleep(setting("bearer", "DELAY"))
+    findings = setting("bearer", "FINDINGS")
+    file_paths = _file_paths("bearer")
+    seed = setting("bearer", "SEED")
+    if report_format == "json":
+        write_bearer_json_report(output or "/dev/stdout", findings, seed=seed, file_paths=file_paths)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            report_file = output or os.path.join(tmp_dir, "report.txt")
+            write_bearer_text_report(report_file, findings, seed=seed, file_paths=file_paths)
+            if output is None:
+                with open(report_file, "rb") as f:
+                    shutil.copyfileobj(f, sys.stdout.buffer)
+    return 0
+
+
+def run_privado(args):
+    """
+    Write a synthetic privado.json to the .privado directory of the scanned project.
+    """
+    if len(args) < 2 or args[0] != "scan":
+        print("usage: privado scan PATH", file=sys.stderr)
+        return 2
+    project_dir = args[1]
+    print(f"Scanning {project_dir}...")
+    time.sleep(setting("privado", "DELAY"))
+    privado_dir = os.path.join(project_dir, ".privado")
+    os.makedirs(privado_dir, exist_ok=True)
+    paths = setting("privado", "PATHS")
+    write_privado_json(os.path.join(privado_dir, "privado.json"), occurrences=paths, paths=paths,
+                       path_length=setting("privado", "PATH_LENGTH"), seed=setting("privado", "SEED"),
+                       file_paths=_file_paths("privado"))
+    print(f"Scan complete: {os.path.join(privado_dir, 'privado.json')}")
+    return 0
+
+
+TOOLS = {
+    "aider": run_aider,
+    "bearer": run_bearer,
+    "privado": run_privado,
+}
+
+
+def main(tool, args):
+    """
+    Run a stub tool.
+
+    Args:
+        tool (str): "aider", "bearer" or "privado"
+        args (list): Command line arguments
+
+    Returns:
+        int: Exit status
+    """
+    return TOOLS[tool](args)
@@ -0,0 +1,287 @@
+"""
+Benchmark suite for every processor hot path.
+
+Synthetic scanner outputs are generated at the requested scale, then each
+stage runs in a fresh child process so its wall time and peak RSS belong to
+that stage alone. Results are printed as a table and written as JSON so runs
+can be compared over time.
+
+Usage:
+    python -m benchmarks.suite [--files 5000] [--findings 2000] [--paths 2000]
+                               [--path-length 10] [--snippet-lines 3]
+                               [--output bench_suite.json]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import contextlib
+import subprocess
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import (
+    write_repomap_txt,
+    write_privado_json,
+    write_bearer_text_report,
+    write_privado_csv,
+    write_bearer_csv
+)
+
+# Base tree without sinks or vulnerabilities, read by the update stages
+BASE_TREE_FILE = "aider_repomap.base.json"
+
+
+def _consume(items):
+    return sum(1 for _ in items)
+
+
+def stage_parse_input_file(work_dir):
+    from src.processors.repomap_processor import parse_input_file
+    return lambda: _consume(parse_input_file(os.path.join(work_dir, "aider_repomap.txt")))
+
+
+def stage_build_directory_tree(work_dir):
+    from src.processors.repomap_processor import iter_file_structures, build_directory_tree
+    files = list(iter_file_structures(os.path.join(work_dir, "aider_repomap.txt"), workers=1))
+    return lambda: build_directory_tree(files) and len(files)
+
+
+def stage_extract_privado_data(work_dir):
+    from src.processors.privado_processor import extract_privado_data
+    return lambda: _consume(extract_privado_data(os.path.join(work_dir, "privado.json")))
+
+
+def stage_parse_bearer_report(work_dir):
+    from src.processors.bearer_processor import parse_bearer_report
+    return lambda: _consume(parse_bearer_report(os.path.join(work_dir, "bearer_output.txt")))
+
+
+def stage_update_sink_details(work_dir):
+    from src.models import load_tree, iter_files
+    from src.processors.privado_processor import update_sink_details
+    tree = load_tree(os.path.join(work_dir, BASE_TREE_FILE))
+
+    def run():
+        update_sink_details(tree, os.path.join(work_dir, "privado_output.csv"))
+        return sum(len(node.sink_details) for _, node in iter_files(tree))
+    return run
+
+
+def stage_update_vulnerabilities(work_dir):
+    from src.models import load_tree, iter_files
+    from src.processors.bearer_processor import update_vulnerabilities
+    tree = load_tree(os.path.join(work_dir, BASE_TREE_FILE))
+
+    def run():
+        update_vulnerabilities(tree, os.path.join(work_dir, "bearer_output.csv"))
+        return sum(len(node.vulnerabilities) for _, node in iter_files(tree))
+    return run
+
+
+def stage_convert_json_to_csv(work_dir):
+    from src.config import FINAL_CSV_FILE
+    from src.utils.metrics import stage
+    from src.processors.json_to_csv_processor import convert_json_to_csv
+
+    def run():
+        # The processor counts the rows it writes into the stage record
+        with stage("convert_json_to_csv") as record:
+            convert_json_to_csv()
+        return {"items": record["counts"].get("rows", 0), "output_bytes": os.path.getsize(FINAL_CSV_FILE)}
+    return run
+
+
+# Each stage function prepares its inputs and returns the callable to time. The
+# callable returns the number of items it processed, or a dict with "items" and
+# further measurements of the stage
+STAGES = {
+    "parse_input_file": stage_parse_input_file,
+    "build_directory_tree": stage_build_directory_tree,
+    "extract_privado_data": stage_extract_privado_data,
+    "parse_bearer_report": stage_parse_bearer_report,
+    "update_sink_details": stage_update_sink_details,
+    "update_vulnerabilities": stage_update_vulnerabilities,
+    "convert_json_to_csv": stage_convert_json_to_csv,
+}
+
+
+def reset_peak_rss():
+    """
+    Reset the peak RSS high-water mark of this process where the OS allows it
+    (Linux), so imports and input loading do not mask the stage's own peak.
+
+    Returns:
+        bool: True if the mark was reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_kb():
+    """
+    Read the peak RSS of this process in KiB.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def current_rss_kb():
+    """
+    Read the current RSS of this process in KiB, or None if unavailable.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def run_child(stage, work_dir):
+    """
+    Run one stage and print its measurements as JSON on the last line.
+
+    Args:
+        stage (str): Stage name
+        work_dir (str): Directory holding the synthetic inputs
+    """
+    # The processors print progress and per-row warnings; keep them out of the result
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = STAGES[stage](work_dir)
+        reset_peak_rss()
+        baseline_kb = current_rss_kb() or peak_rss_kb()
+        start = time.perf_counter()
+        items = run()
+        seconds = time.perf_counter() - start
+        peak_kb = peak_rss_kb()
+    measurements = items if isinstance(items, dict) else {"items": items}
+    print(json.dumps({
+        "stage": stage,
+        "seconds": round(seconds, 4),
+        **measurements,
+        "baseline_rss_mb": round(baseline_kb / 1024, 1),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "delta_rss_mb": round((peak_kb - baseline_kb) / 1024, 1),
+    }))
+
+
+def measure(stage, work_dir):
+    """
+    Run a stage in a child process with FILES_DIR pointing at the inputs.
+
+    Returns:
+        dict: Measurements of the stage
+    """
+    env = dict(os.environ, FILES_DIR=work_dir, REPOMAP_WORKERS="1")
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--child", stage, work_dir],
+        capture_output=True, text=True, check=True, env=env
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def write_inputs(work_dir, args):
+    """
+    Generate every synthetic input the stages read.
+
+    Args:
+        work_dir (str): Directory receiving the inputs
+        args (argparse.Namespace): Scale parameters
+    """
+    from src.models import dump_tree, iter_files
+    from src.processors.repomap_processor import iter_file_structures, build_directory_tree
+    from src.processors.privado_processor import update_sink_details
+    from src.processors.bearer_processor import update_vulnerabilities
+
+    txt_file = os.path.join(work_dir, "aider_repomap.txt")
+    write_repomap_txt(txt_file, args.files, body_lines=args.snippet_lines)
+    write_privado_json(os.path.join(work_dir, "privado.json"), occurrences=args.paths,
+                       paths=args.paths, path_length=args.path_length)
+    write_bearer_text_report(os.path.join(work_dir, "bearer_output.txt"), args.findings,
+                             snippet_lines=args.snippet_lines)
+
+    tree = build_directory_tree(iter_file_structures(txt_file, workers=1))
+    dump_tree(tree, os.path.join(work_dir, BASE_TREE_FILE))
+    file_paths = [path for path, _ in iter_files(tree)]
+    write_privado_csv(os.path.join(work_dir, "privado_output.csv"), file_paths, args.paths,
+                      path_length=args.path_length)
+    write_bearer_csv(os.path.join(work_dir, "bearer_output.csv"), file_paths, args.findings,
+                     snippet_lines=args.snippet_lines)
+
+    # The CSV export reads the fully enriched tree from FILES_DIR
+    with contextlib.redirect_stdout(io.StringIO()):
+        update_sink_details(tree, os.path.join(work_dir, "privado_output.csv"))
+        update_vulnerabilities(tree, os.path.join(work_dir, "bearer_output.csv"))
+    dump_tree(tree, os.path.join(work_dir, "aider_repomap.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000, help="Files in the repo map")
+    parser.add_argument("--findings", type=int, default=2000, help="Bearer findings")
+    parser.add_argument("--paths", type=int, default=2000, help="Privado occurrences and data flow paths")
+    parser.add_argument("--path-length", type=int, default=10, help="Locations per data flow path")
+    parser.add_argument("--snippet-lines", type=int, default=3, help="Lines per code snippet and method body")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--output", default="bench_suite.json", help="JSON results file")
+    parser.add_argument("--child", nargs=2, metavar=("STAGE", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    params = {
+        "files": args.files,
+        "findings": args.findings,
+        "paths": args.paths,
+        "path_length": args.path_length,
+        "snippet_lines": args.snippet_lines,
+    }
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        start = time.perf_counter()
+        write_inputs(work_dir, args)
+        print(f"Generated inputs in {time.perf_counter() - start:.1f}s ({params})")
+        print(f"{'stage':<24} {'seconds':>8} {'items':>10} {'peak MB':>8} {'delta MB':>9}")
+        for stage in args.stages:
+            result = measure(stage, work_dir)
+            results.append(result)
+            print(f"{stage:<24} {result['seconds']:>8.3f} {result['items']:>10} "
+                  f"{result['peak_rss_mb']:>8.1f} {result['delta_rss_mb']:>9.1f}")
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": params,
+        "stages": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
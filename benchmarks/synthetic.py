@@ -0,0 +1,269 @@
+"""
+Generators for synthetic scanner outputs used by the benchmarks.
+"""
+
+import csv
+import json
+import random
+
+SEVERITIES = ["critical", "high", "medium", "low", "warning"]
+
+
+def _bearer_finding(index, rng, snippet_lines, file_paths=None):
+    """
+    Build one synthetic Bearer finding.
+
+    Args:
+        index (int): Finding number, used to derive names
+        rng (random.Random): Random source
+        snippet_lines (int): Number of lines in the code extract
+        file_paths (list, optional): File paths to place the finding in
+
+    Returns:
+        dict: Finding in Bearer's JSON report shape
+    """
+    line_number = rng.randint(1, 2000)
+    code = "\n".join(f"    logger.info(user_{index}.email, extra={{'n': {i}}})" for i in range(snippet_lines))
+    filename = file_paths[index % len(file_paths)] if file_paths else f"pkg_{index % 97}/module_{index}.py"
+    return {
+        "cwe_ids": ["532"],
+        "id": "python_lang_logger_leak",
+        "title": "Leakage of sensitive data in logger message",
+        "documentation_url": "https://docs.bearer.com/reference/rules/python_lang_logger_leak",
+        "line_number": line_number,
+        "full_filename": f"/tmp/scan/{filename}",
+        "filename": filename,
+        "code_extract": code,
+        "fingerprint": f"{index:08x}deadbeef_{index % 7}",
+    }
+
+
+def write_bearer_json_report(path, findings, snippet_lines=3, seed=0, file_paths=None):
+    """
+    Write a synthetic Bearer report in the --format json shape.
+
+    Args:
+        path (str): Output file path
+        findings (int): Number of findings to generate
+        snippet_lines (int, optional): Lines per code extract. Defaults to 3.
+        seed (int, optional): Random seed. Defaults to 0.
+        file_paths (list, optional): File paths to spread the findings over,
+            e.g. those of a synthetic repo map. Defaults to generated names.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for group, severity in enumerate(SEVERITIES):
+            if group:
+                f.write(",")
+            f.write(f'"{severity}":[')
+            indexes = range(group, findings, len(SEVERITIES))
+            for position, index in enumerate(indexes):
+                if position:
+                    f.write(",")
+                json.dump(_bearer_finding(index, rng, snippet_lines, file_paths), f)
+            f.write("]")
+        f.write("}")
+
+
+def write_bearer_text_report(path, findings, snippet_lines=3, seed=0, file_paths=None):
+    """
+    Write a synthetic Bearer report in the human-readable text shape.
+
+    Args:
+        path (str): Output file path
+        findings (int): Number of findings to generate
+        snippet_lines (int, optional): Lines per code snippet. Defaults to 3.
+        seed (int, optional): Random seed. Defaults to 0.
+        file_paths (list, optional): File paths to spread the findings over,
+            e.g. those of a synthetic repo map. Defaults to generated names.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Analyzing codebase\nSecurity Report\n\n")
+        for index in range(findings):
+            finding = _bearer_finding(index, rng, snippet_lines, file_paths)
+            severity = SEVERITIES[index % len(SEVERITIES)].upper()
+            f.write(f"{severity}: {finding['title']} [CWE-532]\n")
+            f.write(f"{finding['documentation_url']}\n")
+            f.write(f"To ignore this finding, run: bearer ignore add {finding['fingerprint']}\n\n")
+            f.write(f"File: {finding['filename']}:{finding['line_number']}\n\n")
+            f.write("```\n")
+            f.write(finding["code_extract"] + "\n")
+            f.write("```\n\n")
+
+
+def _privado_location(index, hop, rng, file_paths=None):
+    """
+    Build one synthetic Privado code location.
+
+    Args:
+        index (int): Path number, used to derive names
+        hop (int): Position of the location in its path
+        rng (random.Random): Random source
+        file_paths (list, optional): File paths to place the location in
+
+    Returns:
+        dict: Location in privado.json shape
+    """
+    if file_paths:
+        file_name = file_paths[(index * 7 + hop) % len(file_paths)]
+    else:
+        file_name = f"services/svc_{index % 53}/handler_{(index + hop) % 211}.py"
+    return {
+        "sample": f"  client.put_object(Bucket=bucket_{index}, Body=payload_{hop})  ",
+        "fileName": file_name,
+        "lineNumber": rng.randint(1, 3000),
+        "columnNumber": rng.randint(1, 80),
+        "excerpt": "\n".join(f"{n}  line {n}" for n in range(5)),
+    }
+
+
+def write_privado_json(path, sinks=50, occurrences=1000, paths=1000, path_length=10, seed=0, file_paths=None):
+    """
+    Write a synthetic privado.json with sink definitions, sinkProcessing
+    occurrences and dataFlow paths spread across all data flow sections.
+
+    Args:
+        path (str): Output file path
+        sinks (int, optional): Number of sink definitions. Defaults to 50.
+        occurrences (int, optional): Number of sinkProcessing occurrences. Defaults to 1000.
+        paths (int, optional): Number of dataFlow paths. Defaults to 1000.
+        path_length (int, optional): Locations per data flow path. Defaults to 10.
+        seed (int, optional): Random seed. Defaults to 0.
+        file_paths (list, optional): File paths to place the locations in,
+            e.g. those of a synthetic repo map. Defaults to generated names.
+    """
+    rng = random.Random(seed)
+    sink_ids = [f"Storages.AmazonS3.Write.{n}" for n in range(sinks)]
+    sections = ["storages", "third_parties", "internal_apis"]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"repoName": "synthetic", "sources": [], "sinks": ')
+        json.dump([{"id": sink_id, "name": f"Sink {n}", "domains": []} for n, sink_id in enumerate(sink_ids)], f)
+
+        f.write(', "dataFlow": {')
+        for position, section in enumerate(sections):
+            if position:
+                f.write(",")
+            f.write(f'"{section}": [{{"sourceId": "Data.Sensitive.Email", "sinks": [')
+            indexes = range(position, paths, len(sections))
+            for count, index in enumerate(indexes):
+                if count:
+                    f.write(",")
+                f.write(f'{{"id": "{sink_ids[index % sinks]}", "paths": [')
+                json.dump({"pathId": f"path-{index}", "path": [_privado_location(index, hop, rng, file_paths) for hop in range(path_length)]}, f)
+                f.write("]}")
+            f.write("]}]")
+
+        f.write('}, "sinkProcessing": [')
+        for index in range(occurrences):
+            if index:
+                f.write(",")
+            f.write(f'{{"sinkId": "{sink_ids[index % sinks]}", "occurrences": [')
+            json.dump(_privado_location(index, 0, rng, file_paths), f)
+            f.write("]}")
+        f.write("]}")
+
+
+def repomap_file_paths(files, dirs_per_level=20, depth=3, seed=0):
+    """
+    Generate the file paths write_repomap_txt writes for the same arguments.
+
+    Args:
+        files (int): Number of file sections
+        dirs_per_level (int, optional): Directory fan-out. Defaults to 20.
+        depth (int, optional): Directory depth of each file. Defaults to 3.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Yields:
+        str: "/" separated file path
+    """
+    rng = random.Random(seed)
+    for index in range(files):
+        parts = [f"dir_{rng.randrange(dirs_per_level)}" for _ in range(depth)]
+        yield f"{'/'.join(parts)}/module_{index}.py"
+
+
+def write_repomap_txt(path, files, classes_per_file=2, methods_per_class=4, body_lines=3, dirs_per_level=20, depth=3, seed=0):
+    """
+    Write a synthetic Aider repo map (aider_repomap.txt).
+
+    Args:
+        path (str): Output file path
+        files (int): Number of file sections
+        classes_per_file (int, optional): Classes per file. Defaults to 2.
+        methods_per_class (int, optional): Methods per class. Defaults to 4.
+        body_lines (int, optional): Extra lines per class body and per method. Defaults to 3.
+        dirs_per_level (int, optional): Directory fan-out. Defaults to 20.
+        depth (int, optional): Directory depth of each file. Defaults to 3.
+        seed (int, optional): Random seed. Defaults to 0.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Here are summaries of some files present in my git repository.\n\n")
+        for file_path in repomap_file_paths(files, dirs_per_level, depth, seed):
+            f.write(f"{file_path}:\n")
+            f.write("⋮...\n│import os\n│CONSTANT = 1\n⋮...\n")
+            for class_index in range(classes_per_file):
+                f.write(f"│class Model{class_index}(Base):\n")
+                for line in range(body_lines):
+                    f.write(f"│    field_{line} = Column(String)\n")
+                for method_index in range(methods_per_class):
+                    f.write(f"│    def method_{method_index}(self, value):\n")
+                    for line in range(body_lines):
+                        f.write(f"│        value = value + {line}\n")
+                f.write("⋮...\n")
+            f.write("\n")
+
+
+def write_privado_csv(path, file_paths, rows, path_length=10, seed=0):
+    """
+    Write a synthetic privado_output.csv as produced by process_data, with
+    sinks located in the given files.
+
+    Args:
+        path (str): Output file path
+        file_paths (list): Repo map file paths the sinks are spread over
+        rows (int): Number of rows
+        path_length (int, optional): Files per data flow path. Defaults to 10.
+        seed (int, optional): Random seed. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    labels = ["S3 bucket", "PostgreSQL table", "Redis cache", "HTTP endpoint", "Log file"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Data Sink ID", "Sink Label", "Code Snippet", "File Path", "Line Number",
+                         "Column Number", "Data Flow Path", "AI Sink Label", "Code Summary"])
+        for index in range(rows):
+            hops = [rng.choice(file_paths) for _ in range(path_length)]
+            label = labels[index % len(labels)]
+            writer.writerow([
+                f"Storages.AmazonS3.Write.{index % 50}", f"Sink {index % 50}",
+                f"client.put_object(Bucket=bucket_{index}, Body=payload)", hops[-1],
+                rng.randint(1, 3000), rng.randint(1, 80), " -> ".join(hops), label,
+                f"Writes the user payload of request {index} to the {label}."
+            ])
+
+
+def write_bearer_csv(path, file_paths, findings, snippet_lines=3, seed=0):
+    """
+    Write a synthetic bearer_output.csv as produced by write_to_csv, with
+    findings located in the given files.
+
+    Args:
+        path (str): Output file path
+        file_paths (list): Repo map file paths the findings are spread over
+        findings (int): Number of findings
+        snippet_lines (int, optional): Lines per code snippet. Defaults to 3.
+        seed (int, optional): Random seed. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["File Name", "Code Snippet", "Line Number", "Risk Level", "Ref Link", "Message To Fix"])
+        for index in range(findings):
+            finding = _bearer_finding(index, rng, snippet_lines)
+            writer.writerow([
+                rng.choice(file_paths), finding["code_extract"], finding["line_number"],
+                SEVERITIES[index % len(SEVERITIES)].upper(), finding["documentation_url"],
+                f"bearer ignore add {finding['fingerprint']}"
+            ])
@@ -11,9 +11,7 @@ import shutil
 import re
 from urllib.parse import urlparse
 
-# Import the main function from the main module
-from src.main import main as run_main_pipeline
-from src.config import FILES_DIR
+from src.utils.metrics import stage
 
 # Directory to store GitHub repositories
 GITHUB_REPOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'github_repos')
@@ -140,7 +138,8 @@ def main():
             sys.exit(1)
         
         # Clone the repository
-        repo_dir = clone_github_repo(github_url)
+        with stage("clone"):
+            repo_dir = clone_github_repo(github_url)
         if not repo_dir:
             print("Failed to clone the repository.")
             sys.exit(1)
@@ -156,7 +155,8 @@ def main():
         os.environ['FILES_DIR'] = files_dir
         print(f"Set FILES_DIR environment variable to: {files_dir}")
         
-        # Run the main pipeline
+        # Run the main pipeline (imported here so the helpers above stay cheap to import)
+        from src.main import main as run_main_pipeline
         print("\nRunning analysis pipeline on the GitHub repository...")
         run_main_pipeline(is_github_repo=True)
         
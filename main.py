@@ -1,6 +1,17 @@
+import argparse
+
 from src.main import main
 from src.utils.check_env import check_env
+from src.utils.profiling import configure as configure_profiling
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the CodeAna analysis pipeline.")
+    parser.add_argument("--profile", metavar="STAGES",
+                        help="Comma-separated stages to profile with cProfile and tracemalloc, or \"all\"")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip the stages completed by the previous run and continue its LLM enrichment")
+    args = parser.parse_args()
+    if args.profile:
+        configure_profiling(args.profile)
     check_env()
-    main()
\ No newline at end of file
+    main(resume=True if args.resume else None)
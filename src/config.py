@@ -8,24 +8,100 @@ Environment Variables:
 - GITHUB_PROJECT_DIR: Path to the cloned GitHub repository that will be analyzed
 - PRIVADO_CLI_PATH: Path to the privado-cli directory (e.g., /home/user/privado-cli)
 - RUN_AIDER: Set to "false" to skip Aider scan
+- STRUCTURE_EXTRACTOR: How to build the code structure ("aider" repo map or local "ast" extractor)
+- STRUCTURE_WORKERS: Number of worker processes for the local structure extractor
+- REPOMAP_WORKERS: Number of worker processes for parsing large repo maps
 - RUN_PRIVADO: Set to "false" to skip Privado scan
 - RUN_BEARER: Set to "false" to skip Bearer scan
+- BEARER_FORMAT: Bearer report format to request ("json" or "text")
 - OPENAI_MODEL: OpenAI model to use
 - OPENAI_BATCH_SIZE: Number of rows to process in each batch
 - OPENAI_MAX_RETRIES: Maximum number of retries for OpenAI API calls
+- OPENAI_TIMEOUT: Seconds before an OpenAI API call times out (and is retried)
+- OPENAI_RETRY_BASE_DELAY: Backoff in seconds before the first retry, doubled for every further retry
+- OPENAI_RETRY_MAX_DELAY: Longest wait in seconds before a retry, also for Retry-After delays
+- OPENAI_HEDGE_AFTER: Seconds after which a slow OpenAI API call is sent a second time (0 to disable)
+- CIRCUIT_BREAKER_FAILURES: Consecutive failed OpenAI API calls that stop further calls (0 to disable)
+- CIRCUIT_BREAKER_RESET: Seconds before a single call is tried again after the circuit breaker opened
+- OPENAI_MAX_COMPLETION_TOKENS: Maximum number of tokens the model may generate per row
+- ENRICH_TOKEN_BUDGET: Maximum number of tokens one enrichment job may use (0 for no limit)
+- PROMPT_SNIPPET_LINES: Number of code snippet lines sent to the model, starting at the sink line
+- PROMPT_LINE_CHARS: Maximum number of characters per code snippet line sent to the model
+- PROMPT_PATH_HOPS: Maximum number of data flow path hops sent to the model
+- SINK_RULES: Set to "false" to send every sink to the model instead of labelling well-known sinks by rule
+- SINK_RULES_FILE: JSON file with extra sink labelling rules, tried before the built-in ones
+- SINK_CLUSTERING: Set to "false" to send every near-duplicate sink occurrence to the model
+- SINK_CLUSTER_THRESHOLD: Minimum estimated snippet similarity for a sink occurrence to reuse a label
+- JSON_BACKEND: JSON encoder for output files ("auto", "orjson" or "json")
+- JSON_PRETTY: Set to "true" to indent JSON output files
+- EXPORT_PARQUET: Set to "false" to skip the Parquet table export
+- PARQUET_ROW_GROUP_SIZE: Number of rows per Parquet row group
+- EXPORT_SQLITE: Set to "false" to skip the SQLite analysis database
+- SEARCH_INDEX: Set to "false" to skip the full-text search index in the analysis database
+- PROFILE_STAGES: Comma-separated pipeline stages to profile with cProfile and tracemalloc ("all" for every stage)
+- RESUME: Set to "true" to skip stages completed by the previous run and continue the LLM enrichment from its last checkpoint
+- ENRICH_CHECKPOINT_ROWS: Number of enriched rows between enrichment checkpoints
+- RESOURCE_LIMITS_DIR: Directory of the lock files through which the pipelines of a batch share the limits below (unset for no limits)
+- SCANNER_CONCURRENCY: Maximum number of scanners running at once across the pipelines of a batch
+- LLM_CONCURRENCY: Maximum number of OpenAI API calls in flight at once across the pipelines of a batch
+
+Settings are resolved when they are read, not when this module is imported:
+``config.FILES_DIR`` reflects the environment at the time of access, and the
+.env file is loaded on the first access. Importing the module has no side
+effects; log_configuration prints the configuration banner.
+
+A pipeline run reads its settings from a copy of the environment taken when
+it starts (see use_environment), so jobs the API server runs in parallel
+threads each keep their own FILES_DIR and project directory.
 """
 
 import os
-import sys
-import dotenv
+import contextlib
+import contextvars
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOTENV_PATH = os.path.join(ROOT_DIR, '.env')
+
+_env_loaded = False
+
+def load_env():
+    """
+    Load environment variables from the .env file once, if it exists.
+    Variables already set in the environment take precedence.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    if os.path.exists(DOTENV_PATH):
+        import dotenv
+        dotenv.load_dotenv(DOTENV_PATH)
+
+# Environment of the current pipeline run; None outside a run
+_run_environ = contextvars.ContextVar("run_environ", default=None)
+
+def _environ():
+    environ = _run_environ.get()
+    return os.environ if environ is None else environ
 
-# Load environment variables from .env file if it exists
-dotenv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
-if os.path.exists(dotenv_path):
-    print(f"Loading environment variables from {dotenv_path}")
-    dotenv.load_dotenv(dotenv_path)
-else:
-    print("No .env file found. Using environment variables from the system.")
+@contextlib.contextmanager
+def use_environment(overrides=None):
+    """
+    Resolve settings from a fixed copy of the environment within the block.
+    
+    The copy is taken after loading the .env file and belongs to the current
+    thread (and to the tasks it starts with a copy of its context), so later
+    changes to os.environ, e.g. by another job, do not affect it.
+    
+    Args:
+        overrides (dict, optional): Variables to set in the copy. Defaults to None.
+    """
+    load_env()
+    token = _run_environ.set(dict(os.environ, **(overrides or {})))
+    try:
+        yield
+    finally:
+        _run_environ.reset(token)
 
 # Helper function to parse boolean environment variables
 def parse_bool_env(env_var, default=True):
@@ -39,61 +115,147 @@ def parse_bool_env(env_var, default=True):
     Returns:
         bool: Parsed boolean value
     """
-    value = os.environ.get(env_var, str(default)).lower()
+    value = _environ().get(env_var, str(default)).lower()
     return value not in ('false', '0', 'no', 'n', 'f')
 
-# Files directory for all intermediate files
-# This can be overridden by the GITHUB_PROJECT_DIR environment variable
-FILES_DIR = os.environ.get("FILES_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'files'))
-# Create the files directory if it doesn't exist
-os.makedirs(FILES_DIR, exist_ok=True)
-
-# General settings
-# PROJECT_DIR is the target directory that will be analyzed
-DEFAULT_PROJECT_DIR = os.environ.get("PROJECT_DIR", "")
-# GITHUB_PROJECT_DIR is the cloned GitHub repository that will be analyzed
-GITHUB_PROJECT_DIR = os.environ.get("GITHUB_PROJECT_DIR", "")
-
-# Log the project directories
-if DEFAULT_PROJECT_DIR:
-    print(f"Using local project directory from environment: {DEFAULT_PROJECT_DIR}")
-    if not os.path.isdir(DEFAULT_PROJECT_DIR):
-        print(f"Warning: Project directory '{DEFAULT_PROJECT_DIR}' does not exist.")
-
-if GITHUB_PROJECT_DIR:
-    print(f"Using GitHub project directory from environment: {GITHUB_PROJECT_DIR}")
-    if not os.path.isdir(GITHUB_PROJECT_DIR):
-        print(f"Warning: GitHub project directory '{GITHUB_PROJECT_DIR}' does not exist.")
-
-# Aider settings
-RUN_AIDER = parse_bool_env("RUN_AIDER", True)
-AIDER_MAP_TOKENS = int(os.environ.get("AIDER_MAP_TOKENS", "8000"))
-AIDER_OUTPUT_FILE = os.path.join(FILES_DIR, "aider_repomap.txt")
-AIDER_JSON_FILE = os.path.join(FILES_DIR, "aider_repomap.json")
-
-# Privado settings
-RUN_PRIVADO = parse_bool_env("RUN_PRIVADO", True)
-PRIVADO_OUTPUT_FILE = os.path.join(FILES_DIR, "privado.json")
-PRIVADO_CSV_FILE = os.path.join(FILES_DIR, "privado_output.csv")
-# PRIVADO_CLI_PATH is the directory containing the privado executable
-PRIVADO_CLI_PATH = os.environ.get("PRIVADO_CLI_PATH", "")
-if PRIVADO_CLI_PATH:
-    print(f"Using Privado CLI path from environment: {PRIVADO_CLI_PATH}")
-    if not os.path.isdir(PRIVADO_CLI_PATH):
-        print(f"Warning: Privado CLI directory '{PRIVADO_CLI_PATH}' does not exist.")
-
-# Bearer settings
-RUN_BEARER = parse_bool_env("RUN_BEARER", True)
-BEARER_OUTPUT_FILE = os.path.join(FILES_DIR, "bearer_output.txt")
-BEARER_CSV_FILE = os.path.join(FILES_DIR, "bearer_output.csv")
-
-# OpenAI settings
-OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
-OPENAI_BATCH_SIZE = int(os.environ.get("OPENAI_BATCH_SIZE", "5"))
-OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "5"))
-
-# Output settings
-FINAL_CSV_FILE = os.path.join(FILES_DIR, "output.csv")
+def _files_path(file_name):
+    return lambda: os.path.join(__getattr__("FILES_DIR"), file_name)
+
+def _int_env(env_var, default):
+    return lambda: int(_environ().get(env_var, str(default)))
+
+def _float_env(env_var, default):
+    return lambda: float(_environ().get(env_var, str(default)))
+
+# Each setting is computed from the environment when it is read
+_SETTINGS = {
+    # Files directory for all intermediate files
+    # This can be overridden by the GITHUB_PROJECT_DIR environment variable
+    "FILES_DIR": lambda: _environ().get("FILES_DIR", os.path.join(ROOT_DIR, 'files')),
+
+    # General settings
+    # PROJECT_DIR is the target directory that will be analyzed
+    "DEFAULT_PROJECT_DIR": lambda: _environ().get("PROJECT_DIR", ""),
+    # GITHUB_PROJECT_DIR is the cloned GitHub repository that will be analyzed
+    "GITHUB_PROJECT_DIR": lambda: _environ().get("GITHUB_PROJECT_DIR", ""),
+
+    # Aider settings
+    "RUN_AIDER": lambda: parse_bool_env("RUN_AIDER", True),
+    "AIDER_MAP_TOKENS": _int_env("AIDER_MAP_TOKENS", 8000),
+    "AIDER_OUTPUT_FILE": _files_path("aider_repomap.txt"),
+    "AIDER_JSON_FILE": _files_path("aider_repomap.json"),
+    # "aider" runs the Aider repo map; "ast" extracts the structure locally without an API key
+    "STRUCTURE_EXTRACTOR": lambda: _environ().get("STRUCTURE_EXTRACTOR", "aider").lower(),
+    "STRUCTURE_WORKERS": _int_env("STRUCTURE_WORKERS", os.cpu_count() or 1),
+    "REPOMAP_WORKERS": _int_env("REPOMAP_WORKERS", os.cpu_count() or 1),
+
+    # Privado settings
+    "RUN_PRIVADO": lambda: parse_bool_env("RUN_PRIVADO", True),
+    "PRIVADO_OUTPUT_FILE": _files_path("privado.json"),
+    "PRIVADO_CSV_FILE": _files_path("privado_output.csv"),
+    # PRIVADO_CLI_PATH is the directory containing the privado executable
+    "PRIVADO_CLI_PATH": lambda: _environ().get("PRIVADO_CLI_PATH", ""),
+
+    # Bearer settings
+    "RUN_BEARER": lambda: parse_bool_env("RUN_BEARER", True),
+    "BEARER_FORMAT": lambda: _environ().get("BEARER_FORMAT", "json").lower(),
+    "BEARER_OUTPUT_FILE": _files_path("bearer_output.txt"),
+    "BEARER_JSON_FILE": _files_path("bearer_output.json"),
+    # The report the Bearer scanner writes and the processor reads
+    "BEARER_REPORT_FILE": lambda: (__getattr__("BEARER_JSON_FILE") if __getattr__("BEARER_FORMAT") == "json"
+                                   else __getattr__("BEARER_OUTPUT_FILE")),
+    "BEARER_CSV_FILE": _files_path("bearer_output.csv"),
+
+    # OpenAI settings
+    "OPENAI_MODEL": lambda: _environ().get("OPENAI_MODEL", "gpt-4o-mini"),
+    "OPENAI_BATCH_SIZE": _int_env("OPENAI_BATCH_SIZE", 5),
+    "OPENAI_MAX_RETRIES": _int_env("OPENAI_MAX_RETRIES", 5),
+    "OPENAI_TIMEOUT": _float_env("OPENAI_TIMEOUT", 60),
+    "OPENAI_RETRY_BASE_DELAY": _float_env("OPENAI_RETRY_BASE_DELAY", 0.5),
+    "OPENAI_RETRY_MAX_DELAY": _float_env("OPENAI_RETRY_MAX_DELAY", 60),
+    "OPENAI_HEDGE_AFTER": _float_env("OPENAI_HEDGE_AFTER", 0),
+    "CIRCUIT_BREAKER_FAILURES": _int_env("CIRCUIT_BREAKER_FAILURES", 10),
+    "CIRCUIT_BREAKER_RESET": _float_env("CIRCUIT_BREAKER_RESET", 30),
+    "OPENAI_MAX_COMPLETION_TOKENS": _int_env("OPENAI_MAX_COMPLETION_TOKENS", 300),
+    "ENRICH_TOKEN_BUDGET": _int_env("ENRICH_TOKEN_BUDGET", 0),
+    "PROMPT_SNIPPET_LINES": _int_env("PROMPT_SNIPPET_LINES", 15),
+    "PROMPT_LINE_CHARS": _int_env("PROMPT_LINE_CHARS", 200),
+    "PROMPT_PATH_HOPS": _int_env("PROMPT_PATH_HOPS", 8),
+    "SINK_RULES": lambda: parse_bool_env("SINK_RULES", True),
+    "SINK_RULES_FILE": lambda: _environ().get("SINK_RULES_FILE", ""),
+    "SINK_RULES_COVERAGE_FILE": _files_path("sink_rules_coverage.json"),
+    "SINK_CLUSTERING": lambda: parse_bool_env("SINK_CLUSTERING", True),
+    "SINK_CLUSTER_THRESHOLD": _float_env("SINK_CLUSTER_THRESHOLD", 0.8),
+
+    # Output settings
+    # "auto" uses orjson when it is installed and the json module otherwise
+    "JSON_BACKEND": lambda: _environ().get("JSON_BACKEND", "auto").lower(),
+    "JSON_PRETTY": lambda: parse_bool_env("JSON_PRETTY", False),
+    "FINAL_CSV_FILE": _files_path("output.csv"),
+    "METRICS_FILE": _files_path("metrics.json"),
+    "EXPORT_PARQUET": lambda: parse_bool_env("EXPORT_PARQUET", True),
+    "PARQUET_DIR": _files_path("parquet"),
+    "PARQUET_ROW_GROUP_SIZE": _int_env("PARQUET_ROW_GROUP_SIZE", 50000),
+    "EXPORT_SQLITE": lambda: parse_bool_env("EXPORT_SQLITE", True),
+    "ANALYSIS_DB_FILE": _files_path("analysis.db"),
+    "SEARCH_INDEX": lambda: parse_bool_env("SEARCH_INDEX", True),
+
+    # Profiling settings
+    # Empty by default: stages run without profiling
+    "PROFILE_STAGES": lambda: _environ().get("PROFILE_STAGES", ""),
+    "PROFILE_DIR": _files_path("profiles"),
+
+    # Checkpoint settings
+    "RESUME": lambda: parse_bool_env("RESUME", False),
+    "CHECKPOINT_DIR": _files_path("checkpoints"),
+    "ENRICH_CHECKPOINT_ROWS": _int_env("ENRICH_CHECKPOINT_ROWS", 50),
+
+    # Resource limits shared by the pipelines of a batch (see batch_process.py)
+    # Empty by default: a single pipeline run takes no slots
+    "RESOURCE_LIMITS_DIR": lambda: _environ().get("RESOURCE_LIMITS_DIR", ""),
+    "SCANNER_CONCURRENCY": _int_env("SCANNER_CONCURRENCY", os.cpu_count() or 1),
+    "LLM_CONCURRENCY": _int_env("LLM_CONCURRENCY", 8),
+}
+
+def __getattr__(name):
+    """
+    Resolve a setting from the environment when it is read (PEP 562).
+    """
+    if name in _SETTINGS:
+        load_env()
+        return _SETTINGS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_SETTINGS))
+
+def log_configuration():
+    """
+    Print where the configuration comes from and warn about missing directories.
+    """
+    if os.path.exists(DOTENV_PATH):
+        print(f"Loading environment variables from {DOTENV_PATH}")
+    else:
+        print("No .env file found. Using environment variables from the system.")
+    load_env()
+
+    project_dir = __getattr__("DEFAULT_PROJECT_DIR")
+    if project_dir:
+        print(f"Using local project directory from environment: {project_dir}")
+        if not os.path.isdir(project_dir):
+            print(f"Warning: Project directory '{project_dir}' does not exist.")
+
+    github_project_dir = __getattr__("GITHUB_PROJECT_DIR")
+    if github_project_dir:
+        print(f"Using GitHub project directory from environment: {github_project_dir}")
+        if not os.path.isdir(github_project_dir):
+            print(f"Warning: GitHub project directory '{github_project_dir}' does not exist.")
+
+    privado_cli_path = __getattr__("PRIVADO_CLI_PATH")
+    if privado_cli_path:
+        print(f"Using Privado CLI path from environment: {privado_cli_path}")
+        if not os.path.isdir(privado_cli_path):
+            print(f"Warning: Privado CLI directory '{privado_cli_path}' does not exist.")
 
 # File paths
 def get_absolute_path(file_path):
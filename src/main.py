@@ -8,34 +8,36 @@ from src.utils import (
     delete_script,
     copy_file
 )
+from src.utils.metrics import stage, start_run, finish_run, write_metrics
+from src.utils.checkpoints import (
+    file_digest,
+    project_digest,
+    is_stage_complete,
+    mark_stage_complete,
+    clear_checkpoints
+)
+from src.utils.resource_limits import slot
 
 from src.scanners import (
     run_aider_scan,
     run_privado_scan,
-    run_bearer_scan
+    run_bearer_scan,
+    run_ast_scan
 )
 
 from src.processors import (
     convert_to_json,
+    enrichment_inputs,
     process_privado_data,
     update_json_with_sink_details,
     process_bearer_data,
     update_json_with_vulnerabilities,
-    convert_json_to_csv
+    convert_json_to_csv,
+    export_parquet,
+    export_sqlite
 )
 
-from src.config import (
-    DEFAULT_PROJECT_DIR,
-    GITHUB_PROJECT_DIR,
-    RUN_AIDER,
-    RUN_PRIVADO,
-    RUN_BEARER,
-    AIDER_OUTPUT_FILE,
-    AIDER_JSON_FILE,
-    PRIVADO_OUTPUT_FILE,
-    BEARER_OUTPUT_FILE,
-    FILES_DIR
-)
+from src import config
 
 def get_project_directory(is_github_repo=False):
     """
@@ -50,11 +52,11 @@ def get_project_directory(is_github_repo=False):
     """
     if is_github_repo:
         # For GitHub repos, use the current working directory as fallback
-        project_dir = os.environ.get("GITHUB_PROJECT_DIR") or os.getcwd()
+        project_dir = config.GITHUB_PROJECT_DIR or os.getcwd()
         print(f"Using GitHub project directory: {project_dir}")
     else:
-        if DEFAULT_PROJECT_DIR:
-            project_dir = DEFAULT_PROJECT_DIR
+        if config.DEFAULT_PROJECT_DIR:
+            project_dir = config.DEFAULT_PROJECT_DIR
             print(f"Using target project directory from configuration: {project_dir}")
         else:
             project_dir = input("Enter the project target directory (the directory you want to analyze): ")
@@ -78,64 +80,114 @@ def get_project_directory(is_github_repo=False):
     
     return os.path.abspath(project_dir)
 
-def run_aider_task(project_dir):
+def run_stage(name, task, inputs, outputs, resume=False, limit=None):
+    """
+    Run a pipeline stage and record its completion, or skip it when resuming
+    and it already completed with the same inputs.
+    
+    Args:
+        name (str): Stage name
+        task (callable): Runs the stage and returns a false value on failure
+        inputs (dict): Digests of the stage inputs, taken before the stage runs
+        outputs (list): Paths of the files the stage writes
+        resume (bool, optional): Whether completed stages may be skipped. Defaults to False.
+        limit (str, optional): Kind of resource slot the stage holds while it runs
+            (see resource_limits). Defaults to None.
+        
+    Returns:
+        The result of the task, or the first output path if the stage was skipped
+    """
+    if resume and is_stage_complete(name, inputs, outputs):
+        print(f"Skipping {name}: completed with the same inputs in the previous run.")
+        with stage(name) as record:
+            record["status"] = "skipped"
+        return outputs[0]
+    
+    if limit:
+        # Waiting for a slot is not part of the stage's time
+        with slot(limit), stage(name):
+            result = task()
+    else:
+        with stage(name):
+            result = task()
+    if result:
+        mark_stage_complete(name, inputs, outputs)
+    return result
+
+def run_aider_task(project_dir, project_hash, resume=False):
     """
     Run the Aider task.
     
     Args:
         project_dir (str): Path to the project directory
+        project_hash (str): Digest of the project files
+        resume (bool, optional): Whether completed stages may be skipped. Defaults to False.
         
     Returns:
         str: Path to the JSON file or None if an error occurred
     """
     # Run Aider scan
-    input_file = run_aider_scan(project_dir)
+    input_file = run_stage("aider_scan", lambda: run_aider_scan(project_dir),
+                           {"project": project_hash, "map_tokens": config.AIDER_MAP_TOKENS},
+                           [config.AIDER_OUTPUT_FILE], resume, limit="scanner")
     
     # Verify the file exists in the files directory
-    if not os.path.exists(AIDER_OUTPUT_FILE):
-        print(f"Warning: {AIDER_OUTPUT_FILE} not found in files directory.")
+    if not os.path.exists(config.AIDER_OUTPUT_FILE):
+        print(f"Warning: {config.AIDER_OUTPUT_FILE} not found in files directory.")
         remote_file = os.path.join(project_dir, "aider_repomap.txt")
         if os.path.exists(remote_file):
-            print(f"Copying from {remote_file} to {AIDER_OUTPUT_FILE}...")
-            copy_file(remote_file, AIDER_OUTPUT_FILE)
-            input_file = AIDER_OUTPUT_FILE
+            print(f"Copying from {remote_file} to {config.AIDER_OUTPUT_FILE}...")
+            copy_file(remote_file, config.AIDER_OUTPUT_FILE)
+            input_file = config.AIDER_OUTPUT_FILE
             print("File copied successfully.")
         else:
             print(f"Error: Could not find aider_repomap.txt in {project_dir} either.")
             return None
     
     # Convert to JSON
-    json_file = convert_to_json(input_file)
+    json_file = run_stage("repomap_parse", lambda: convert_to_json(input_file),
+                          {"repomap": file_digest(input_file)},
+                          [config.AIDER_JSON_FILE], resume)
     
     # Delete aider script
-    delete_script(os.path.join(FILES_DIR, "run_aider.sh"))
+    delete_script(os.path.join(config.FILES_DIR, "run_aider.sh"))
     
     return json_file
 
-def run_privado_task(project_dir):
+def run_privado_task(project_dir, project_hash, resume=False):
     """
     Run the Privado task.
     
     Args:
         project_dir (str): Path to the project directory
+        project_hash (str): Digest of the project files
+        resume (bool, optional): Whether completed stages may be skipped and the
+            enrichment continued from its last checkpoint. Defaults to False.
         
     Returns:
         bool: True if successful, False otherwise
     """
     try:
         # Run Privado scan
-        privado_json = run_privado_scan(project_dir)
+        privado_json = run_stage("privado_scan", lambda: run_privado_scan(project_dir),
+                                 {"project": project_hash},
+                                 [config.PRIVADO_OUTPUT_FILE], resume, limit="scanner")
         
         # Check if privado.json exists before proceeding
-        if not os.path.exists(PRIVADO_OUTPUT_FILE):
-            print(f"Error: {PRIVADO_OUTPUT_FILE} not found. Skipping privado processing.")
+        if not os.path.exists(config.PRIVADO_OUTPUT_FILE):
+            print(f"Error: {config.PRIVADO_OUTPUT_FILE} not found. Skipping privado processing.")
             return False
         
         # Process Privado data
-        process_privado_data()
+        # The stage checkpoint and the progress of the enrichment are keyed on the same inputs
+        enrich_inputs = enrichment_inputs()
+        run_stage("privado_enrich", lambda: process_privado_data(resume, enrich_inputs),
+                  enrich_inputs, [config.PRIVADO_CSV_FILE], resume)
         
         # Update JSON with sink details
-        update_json_with_sink_details()
+        run_stage("privado_merge", update_json_with_sink_details,
+                  {"tree": file_digest(config.AIDER_JSON_FILE), "sinks": file_digest(config.PRIVADO_CSV_FILE)},
+                  [config.AIDER_JSON_FILE], resume)
         
         return True
     except Exception as e:
@@ -143,30 +195,39 @@ def run_privado_task(project_dir):
         print("Skipping privado processing.")
         return False
 
-def run_bearer_task(project_dir):
+def run_bearer_task(project_dir, project_hash, resume=False):
     """
     Run the Bearer task.
     
     Args:
         project_dir (str): Path to the project directory
+        project_hash (str): Digest of the project files
+        resume (bool, optional): Whether completed stages may be skipped. Defaults to False.
         
     Returns:
         bool: True if successful, False otherwise
     """
     try:
         # Run Bearer scan
-        bearer_output = run_bearer_scan(project_dir)
+        bearer_output = run_stage("bearer_scan", lambda: run_bearer_scan(project_dir),
+                                  {"project": project_hash, "format": config.BEARER_FORMAT},
+                                  [config.BEARER_REPORT_FILE], resume, limit="scanner")
         
-        # Check if bearer_output.txt exists before proceeding
-        if not os.path.exists(BEARER_OUTPUT_FILE):
-            print(f"Error: {BEARER_OUTPUT_FILE} not found. Skipping bearer processing.")
+        # Check if the bearer report exists before proceeding
+        if not os.path.exists(config.BEARER_REPORT_FILE):
+            print(f"Error: {config.BEARER_REPORT_FILE} not found. Skipping bearer processing.")
             return False
         
         # Process Bearer data
-        process_bearer_data()
+        run_stage("bearer_parse", process_bearer_data,
+                  {"report": file_digest(config.BEARER_REPORT_FILE)},
+                  [config.BEARER_CSV_FILE], resume)
         
         # Update JSON with vulnerabilities
-        update_json_with_vulnerabilities()
+        run_stage("bearer_merge", update_json_with_vulnerabilities,
+                  {"tree": file_digest(config.AIDER_JSON_FILE),
+                   "vulnerabilities": file_digest(config.BEARER_CSV_FILE)},
+                  [config.AIDER_JSON_FILE], resume)
         
         return True
     except Exception as e:
@@ -174,16 +235,61 @@ def run_bearer_task(project_dir):
         print("Skipping bearer processing.")
         return False
 
-def main(is_github_repo=False):
+def save_run_metrics(status):
+    """
+    Finish recording the run and write its metrics to metrics.json.
+    
+    Args:
+        status (str): Outcome of the run
+    """
+    run = finish_run(status)
+    if run is None:
+        return
+    try:
+        write_metrics(run, config.METRICS_FILE)
+        print(f"Run metrics written to {config.METRICS_FILE}")
+    except Exception as e:
+        print(f"Error writing run metrics: {e}")
+
+def main(is_github_repo=False, resume=None, environ=None):
     """
     Main function that orchestrates the entire process.
     
+    The settings of the run are resolved from a copy of the environment taken
+    when it starts, so a caller running several pipelines in threads passes
+    each one its own FILES_DIR and project directory instead of changing
+    os.environ.
+    
+    Args:
+        is_github_repo (bool): Whether to use the GitHub project directory
+        resume (bool, optional): Skip the stages the previous run completed and
+            continue its enrichment from the last checkpoint. Defaults to RESUME.
+        environ (dict, optional): Environment variables that apply to this run
+            only, on top of os.environ. Defaults to None.
+    """
+    with config.use_environment(environ):
+        run_pipeline(is_github_repo, resume)
+
+def run_pipeline(is_github_repo=False, resume=None):
+    """
+    Run the pipeline stages with the current settings.
+    
     Args:
         is_github_repo (bool): Whether to use the GitHub project directory
+        resume (bool, optional): Whether to resume the previous run. Defaults to RESUME.
     """
+    config.log_configuration()
+    if resume is None:
+        resume = config.RESUME
+    start_run(is_github_repo=is_github_repo, resume=resume)
+    run_status = "error"
     try:
         # Ensure files directory exists
-        os.makedirs(FILES_DIR, exist_ok=True)
+        os.makedirs(config.FILES_DIR, exist_ok=True)
+        if resume:
+            print("Resuming from the checkpoints of the previous run...")
+        else:
+            clear_checkpoints()
         
         # Check if OpenAI API key is set
         if not os.environ.get("OPENAI_API_KEY"):
@@ -194,45 +300,73 @@ def main(is_github_repo=False):
             
         # Task 1: Get project directory and run aider
         project_dir = get_project_directory(is_github_repo)
+        project_hash = project_digest(project_dir)
         
-        if RUN_AIDER:
-            print("Running Aider scan...")
-            json_file = run_aider_task(project_dir)
+        if config.RUN_AIDER:
+            if config.STRUCTURE_EXTRACTOR == "ast":
+                print("Extracting code structure locally...")
+                json_file = run_stage("ast_scan", lambda: run_ast_scan(project_dir),
+                                      {"project": project_hash},
+                                      [config.AIDER_JSON_FILE], resume, limit="scanner")
+            else:
+                print("Running Aider scan...")
+                json_file = run_aider_task(project_dir, project_hash, resume)
             
             if not json_file:
                 print("Error: Failed to create JSON file. Exiting.")
                 sys.exit(1)
         else:
             print("Skipping Aider scan as per configuration.")
-            if not os.path.exists(AIDER_JSON_FILE):
-                print(f"Error: {AIDER_JSON_FILE} not found. Cannot proceed without it.")
+            if not os.path.exists(config.AIDER_JSON_FILE):
+                print(f"Error: {config.AIDER_JSON_FILE} not found. Cannot proceed without it.")
                 sys.exit(1)
         
         # Task 2: Run Privado scan and process data
-        if RUN_PRIVADO:
+        if config.RUN_PRIVADO:
             print("Running Privado scan...")
-            run_privado_task(project_dir)
+            run_privado_task(project_dir, project_hash, resume)
         else:
             print("Skipping Privado scan as per configuration.")
         
         # Task 3: Run Bearer scan and process data
-        if RUN_BEARER:
+        if config.RUN_BEARER:
             print("Running Bearer scan...")
-            run_bearer_task(project_dir)
+            run_bearer_task(project_dir, project_hash, resume)
         else:
             print("Skipping Bearer scan as per configuration.")
         
         # Task 4: Convert JSON to CSV
-        convert_json_to_csv()
+        run_stage("json_to_csv", convert_json_to_csv,
+                  {"tree": file_digest(config.AIDER_JSON_FILE)},
+                  [config.FINAL_CSV_FILE], resume)
+        
+        # Task 5: Export Parquet tables
+        if config.EXPORT_PARQUET:
+            run_stage("parquet_export", export_parquet,
+                      {"tree": file_digest(config.AIDER_JSON_FILE),
+                       "row_group_size": config.PARQUET_ROW_GROUP_SIZE},
+                      [config.PARQUET_DIR], resume)
+        
+        # Task 6: Write the SQLite analysis database
+        if config.EXPORT_SQLITE:
+            run_stage("sqlite_export", export_sqlite,
+                      {"tree": file_digest(config.AIDER_JSON_FILE),
+                       "sinks": file_digest(config.PRIVADO_CSV_FILE),
+                       "search_index": config.SEARCH_INDEX},
+                      [config.ANALYSIS_DB_FILE], resume)
         
+        run_status = "success"
         print("All requested tasks completed successfully!")
-        print(f"All output files are available in the '{FILES_DIR}' directory.")
+        print(f"All output files are available in the '{config.FILES_DIR}' directory.")
     except KeyboardInterrupt:
+        run_status = "cancelled"
         print("\nOperation cancelled by user.")
         sys.exit(1)
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
         sys.exit(1)
+    finally:
+        save_run_metrics(run_status)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,381 @@
+"""
+Compact in-memory model of the analysis tree stored in aider_repomap.json.
+
+Every node type uses __slots__ instead of a per-instance dict, and the
+per-file collections (sinks, vulnerabilities, ...) are only allocated once
+something is added to them. The model serializes to and from the existing
+JSON schema exactly:
+
+    {"name": ..., "children": [...]}                        directory
+    {"name": ..., "structure": {"classes": [...], "other": ...},
+     "source": [], "data_model": [], "third_party_dependencies": [],
+     "sink_details": [...], "vulnerabilities": [...]}       file
+"""
+
+import json
+
+from src.utils.json_utils import write_json
+
+_EMPTY = ()
+
+
+class MethodInfo:
+    """
+    A method of a class in a file summary.
+    """
+    __slots__ = ("name", "code")
+
+    def __init__(self, name, code):
+        self.name = name
+        self.code = code
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["code"])
+
+    def to_dict(self, deep=True):
+        return {"name": self.name, "code": self.code}
+
+
+class ClassInfo:
+    """
+    A class in a file summary with its body and methods.
+    """
+    __slots__ = ("name", "class_body", "methods")
+
+    def __init__(self, name, class_body, methods=None):
+        self.name = name
+        self.class_body = class_body
+        self.methods = methods if methods is not None else []
+
+    @classmethod
+    def from_dict(cls, data):
+        methods = [m if isinstance(m, MethodInfo) else MethodInfo.from_dict(m) for m in data["methods"]]
+        return cls(data["name"], data["class_body"], methods)
+
+    def to_dict(self, deep=True):
+        return {
+            "name": self.name,
+            "class_body": self.class_body,
+            "methods": [m.to_dict() for m in self.methods] if deep else self.methods
+        }
+
+
+class SinkDetail:
+    """
+    A Privado data sink found in a file, enriched by the LLM.
+    """
+    __slots__ = ("ai_sink_label", "code_summary", "code_snippet", "line_number", "column_number")
+
+    def __init__(self, ai_sink_label, code_summary, code_snippet, line_number, column_number):
+        self.ai_sink_label = ai_sink_label
+        self.code_summary = code_summary
+        self.code_snippet = code_snippet
+        self.line_number = line_number
+        self.column_number = column_number
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["ai_sink_label"], data["code_summary"], data["code_snippet"],
+                   data["line_number"], data["column_number"])
+
+    def to_dict(self, deep=True):
+        return {
+            "ai_sink_label": self.ai_sink_label,
+            "code_summary": self.code_summary,
+            "code_snippet": self.code_snippet,
+            "line_number": self.line_number,
+            "column_number": self.column_number
+        }
+
+
+class Vulnerability:
+    """
+    A Bearer finding in a file.
+    """
+    __slots__ = ("code_snippet", "line_number", "risk_level", "ref_link", "message_to_fix")
+
+    def __init__(self, code_snippet, line_number, risk_level, ref_link, message_to_fix):
+        self.code_snippet = code_snippet
+        self.line_number = line_number
+        self.risk_level = risk_level
+        self.ref_link = ref_link
+        self.message_to_fix = message_to_fix
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["code_snippet"], data["line_number"], data["risk_level"],
+                   data["ref_link"], data["message_to_fix"])
+
+    def to_dict(self, deep=True):
+        return {
+            "code_snippet": self.code_snippet,
+            "line_number": self.line_number,
+            "risk_level": self.risk_level,
+            "ref_link": self.ref_link,
+            "message_to_fix": self.message_to_fix
+        }
+
+
+class DirNode:
+    """
+    A directory in the analysis tree.
+    """
+    __slots__ = ("name", "children")
+
+    def __init__(self, name, children=None):
+        self.name = name
+        self.children = children if children is not None else []
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], [node_from_dict(child) for child in data["children"]])
+
+    def to_dict(self, deep=True):
+        return {
+            "name": self.name,
+            "children": [child.to_dict() for child in self.children] if deep else self.children
+        }
+
+
+class FileNode:
+    """
+    A file in the analysis tree with its code structure and findings.
+
+    ``classes`` and ``other`` mirror the keys of the JSON "structure" object and
+    are None when the key is absent. The list attributes are allocated lazily
+    and read as empty tuples until something is added.
+    """
+    __slots__ = ("name", "_classes", "other", "_source", "_data_model",
+                 "_third_party_dependencies", "_sink_details", "_vulnerabilities")
+
+    def __init__(self, name, classes=None, other=None):
+        self.name = name
+        self._classes = classes
+        self.other = other
+        self._source = None
+        self._data_model = None
+        self._third_party_dependencies = None
+        self._sink_details = None
+        self._vulnerabilities = None
+
+    @classmethod
+    def from_structure(cls, name, structure):
+        """
+        Create a file node from a structure dict as built by parse_file_content.
+
+        Args:
+            name (str): File name
+            structure (dict): Dictionary with classes and other code
+
+        Returns:
+            FileNode: New file node
+        """
+        classes = structure.get("classes")
+        if classes is not None:
+            classes = [c if isinstance(c, ClassInfo) else ClassInfo.from_dict(c) for c in classes]
+        return cls(name, classes, structure.get("other"))
+
+    @classmethod
+    def from_dict(cls, data):
+        node = cls.from_structure(data["name"], data["structure"])
+        node._source = data["source"] or None
+        node._data_model = data["data_model"] or None
+        node._third_party_dependencies = data["third_party_dependencies"] or None
+        sinks = data["sink_details"]
+        if sinks:
+            node._sink_details = [s if isinstance(s, SinkDetail) else SinkDetail.from_dict(s) for s in sinks]
+        vulns = data["vulnerabilities"]
+        if vulns:
+            node._vulnerabilities = [v if isinstance(v, Vulnerability) else Vulnerability.from_dict(v) for v in vulns]
+        return node
+
+    @property
+    def classes(self):
+        return self._classes if self._classes is not None else _EMPTY
+
+    @property
+    def source(self):
+        return self._source if self._source is not None else _EMPTY
+
+    @property
+    def data_model(self):
+        return self._data_model if self._data_model is not None else _EMPTY
+
+    @property
+    def third_party_dependencies(self):
+        return self._third_party_dependencies if self._third_party_dependencies is not None else _EMPTY
+
+    @property
+    def sink_details(self):
+        return self._sink_details if self._sink_details is not None else _EMPTY
+
+    @property
+    def vulnerabilities(self):
+        return self._vulnerabilities if self._vulnerabilities is not None else _EMPTY
+
+    def add_sink_detail(self, sink_detail):
+        if self._sink_details is None:
+            self._sink_details = []
+        self._sink_details.append(sink_detail)
+
+    def add_vulnerability(self, vulnerability):
+        if self._vulnerabilities is None:
+            self._vulnerabilities = []
+        self._vulnerabilities.append(vulnerability)
+
+    def structure_dict(self, deep=True):
+        """
+        Build the JSON "structure" object of this file.
+
+        Args:
+            deep (bool, optional): Convert classes to dicts as well. Defaults to True.
+
+        Returns:
+            dict: Dictionary with classes and other code
+        """
+        structure = {}
+        if self._classes is not None:
+            structure["classes"] = [c.to_dict() for c in self._classes] if deep else self._classes
+        if self.other is not None:
+            structure["other"] = self.other
+        return structure
+
+    def to_dict(self, deep=True):
+        return {
+            "name": self.name,
+            "structure": self.structure_dict(deep),
+            "source": list(self.source),
+            "data_model": list(self.data_model),
+            "third_party_dependencies": list(self.third_party_dependencies),
+            "sink_details": [s.to_dict() for s in self.sink_details] if deep else list(self.sink_details),
+            "vulnerabilities": [v.to_dict() for v in self.vulnerabilities] if deep else list(self.vulnerabilities)
+        }
+
+
+MODEL_TYPES = (DirNode, FileNode, ClassInfo, MethodInfo, SinkDetail, Vulnerability)
+
+
+def node_from_dict(data):
+    """
+    Convert a directory or file dict from aider_repomap.json into a model node.
+
+    Args:
+        data (dict): Node in the JSON schema
+
+    Returns:
+        DirNode | FileNode: Model node
+    """
+    if "structure" in data:
+        return FileNode.from_dict(data)
+    return DirNode.from_dict(data)
+
+
+def _object_hook(data):
+    """
+    Convert JSON objects into model instances as soon as they are decoded, so
+    the full dict tree is never held in memory at once.
+    """
+    if "structure" in data and "name" in data:
+        return FileNode.from_dict(data)
+    if "children" in data and "name" in data:
+        return DirNode(data["name"], data["children"])
+    if "class_body" in data:
+        return ClassInfo.from_dict(data)
+    if "code" in data and "name" in data and len(data) == 2:
+        return MethodInfo.from_dict(data)
+    if "ai_sink_label" in data:
+        return SinkDetail.from_dict(data)
+    if "risk_level" in data and "message_to_fix" in data:
+        return Vulnerability.from_dict(data)
+    return data
+
+
+def json_default(obj):
+    """
+    json.dump default hook that encodes model instances one level at a time.
+    """
+    if isinstance(obj, MODEL_TYPES):
+        return obj.to_dict(deep=False)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def iter_leaves(node, parent_path=""):
+    """
+    Walk a tree depth first and yield every file node and empty directory.
+
+    The walk keeps an explicit stack of child iterators instead of recursing,
+    so memory is bounded by the depth of the tree rather than the number of
+    files, and deep trees cannot hit the recursion limit.
+
+    Args:
+        node (DirNode | FileNode): Root node
+        parent_path (str, optional): Path of the parent. Defaults to "".
+
+    Yields:
+        tuple: (path, node) in tree order, with "/" separated paths that
+            start at the root's name (e.g. "root/src/main.py")
+    """
+    root_path = f"{parent_path}/{node.name}" if parent_path else node.name
+    if not (isinstance(node, DirNode) and node.children):
+        yield root_path, node
+        return
+    # Each entry is (path of the directory, iterator over its remaining children)
+    stack = [(root_path, iter(node.children))]
+    while stack:
+        dir_path, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+        child_path = f"{dir_path}/{child.name}"
+        if isinstance(child, DirNode) and child.children:
+            stack.append((child_path, iter(child.children)))
+        else:
+            yield child_path, child
+
+
+def iter_files(tree):
+    """
+    Yield the file nodes of a tree with their paths relative to the project.
+
+    Args:
+        tree (DirNode): Root of the tree
+
+    Yields:
+        tuple: (path, FileNode), e.g. ("src/main.py", node)
+    """
+    for path, node in iter_leaves(tree):
+        if isinstance(node, FileNode):
+            yield path.partition("/")[2], node
+
+
+def load_tree(file_path):
+    """
+    Load aider_repomap.json into model nodes.
+
+    Args:
+        file_path (str): Path to the JSON file
+
+    Returns:
+        DirNode: Root of the tree
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f, object_hook=_object_hook)
+
+
+def dump_tree(tree, file_path, pretty=None, backend=None):
+    """
+    Write a model tree to aider_repomap.json in the existing schema.
+
+    Directories are written one child at a time, so only a single file node
+    is encoded in memory at once.
+
+    Args:
+        tree (DirNode): Root of the tree
+        file_path (str): Path to the JSON file
+        pretty (bool, optional): Indent the output. Defaults to JSON_PRETTY.
+        backend (str, optional): Serialization backend. Defaults to JSON_BACKEND.
+    """
+    write_json(tree, file_path, pretty=pretty, default=json_default,
+               split=lambda obj: isinstance(obj, DirNode), backend=backend)
@@ -1,13 +1,18 @@
 from src.processors.repomap_processor import convert_to_json
-from src.processors.privado_processor import process_privado_data, update_json_with_sink_details
+from src.processors.privado_processor import enrichment_inputs, process_privado_data, update_json_with_sink_details
 from src.processors.bearer_processor import process_bearer_data, update_json_with_vulnerabilities
 from src.processors.json_to_csv_processor import convert_json_to_csv
+from src.processors.parquet_processor import export_parquet
+from src.processors.sqlite_processor import export_sqlite
 
 __all__ = [
     'convert_to_json',
+    'enrichment_inputs',
     'process_privado_data',
     'update_json_with_sink_details',
     'process_bearer_data',
     'update_json_with_vulnerabilities',
-    'convert_json_to_csv'
+    'convert_json_to_csv',
+    'export_parquet',
+    'export_sqlite'
 ] 
\ No newline at end of file
@@ -1,8 +1,10 @@
 import os
 import csv
 import re
-import json
-from src.config import BEARER_OUTPUT_FILE, BEARER_CSV_FILE, AIDER_JSON_FILE
+from src import config
+from src.utils.json_stream import iter_items
+from src.models import DirNode, FileNode, Vulnerability, load_tree, dump_tree
+from src.utils.metrics import add_count, counted
 
 # Regular expression patterns for different parts of the report
 RISK_RE = re.compile(r"^(LOW|MEDIUM|HIGH):\s*(.+)$")
@@ -10,17 +12,22 @@ URL_RE = re.compile(r"^(https?://\S+)$")
 MESSAGE_RE = re.compile(r"^To ignore this finding, run:\s*(.+)$")
 FILE_RE = re.compile(r"^File:\s*(.+):(\d+)", re.IGNORECASE)
 
+# Severity groups at the top level of Bearer's JSON security report
+BEARER_SEVERITIES = ("critical", "high", "medium", "low", "warning")
+
 def parse_bearer_report(input_file):
     """
     Parse the Bearer report file.
     
+    The report is read line by line and records are yielded as soon as they
+    are complete, so memory use does not grow with the size of the report.
+    
     Args:
         input_file (str): Path to the Bearer report file
         
-    Returns:
-        list: List of dictionaries containing vulnerability information
+    Yields:
+        dict: Vulnerability information
     """
-    records = []
     # Initialize an empty record with required columns
     current_record = {
         "File Name": "",
@@ -31,79 +38,100 @@ def parse_bearer_report(input_file):
         "Message To Fix": ""
     }
     
-    with open(input_file, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    
     # State variables for parsing
     in_code_block = False
     code_lines = []
     
-    for line in lines:
-        line = line.rstrip()
-        
-        # Check if we're entering or exiting a code block
-        if line.startswith("```"):
+    with open(input_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip()
+            
+            # Check if we're entering or exiting a code block
+            if line.startswith("```"):
+                if in_code_block:
+                    # Exiting code block, save the code snippet
+                    current_record["Code Snippet"] = "\n".join(code_lines)
+                    code_lines = []
+                in_code_block = not in_code_block
+                continue
+            
+            # If we're in a code block, collect the code lines
             if in_code_block:
-                # Exiting code block, save the code snippet
-                current_record["Code Snippet"] = "\n".join(code_lines)
-                code_lines = []
-            in_code_block = not in_code_block
-            continue
-        
-        # If we're in a code block, collect the code lines
-        if in_code_block:
-            code_lines.append(line)
-            continue
-        
-        # Check for risk level and title
-        risk_match = RISK_RE.match(line)
-        if risk_match:
-            # If we have a previous record with data, save it
-            if current_record["File Name"] and current_record["Risk Level"]:
-                records.append(current_record.copy())
+                code_lines.append(line)
+                continue
             
-            # Start a new record
-            current_record = {
-                "File Name": "",
-                "Code Snippet": "",
-                "Line Number": "",
-                "Risk Level": risk_match.group(1),  # LOW, MEDIUM, or HIGH
-                "Ref Link": "",
-                "Message To Fix": ""
-            }
-            continue
-        
-        # Check for URL (reference link)
-        url_match = URL_RE.match(line)
-        if url_match and current_record["Risk Level"]:
-            current_record["Ref Link"] = url_match.group(1)
-            continue
-        
-        # Check for file information
-        file_match = FILE_RE.match(line)
-        if file_match and current_record["Risk Level"]:
-            current_record["File Name"] = file_match.group(1)
-            current_record["Line Number"] = file_match.group(2)
-            continue
-        
-        # Check for message to fix
-        message_match = MESSAGE_RE.match(line)
-        if message_match and current_record["Risk Level"]:
-            current_record["Message To Fix"] = message_match.group(1)
-            continue
+            # Check for risk level and title
+            risk_match = RISK_RE.match(line)
+            if risk_match:
+                # If we have a previous record with data, emit it
+                if current_record["File Name"] and current_record["Risk Level"]:
+                    yield current_record
+                
+                # Start a new record
+                current_record = {
+                    "File Name": "",
+                    "Code Snippet": "",
+                    "Line Number": "",
+                    "Risk Level": risk_match.group(1),  # LOW, MEDIUM, or HIGH
+                    "Ref Link": "",
+                    "Message To Fix": ""
+                }
+                continue
+            
+            # Check for URL (reference link)
+            url_match = URL_RE.match(line)
+            if url_match and current_record["Risk Level"]:
+                current_record["Ref Link"] = url_match.group(1)
+                continue
+            
+            # Check for file information
+            file_match = FILE_RE.match(line)
+            if file_match and current_record["Risk Level"]:
+                current_record["File Name"] = file_match.group(1)
+                current_record["Line Number"] = file_match.group(2)
+                continue
+            
+            # Check for message to fix
+            message_match = MESSAGE_RE.match(line)
+            if message_match and current_record["Risk Level"]:
+                current_record["Message To Fix"] = message_match.group(1)
+                continue
     
-    # Don't forget to add the last record if it has data
+    # Don't forget to emit the last record if it has data
     if current_record["File Name"] and current_record["Risk Level"]:
-        records.append(current_record.copy())
+        yield current_record
+
+def parse_bearer_json_report(input_file):
+    """
+    Parse a Bearer report produced with --format json.
+    
+    Findings are streamed from the file one at a time, so memory use does not
+    grow with the size of the report.
     
-    return records
+    Args:
+        input_file (str): Path to the Bearer JSON report file
+        
+    Yields:
+        dict: Vulnerability information in the same shape as parse_bearer_report
+    """
+    item_prefixes = [f"{severity}.item" for severity in BEARER_SEVERITIES]
+    for prefix, finding in iter_items(input_file, item_prefixes):
+        fingerprint = finding.get("fingerprint", "")
+        yield {
+            "File Name": finding.get("filename") or finding.get("full_filename", ""),
+            "Code Snippet": finding.get("code_extract") or finding.get("snippet", ""),
+            "Line Number": str(finding.get("line_number", "")),
+            "Risk Level": prefix.split(".", 1)[0].upper(),
+            "Ref Link": finding.get("documentation_url", ""),
+            "Message To Fix": f"bearer ignore add {fingerprint}" if fingerprint else ""
+        }
 
 def write_to_csv(records, output_file):
     """
     Write records to a CSV file.
     
     Args:
-        records (list): List of dictionaries containing vulnerability information
+        records (iterable): Dictionaries containing vulnerability information
         output_file (str): Path to the output CSV file
     """
     fieldnames = ["File Name", "Code Snippet", "Line Number", "Risk Level", "Ref Link", "Message To Fix"]
@@ -117,8 +145,8 @@ def process_bearer_data():
     Process Bearer data and create a CSV file.
     """
     try:
-        input_file = BEARER_OUTPUT_FILE
-        output_file = BEARER_CSV_FILE
+        input_file = config.BEARER_REPORT_FILE
+        output_file = config.BEARER_CSV_FILE
         
         # Check if input file exists
         if not os.path.exists(input_file):
@@ -126,8 +154,11 @@ def process_bearer_data():
             return None
         
         # Parse bearer report and write to CSV
-        parsed_data = parse_bearer_report(input_file)
-        write_to_csv(parsed_data, output_file)
+        if input_file.endswith(".json"):
+            parsed_data = parse_bearer_json_report(input_file)
+        else:
+            parsed_data = parse_bearer_report(input_file)
+        write_to_csv(counted(parsed_data, "findings"), output_file)
         
         if os.path.exists(output_file):
             print(f"Successfully created: {output_file}")
@@ -145,23 +176,23 @@ def update_vulnerabilities(json_tree, csv_file):
     Update the JSON tree with vulnerabilities from the CSV file.
     
     Args:
-        json_tree (dict): JSON tree to update
+        json_tree (DirNode): JSON tree to update
         csv_file (str): Path to the CSV file
         
     Returns:
-        dict: Updated JSON tree
+        DirNode: Updated JSON tree
     """
     def find_file_node(node, target, current_path=""):
         """
         Find a file node in the JSON tree.
         
         Args:
-            node (dict): Current node
+            node (DirNode | FileNode): Current node
             target (str): Target file path
             current_path (str, optional): Current path. Defaults to "".
             
         Returns:
-            dict: File node if found, None otherwise
+            FileNode: File node if found, None otherwise
         """
         # Normalize paths for comparison
         target = target.replace('\\', '/')
@@ -170,16 +201,16 @@ def update_vulnerabilities(json_tree, csv_file):
         target_basename = os.path.basename(target)
         target_dirname = os.path.dirname(target)
         
-        # If this is a file node (has "structure"), check if it matches
-        if "structure" in node:
-            full_path = current_path + node["name"]
+        # If this is a file node, check if it matches
+        if isinstance(node, FileNode):
+            full_path = current_path + node.name
             
             # Try exact match first
             if full_path == target:
                 return node
                 
             # Try matching just the basename if paths don't match exactly
-            if node["name"] == target_basename:
+            if node.name == target_basename:
                 # Check if the parent directory matches the end of the target directory
                 parent_path = current_path.rstrip('/')
                 if parent_path and target_dirname.endswith(parent_path):
@@ -187,12 +218,12 @@ def update_vulnerabilities(json_tree, csv_file):
         
         # Prepare new path: skip adding "root" to the path.
         new_path = current_path
-        if node.get("name") and node["name"] != "root":
-            new_path = current_path + node["name"] + "/"
+        if node.name and node.name != "root":
+            new_path = current_path + node.name + "/"
         
         # If this node has children, recursively search them.
-        if "children" in node:
-            for child in node["children"]:
+        if isinstance(node, DirNode):
+            for child in node.children:
                 result = find_file_node(child, target, new_path)
                 if result:
                     return result
@@ -202,13 +233,13 @@ def update_vulnerabilities(json_tree, csv_file):
         reader = csv.DictReader(f)
         for row in reader:
             file_path = row["File Name"]
-            vulnerability = {
-                "code_snippet": row["Code Snippet"],
-                "line_number": row["Line Number"],
-                "risk_level": row["Risk Level"],
-                "ref_link": row["Ref Link"],
-                "message_to_fix": row["Message To Fix"]
-            }
+            vulnerability = Vulnerability(
+                code_snippet=row["Code Snippet"],
+                line_number=row["Line Number"],
+                risk_level=row["Risk Level"],
+                ref_link=row["Ref Link"],
+                message_to_fix=row["Message To Fix"]
+            )
             
             # Try to find the file node in the JSON tree
             node = find_file_node(json_tree, file_path)
@@ -226,19 +257,24 @@ def update_vulnerabilities(json_tree, csv_file):
             
             if node:
                 # Append the vulnerability to the node's "vulnerabilities" list.
-                node["vulnerabilities"].append(vulnerability)
+                node.add_vulnerability(vulnerability)
+                add_count("vulnerabilities")
             else:
                 print(f"Warning: File '{file_path}' not found in JSON tree.")
+                add_count("unmatched")
     
     return json_tree
 
 def update_json_with_vulnerabilities():
     """
     Update the JSON tree with vulnerabilities from the CSV file.
+    
+    Returns:
+        str: Path to the updated JSON file or None if an error occurred
     """
     try:
-        output_json_file = AIDER_JSON_FILE  # JSON file generated in Task 2
-        csv_file = BEARER_CSV_FILE          # CSV file from bearer processing
+        output_json_file = config.AIDER_JSON_FILE  # JSON file generated in Task 2
+        csv_file = config.BEARER_CSV_FILE          # CSV file from bearer processing
         
         # Check if both files exist
         if not os.path.exists(output_json_file):
@@ -250,16 +286,16 @@ def update_json_with_vulnerabilities():
             return
         
         # Load the current JSON tree
-        with open(output_json_file, 'r', encoding='utf-8') as f:
-            json_tree = json.load(f)
+        json_tree = load_tree(output_json_file)
         
         # Update the tree with vulnerabilities from the CSV
         updated_tree = update_vulnerabilities(json_tree, csv_file)
         
         # Write the updated tree back to the JSON file
-        with open(output_json_file, 'w', encoding='utf-8') as f:
-            json.dump(updated_tree, f, indent=4, ensure_ascii=False)
+        dump_tree(updated_tree, output_json_file)
         
         print(f"Successfully updated {output_json_file} with vulnerabilities from {csv_file}")
+        return output_json_file
     except Exception as e:
-        print(f"Error updating JSON with vulnerabilities: {e}")
\ No newline at end of file
+        print(f"Error updating JSON with vulnerabilities: {e}")
+        return None
\ No newline at end of file
@@ -1,33 +1,30 @@
 import os
-import json
 import csv
-from src.config import AIDER_JSON_FILE, FINAL_CSV_FILE
+import itertools
+from src import config
+from src.models import FileNode, iter_leaves, load_tree
+from src.utils.metrics import counted
 
 def extract_code_snippet(node):
     """
     Combines the code snippet parts from the file's structure.
     
     Args:
-        node (dict): File node
+        node (FileNode): File node
         
     Returns:
         str: Combined code snippet
     """
     snippet_lines = []
-    structure = node.get("structure", {})
-    if structure:
-        classes = structure.get("classes", [])
-        if classes:
-            for cls in classes:
-                # Append the class body
-                snippet_lines.append(cls.get("class_body", ""))
-                # For each method in the class, append its code
-                methods = cls.get("methods", [])
-                for method in methods:
-                    snippet_lines.append(method.get("code", ""))
-        # In case there is additional code under "other", include it too.
-        if structure.get("other", ""):
-            snippet_lines.append(structure.get("other", ""))
+    for cls in node.classes:
+        # Append the class body
+        snippet_lines.append(cls.class_body)
+        # For each method in the class, append its code
+        for method in cls.methods:
+            snippet_lines.append(method.code)
+    # In case there is additional code under "other", include it too.
+    if node.other:
+        snippet_lines.append(node.other)
     return "\n".join(snippet_lines).strip()
 
 def extract_sinks(node):
@@ -35,18 +32,17 @@ def extract_sinks(node):
     Processes sink_details to produce a clean text block.
     
     Args:
-        node (dict): File node
+        node (FileNode): File node
         
     Returns:
         str: Formatted sink details
     """
-    sinks_details = node.get("sink_details", [])
     sinks_block = []
-    for sink in sinks_details:
+    for sink in node.sink_details:
         block = "<SINK>\n"
-        block += sink.get("ai_sink_label", "").strip() + "\n"
-        block += sink.get("code_summary", "").strip() + "\n"
-        block += sink.get("code_snippet", "").strip() + "\n"
+        block += sink.ai_sink_label.strip() + "\n"
+        block += sink.code_summary.strip() + "\n"
+        block += sink.code_snippet.strip() + "\n"
         block += "</SINK>"
         sinks_block.append(block)
     return "\n\n".join(sinks_block).strip()
@@ -56,64 +52,64 @@ def extract_vulnerabilities(node):
     Processes vulnerabilities to produce a clean text block.
     
     Args:
-        node (dict): File node
+        node (FileNode): File node
         
     Returns:
         str: Formatted vulnerabilities
     """
-    vulns = node.get("vulnerabilities", [])
     vuln_block = []
-    for vuln in vulns:
+    for vuln in node.vulnerabilities:
         block = "<VULNERABILITIES>\n"
-        block += vuln.get("code_snippet", "").strip() + "\n"
-        block += vuln.get("risk_level", "").strip() + "\n"
-        block += vuln.get("ref_link", "").strip() + "\n"
-        block += vuln.get("message_to_fix", "").strip() + "\n"
+        block += vuln.code_snippet.strip() + "\n"
+        block += vuln.risk_level.strip() + "\n"
+        block += vuln.ref_link.strip() + "\n"
+        block += vuln.message_to_fix.strip() + "\n"
         block += "</VULNERABILITIES>"
         vuln_block.append(block)
     return "\n\n".join(vuln_block).strip()
 
-def traverse_node(node, parent_path=""):
+def file_row(node, file_path):
     """
-    Recursively traverse the JSON hierarchy.
+    Build the CSV row of a file node (or an empty directory).
     
     Args:
-        node (dict): Current node
-        parent_path (str, optional): Parent path. Defaults to "".
+        node (DirNode | FileNode): Leaf node
+        file_path (str): Complete path of the node
         
     Returns:
-        list: List of dictionaries containing file information
+        dict: File information
     """
-    rows = []
-    # Build the current full path: if parent_path exists, join it with the node's name;
-    # otherwise start from node["name"].
-    current_path = os.path.join(parent_path, node.get("name", ""))
-    # If the node has children then it is a directory – recurse.
-    if node.get("children"):
-        for child in node["children"]:
-            rows.extend(traverse_node(child, current_path))
-    else:
-        # This is a file node. Prepare the row details.
-        file_path = current_path  # COMPLETE FILE PATH
-        
-        code_snippet = extract_code_snippet(node)
-        sinks_text = extract_sinks(node)
-        vulnerabilities_text = extract_vulnerabilities(node)
+    is_file = isinstance(node, FileNode)
+    return {
+        "COMPLETE FILE PATH": file_path,
+        "Code Snippet": extract_code_snippet(node) if is_file else "",
+        "Sinks": extract_sinks(node) if is_file else "",
+        "Vulnerabilities": extract_vulnerabilities(node) if is_file else ""
+    }
+
+def traverse_node(node, parent_path=""):
+    """
+    Walk the JSON hierarchy and yield one row per file or empty directory.
+    
+    Args:
+        node (DirNode | FileNode): Root node
+        parent_path (str, optional): Parent path. Defaults to "".
         
-        rows.append({
-            "COMPLETE FILE PATH": file_path,
-            "Code Snippet": code_snippet,
-            "Sinks": sinks_text,
-            "Vulnerabilities": vulnerabilities_text
-        })
-    return rows
+    Yields:
+        dict: File information, in tree order
+    """
+    for file_path, leaf in iter_leaves(node, parent_path):
+        yield file_row(leaf, file_path)
 
 def convert_json_to_csv():
     """
     Convert the JSON file to CSV.
+    
+    Returns:
+        str: Path to the CSV file or None if an error occurred
     """
-    json_file = AIDER_JSON_FILE
-    output_file = FINAL_CSV_FILE
+    json_file = config.AIDER_JSON_FILE
+    output_file = config.FINAL_CSV_FILE
     try:
         # Check if the JSON file exists
         if not os.path.exists(json_file):
@@ -121,15 +117,15 @@ def convert_json_to_csv():
             return
             
         # Load the JSON data
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = load_tree(json_file)
     except Exception as e:
         print(f"Error reading JSON file: {e}")
         return
 
-    # Recursively traverse data to extract file-level rows
+    # Traverse data lazily; rows are produced as the CSV writer consumes them
     rows = traverse_node(data, "")
-    if not rows:
+    first_row = next(rows, None)
+    if first_row is None:
         print("No file entries were found in the provided JSON.")
         return
 
@@ -139,8 +135,9 @@ def convert_json_to_csv():
         with open(output_file, "w", newline="", encoding="utf-8") as csvfile:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
-            for row in rows:
-                writer.writerow(row)
+            writer.writerows(counted(itertools.chain([first_row], rows), "rows"))
         print(f"CSV file generated successfully at: {output_file}")
+        return output_file
     except Exception as e:
-        print(f"Error writing CSV file: {e}") 
\ No newline at end of file
+        print(f"Error writing CSV file: {e}")
+        return None 
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Columnar export of the analysis tree.
+
+Writes normalized files, classes, methods, sinks and vulnerabilities tables
+as Parquet so analytics jobs can query them directly instead of re-parsing
+the text blocks of output.csv. Rows are buffered per table and flushed as one
+row group at a time, so memory is bounded by the row group size.
+"""
+
+import os
+
+from src import config
+from src.models import load_tree
+from src.utils.metrics import add_count
+from src.processors.tables import TABLE_COLUMNS, iter_table_rows
+
+# pyarrow is slow to import, so it is loaded by load_pyarrow when the export runs
+pa = None
+pq = None
+
+
+def load_pyarrow():
+    """
+    Import pyarrow on first use.
+
+    Returns:
+        bool: True if pyarrow is available
+    """
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            return False
+        pa, pq = pyarrow, pyarrow.parquet
+    return True
+
+
+def _schema(columns):
+    types = {
+        "int": pa.int64(),
+        "str": pa.string(),
+        "dict": pa.dictionary(pa.int32(), pa.string())
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+class _TableWriter:
+    """
+    Buffers the rows of one table and writes them as Parquet row groups.
+    """
+
+    def __init__(self, file_path, columns, row_group_size):
+        self.schema = _schema(columns)
+        self.row_group_size = row_group_size
+        self.rows = []
+        self.writer = pq.ParquetWriter(file_path, self.schema)
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        arrays = []
+        for position, field in enumerate(self.schema):
+            values = [row[position] for row in self.rows]
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(values, pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(values, field.type))
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def write_parquet_tables(tree, output_dir, row_group_size=None):
+    """
+    Write the normalized tables of a tree as Parquet files.
+
+    Args:
+        tree (DirNode): Root of the tree
+        output_dir (str): Directory receiving one <table>.parquet per table
+        row_group_size (int, optional): Rows per row group. Defaults to PARQUET_ROW_GROUP_SIZE.
+
+    Returns:
+        dict: Number of rows written per table
+    """
+    if not load_pyarrow():
+        raise ImportError("pyarrow is required for the Parquet export")
+    os.makedirs(output_dir, exist_ok=True)
+    row_group_size = row_group_size or config.PARQUET_ROW_GROUP_SIZE
+    writers = {
+        table: _TableWriter(os.path.join(output_dir, f"{table}.parquet"), columns, row_group_size)
+        for table, columns in TABLE_COLUMNS.items()
+    }
+    counts = dict.fromkeys(TABLE_COLUMNS, 0)
+    try:
+        for table, row in iter_table_rows(tree):
+            writers[table].add(row)
+            counts[table] += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return counts
+
+
+def export_parquet():
+    """
+    Export aider_repomap.json as Parquet tables.
+
+    Returns:
+        str: Path to the Parquet directory or None if an error occurred
+    """
+    if not load_pyarrow():
+        print("Error: pyarrow is not installed. Skipping Parquet export.")
+        return None
+
+    json_file = config.AIDER_JSON_FILE
+    if not os.path.exists(json_file):
+        print(f"Error: {json_file} not found")
+        return None
+
+    try:
+        tree = load_tree(json_file)
+        counts = write_parquet_tables(tree, config.PARQUET_DIR)
+        for table, count in counts.items():
+            add_count(table, count)
+    except Exception as e:
+        print(f"Error exporting Parquet tables: {e}")
+        return None
+
+    summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(f"Parquet tables generated successfully at: {config.PARQUET_DIR} ({summary})")
+    return config.PARQUET_DIR
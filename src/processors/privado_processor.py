@@ -2,16 +2,30 @@ import os
 import json
 import csv
 import time
-from openai import OpenAI
-from typing import List, Dict, Any
-from src.config import (
-    PRIVADO_OUTPUT_FILE,
-    PRIVADO_CSV_FILE,
-    AIDER_JSON_FILE,
-    OPENAI_MODEL,
-    OPENAI_BATCH_SIZE,
-    OPENAI_MAX_RETRIES
+import itertools
+import contextlib
+from typing import TYPE_CHECKING, List, Dict, Any, Iterable, Iterator
+from src import config
+from src.utils.json_stream import iter_events
+from src.models import DirNode, FileNode, SinkDetail, load_tree, dump_tree
+from src.utils.metrics import (
+    add_count,
+    counted,
+    record_llm_hedge,
+    record_llm_request,
+    record_llm_retry,
+    record_llm_tokens
 )
+from src.utils.llm_retry import FATAL, RATE_LIMITED, TRANSIENT, RetryPolicy, classify_error
+from src.utils.checkpoints import EnrichmentProgress, file_digest
+from src.utils.resource_limits import slot
+from src.utils.token_budget import TokenBudget, estimate_tokens
+from src.utils.json_utils import write_json
+from src.processors.sink_rules import RuleCoverage, load_sink_rules, match_sink_rule
+from src.processors.sink_clusters import SinkClusterIndex
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 # JSON schema for the OpenAI response
 SCHEMA = {
@@ -37,264 +51,613 @@ SCHEMA = {
     "strict": True
 }
 
-def extract_privado_data(json_file_path: str = PRIVADO_OUTPUT_FILE) -> List[Dict[str, str]]:
+# Separator of the hops in the Data Flow Path column
+PATH_SEPARATOR = " -> "
+
+# Sent first in every request and never varied, so that the provider can cache it as a prompt prefix
+SYSTEM_PROMPT = """
+You are an expert code analyzer specializing in data flow and security analysis.
+Each message describes a data sink found in a codebase: its Privado sink id and label, a code
+snippet starting at the sink, its location, and the data flow path leading to it. Long snippets
+and paths are shortened; omitted parts are marked with "...".
+
+Based on this information:
+1. Identify the specific type of data sink (e.g., S3 bucket, RDS instance, file, HTTP endpoint, database via ORM, API for blob/object storage, etc.)
+2. Provide a concise summary of what the code is doing with this data sink.
+
+Respond with JSON only, following the specified schema.
+"""
+
+# Data flow sections of privado.json that produce rows
+DATA_FLOW_SECTIONS = ["storages", "internal_apis", "third_parties"]
+
+# Streamed items of privado.json, mapped to the prefix of the sink id that applies to them
+SINK_PROCESSING_OCCURRENCE = "sinkProcessing.item.occurrences.item"
+STREAMED_ITEM_IDS = {SINK_PROCESSING_OCCURRENCE: "sinkProcessing.item.sinkId"}
+for _section_name in DATA_FLOW_SECTIONS:
+    STREAMED_ITEM_IDS[f"dataFlow.{_section_name}.item.sinks.item.paths.item"] = f"dataFlow.{_section_name}.item.sinks.item.id"
+
+def read_sink_definitions(json_file_path: str) -> Dict[str, str]:
     """
-    Extracts data sink information from a privado.json file and returns a list of dictionaries.
-    The dictionaries contain: Data Sink ID, Sink Label, Code Snippet, File Path, Line Number,
-    Column Number, and Data Flow Path.
+    Collect the sink id to sink name mapping from a privado.json file.
+    Reading stops as soon as the top-level "sinks" array has been consumed.
     
     Args:
         json_file_path (str): Path to the privado.json file.
     
     Returns:
-        List[Dict[str, str]]: Extracted data ready for further processing.
+        Dict[str, str]: Sink names keyed by sink id.
     """
-    try:
-        with open(json_file_path, 'r') as f:
-            privado_data = json.load(f)
-    except FileNotFoundError:
+    sink_definitions = {}
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        for prefix, event, value in iter_events(f, ["sinks.item"], ["sinks"]):
+            if event == "item":
+                sink_definitions[value['id']] = value['name']
+            elif prefix == "sinks" and event == "end_array":
+                break
+    return sink_definitions
+
+def stream_sink_items(json_file_path: str) -> Iterator[tuple]:
+    """
+    Stream sinkProcessing occurrences and dataFlow paths from a privado.json file,
+    each paired with the id of the sink it belongs to. Everything else in the
+    document is skipped without being decoded.
+    
+    Privado writes the sink id before the occurrences and paths, so items are
+    normally yielded as they are read. If a sink's items come before its id
+    (e.g. in a file rewritten with sorted keys), they are held back until the
+    id is read, or until the sink ends without one.
+    
+    Args:
+        json_file_path (str): Path to the privado.json file.
+    
+    Yields:
+        tuple: (item prefix, sink id, item) in document order.
+    """
+    id_prefixes = set(STREAMED_ITEM_IDS.values())
+    # Objects holding the ids; a new one resets the id seen so far
+    owner_prefixes = {id_prefix.rsplit(".", 1)[0]: id_prefix for id_prefix in id_prefixes}
+    current_ids = {}
+    pending = {}  # id prefix -> items of the current sink read before its id
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        for prefix, event, value in iter_events(f, STREAMED_ITEM_IDS, id_prefixes):
+            if event == "item":
+                id_prefix = STREAMED_ITEM_IDS[prefix]
+                if id_prefix in current_ids:
+                    yield prefix, current_ids[id_prefix], value
+                else:
+                    pending.setdefault(id_prefix, []).append((prefix, value))
+            elif prefix in id_prefixes and event in ("string", "number"):
+                current_ids[prefix] = value
+                for item_prefix, item in pending.pop(prefix, ()):
+                    yield item_prefix, value, item
+            elif prefix in owner_prefixes and event == "start_map":
+                current_ids.pop(owner_prefixes[prefix], None)
+            elif prefix in owner_prefixes and event == "end_map":
+                # A sink without an id keeps its items, as json.load followed by .get() would
+                for item_prefix, item in pending.pop(owner_prefixes[prefix], ()):
+                    yield item_prefix, None, item
+
+def extract_privado_data(json_file_path: str = None) -> Iterator[Dict[str, str]]:
+    """
+    Extracts data sink information from a privado.json file and yields one dictionary per row.
+    The dictionaries contain: Data Sink ID, Sink Label, Code Snippet, File Path, Line Number,
+    Column Number, and Data Flow Path.
+    
+    The file is read incrementally: the sink definitions are collected first, then
+    sinkProcessing occurrences and dataFlow paths are streamed in document order, so
+    memory stays bounded by a single path rather than the size of the file.
+    
+    Args:
+        json_file_path (str, optional): Path to the privado.json file. Defaults to PRIVADO_OUTPUT_FILE.
+    
+    Yields:
+        Dict[str, str]: Extracted rows ready for further processing.
+    """
+    json_file_path = json_file_path or config.PRIVADO_OUTPUT_FILE
+    if not os.path.exists(json_file_path):
         print(f"Error: privado.json file not found at '{json_file_path}'. Please ensure the file exists in the current directory or provide the correct path.")
-        return []
-    except json.JSONDecodeError:
+        return
+
+    try:
+        # Build sink definitions mapping
+        sink_definitions = read_sink_definitions(json_file_path)
+
+        # Extract headers: Data Sink ID, Sink Label, Code Snippet, File Path, Line Number, Column Number, Data Flow Path
+        for item_prefix, sink_id, item in stream_sink_items(json_file_path):
+            sink_label = sink_definitions.get(sink_id, "Unknown Sink Label")
+
+            # Process sinkProcessing occurrences
+            if item_prefix == SINK_PROCESSING_OCCURRENCE:
+                yield {
+                    "Data Sink ID": sink_id,
+                    "Sink Label": sink_label,
+                    "Code Snippet": item.get('sample', 'N/A').strip(),
+                    "File Path": item.get('fileName', 'N/A'),
+                    "Line Number": item.get('lineNumber', 'N/A'),
+                    "Column Number": item.get('columnNumber', 'N/A'),
+                    "Data Flow Path": "Sink Processing Occurrence - Direct Location"
+                }
+                continue
+
+            # Process data flow paths for storages, internal_apis, and third_parties
+            data_flow_path_locations = item.get('path', [])
+            data_flow_path_files = [location.get('fileName', 'N/A') for location in data_flow_path_locations]
+            data_flow_path_str = " -> ".join(data_flow_path_files)
+
+            if data_flow_path_locations:
+                sink_occurrence_location = data_flow_path_locations[-1]
+                yield {
+                    "Data Sink ID": sink_id,
+                    "Sink Label": sink_label,
+                    "Code Snippet": sink_occurrence_location.get('sample', 'N/A').strip(),
+                    "File Path": sink_occurrence_location.get('fileName', 'N/A'),
+                    "Line Number": sink_occurrence_location.get('lineNumber', 'N/A'),
+                    "Column Number": sink_occurrence_location.get('columnNumber', 'N/A'),
+                    "Data Flow Path": data_flow_path_str
+                }
+            else:
+                yield {
+                    "Data Sink ID": sink_id,
+                    "Sink Label": sink_label,
+                    "Code Snippet": "N/A",
+                    "File Path": "N/A",
+                    "Line Number": "N/A",
+                    "Column Number": "N/A",
+                    "Data Flow Path": "No Data Flow Path Available"
+                }
+    except ValueError:
         print(f"Error: Could not decode JSON from '{json_file_path}'. Please ensure the file is a valid JSON file.")
-        return []
-
-    # Build sink definitions mapping
-    sink_definitions = {sink['id']: sink['name'] for sink in privado_data.get('sinks', [])}
-
-    rows = []
-    # Extract headers: Data Sink ID, Sink Label, Code Snippet, File Path, Line Number, Column Number, Data Flow Path
-    # Process sinkProcessing occurrences
-    for sink_processing_item in privado_data.get('sinkProcessing', []):
-        sink_id = sink_processing_item.get('sinkId')
-        sink_label = sink_definitions.get(sink_id, "Unknown Sink Label")
-        for occurrence in sink_processing_item.get('occurrences', []):
-            code_snippet = occurrence.get('sample', 'N/A').strip()
-            file_path = occurrence.get('fileName', 'N/A')
-            line_number = occurrence.get('lineNumber', 'N/A')
-            column_number = occurrence.get('columnNumber', 'N/A')
-            data_flow_path_str = "Sink Processing Occurrence - Direct Location"
-            row = {
-                "Data Sink ID": sink_id,
-                "Sink Label": sink_label,
-                "Code Snippet": code_snippet,
-                "File Path": file_path,
-                "Line Number": line_number,
-                "Column Number": column_number,
-                "Data Flow Path": data_flow_path_str
-            }
-            rows.append(row)
-
-    # Process data flow paths for storages, internal_apis, and third_parties
-    data_flow_sections = ["storages", "internal_apis", "third_parties"]
-    for section_name in data_flow_sections:
-        for data_flow_item in privado_data.get('dataFlow', {}).get(section_name, []):
-            for sink_info in data_flow_item.get('sinks', []):
-                sink_id_dataflow = sink_info.get('id')
-                sink_label_dataflow = sink_definitions.get(sink_id_dataflow, "Unknown Sink Label")
-                for path_info in sink_info.get('paths', []):
-                    data_flow_path_locations = path_info.get('path', [])
-                    data_flow_path_files = [location.get('fileName', 'N/A') for location in data_flow_path_locations]
-                    data_flow_path_str = " -> ".join(data_flow_path_files)
-
-                    if data_flow_path_locations:
-                        sink_occurrence_location = data_flow_path_locations[-1]
-                        code_snippet_dataflow = sink_occurrence_location.get('sample', 'N/A').strip()
-                        file_path_dataflow = sink_occurrence_location.get('fileName', 'N/A')
-                        line_number_dataflow = sink_occurrence_location.get('lineNumber', 'N/A')
-                        column_number_dataflow = sink_occurrence_location.get('columnNumber', 'N/A')
-                        row = {
-                            "Data Sink ID": sink_id_dataflow,
-                            "Sink Label": sink_label_dataflow,
-                            "Code Snippet": code_snippet_dataflow,
-                            "File Path": file_path_dataflow,
-                            "Line Number": line_number_dataflow,
-                            "Column Number": column_number_dataflow,
-                            "Data Flow Path": data_flow_path_str
-                        }
-                        rows.append(row)
-                    else:
-                        row = {
-                            "Data Sink ID": sink_id_dataflow,
-                            "Sink Label": sink_label_dataflow,
-                            "Code Snippet": "N/A",
-                            "File Path": "N/A",
-                            "Line Number": "N/A",
-                            "Column Number": "N/A",
-                            "Data Flow Path": "No Data Flow Path Available"
-                        }
-                        rows.append(row)
+        return
 
     print(f"Data extracted from '{json_file_path}'.")
-    return rows
+
+def compact_snippet(snippet: str, max_lines: int = None, max_line_chars: int = None) -> str:
+    """
+    Keep a window of a code snippet for the prompt.
+    
+    Privado samples start at the sink line, so the window is the first
+    max_lines lines; overlong lines (minified code) are cut as well.
+    
+    Args:
+        snippet: Code snippet of the row.
+        max_lines: Lines to keep. Defaults to PROMPT_SNIPPET_LINES.
+        max_line_chars: Characters to keep per line. Defaults to PROMPT_LINE_CHARS.
+        
+    Returns:
+        The shortened snippet.
+    """
+    max_lines = max_lines or config.PROMPT_SNIPPET_LINES
+    max_line_chars = max_line_chars or config.PROMPT_LINE_CHARS
+    lines = snippet.splitlines()
+    window = [line if len(line) <= max_line_chars else line[:max_line_chars] + " ..." for line in lines[:max_lines]]
+    if len(lines) > max_lines:
+        window.append(f"... ({len(lines) - max_lines} more lines)")
+    return "\n".join(window)
+
+def compact_data_flow_path(path: str, max_hops: int = None) -> str:
+    """
+    Shorten a data flow path for the prompt.
+    
+    Consecutive hops through the same file are merged into one, then the
+    middle of a path that is still longer than max_hops is elided, keeping
+    its source and the hops closest to the sink.
+    
+    Args:
+        path: Data Flow Path of the row, hops separated by " -> ".
+        max_hops: Hops to keep. Defaults to PROMPT_PATH_HOPS.
+        
+    Returns:
+        The shortened path.
+    """
+    max_hops = max_hops or config.PROMPT_PATH_HOPS
+    hops = []
+    for hop, repeats in itertools.groupby(path.split(PATH_SEPARATOR)):
+        count = sum(1 for _ in repeats)
+        hops.append(hop if count == 1 else f"{hop} (x{count})")
+    if len(hops) > max_hops:
+        head = max(1, max_hops // 2)
+        tail = max(1, max_hops - head)
+        hops = hops[:head] + [f"... ({len(hops) - head - tail} hops)"] + hops[-tail:]
+    return PATH_SEPARATOR.join(hops)
 
 def create_prompt(row: Dict[str, str]) -> str:
     """
     Create a prompt for the OpenAI API based on the row data.
     
+    Only the row's data is sent here; the instructions are part of the system
+    prompt. The snippet and the data flow path are shortened to keep the
+    prompt size bounded.
+    
     Args:
         row: A dictionary containing the CSV row data.
         
     Returns:
         A formatted prompt string.
     """
-    return f"""
-Analyze the following code information related to a data sink:
-
-Data Sink ID: {row.get('Data Sink ID', 'N/A')}
+    return f"""Data Sink ID: {row.get('Data Sink ID', 'N/A')}
 Current Sink Label: {row.get('Sink Label', 'N/A')}
-Code Snippet: {row.get('Code Snippet', 'N/A')}
+Code Snippet: {compact_snippet(str(row.get('Code Snippet', 'N/A')))}
 File Path: {row.get('File Path', 'N/A')}
 Line Number: {row.get('Line Number', 'N/A')}
 Column Number: {row.get('Column Number', 'N/A')}
-Data Flow Path: {row.get('Data Flow Path', 'N/A')}
-
-Based on this information:
-1. Identify the specific type of data sink (e.g., S3 bucket, RDS instance, file, HTTP endpoint, database via ORM, API for blob/object storage, etc.)
-2. Provide a concise summary of what the code is doing with this data sink.
+Data Flow Path: {compact_data_flow_path(str(row.get('Data Flow Path', 'N/A')))}
 """
 
 def get_system_prompt() -> str:
     """
     Returns the system prompt for the OpenAI API.
     """
-    return """
-You are an expert code analyzer specializing in data flow and security analysis.
-Your task is to analyze code snippets related to data sinks and provide:
-1. A specific label for the type of data sink (e.g., S3 bucket, RDS instance, file, HTTP endpoint, database via ORM, API for blob/object storage, etc.)
-2. A concise summary of what the code is doing with this data sink.
+    return SYSTEM_PROMPT
 
-Respond with JSON only, following the specified schema.
-"""
+def record_usage(response, budget: TokenBudget, prompt_estimate: int):
+    """
+    Charge the token usage of a response to the job's budget and metrics.
+    
+    Args:
+        response: Chat completion response.
+        budget: Token budget of the job.
+        prompt_estimate: Estimated prompt tokens, used if the response reports no usage.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        prompt_tokens, completion_tokens, cached_tokens = prompt_estimate, 0, 0
+    else:
+        prompt_tokens = usage.prompt_tokens or 0
+        completion_tokens = usage.completion_tokens or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+    budget.charge(prompt_tokens, completion_tokens, cached_tokens)
+    record_llm_tokens(prompt_tokens, completion_tokens, cached_tokens)
 
-def process_batch(client: OpenAI, rows: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+def labelled_row(row: Dict[str, str], sink_label: str, summary: str, source: str,
+                 confidence: float = 1.0) -> Dict[str, Any]:
+    """
+    Copy a row with its sink label, code summary and the source of the label.
+    
+    Args:
+        row: Extracted row.
+        sink_label: Value of the AI Sink Label column.
+        summary: Value of the Code Summary column.
+        source: Value of the Label Source column: "model", "rule:<name>",
+            "cluster" if the label was copied from a near-duplicate row, or
+            "none" if the row could not be labelled.
+        confidence: Estimated similarity between the row and the row the
+            label was produced for; 1.0 for rows labelled directly.
+        
+    Returns:
+        The labelled row.
+    """
+    row_with_response = row.copy()
+    row_with_response["AI Sink Label"] = sink_label
+    row_with_response["Code Summary"] = summary
+    row_with_response["Label Source"] = source
+    row_with_response["Label Confidence"] = f"{confidence:.2f}"
+    return row_with_response
+
+def request_sink_labels(client: "OpenAI", messages: List[Dict[str, str]], policy: RetryPolicy,
+                        budget: TokenBudget, prompt_estimate: int) -> tuple:
+    """
+    Ask the model for the sink label and summary of one row.
+    
+    Rate limits and transient errors (timeouts, connection and server errors)
+    are retried as the policy says; other errors fail the row at once. No
+    request is sent while the policy's circuit breaker is open.
+    
+    Args:
+        client: OpenAI client.
+        messages: Chat messages of the request.
+        policy: Retry policy of the job.
+        budget: Token budget of the job.
+        prompt_estimate: Estimated prompt tokens of the request.
+        
+    Returns:
+        (decoded response, None) on success, or (None, label for the failed row).
+    """
+    def request():
+        return client.chat.completions.create(
+            model=config.OPENAI_MODEL,
+            messages=messages,
+            response_format={"type": "json_schema", "json_schema": SCHEMA},
+            max_completion_tokens=config.OPENAI_MAX_COMPLETION_TOKENS,
+        )
+    
+    retry = 0
+    while True:
+        if not policy.breaker.allow():
+            add_count("circuit_open")
+            return None, "LLM unavailable"
+        
+        # In a batch, the requests of all pipelines share LLM_CONCURRENCY slots. The slot
+        # is taken before the attempt starts, so waiting for it neither counts as latency
+        # nor triggers a hedged copy. Both copies of a hedged request run in its slot, and
+        # the copy that is not used keeps the slot until it finishes, so a slot never has
+        # more than the two copies of one request in flight.
+        error = None
+        with contextlib.ExitStack() as held:
+            held.enter_context(slot("llm"))
+
+            def keep_slot(copy):
+                release = held.pop_all()
+                copy.add_done_callback(lambda future: release.close())
+
+            request_start = time.perf_counter()
+            try:
+                response, hedged, hedge_won = policy.call(
+                    request, lambda discarded: record_usage(discarded, budget, prompt_estimate), keep_slot)
+            except Exception as e:
+                error = e
+            request_seconds = time.perf_counter() - request_start
+        
+        if error is not None:
+            kind = classify_error(error)
+            record_llm_request(request_seconds, "rate_limited" if kind == RATE_LIMITED else "error")
+            # Rate limits and rejected requests show that the service is up
+            if kind == TRANSIENT:
+                policy.breaker.record_failure()
+            else:
+                policy.breaker.record_success()
+            if kind == FATAL:
+                print(f"Error processing row: {error}")
+                return None, "Error in processing"
+            if retry >= policy.max_retries:
+                print("Max retries reached for row. Adding without AI analysis.")
+                return None, "Max retries reached"
+            retry += 1
+            record_llm_retry()
+            wait_time = policy.delay(retry, error)
+            reason = "Rate limit hit" if kind == RATE_LIMITED else f"Request failed ({error})"
+            print(f"{reason}. Waiting for {wait_time:.1f} seconds before retrying...")
+            time.sleep(wait_time)
+            continue
+        
+        policy.breaker.record_success()
+        record_llm_request(request_seconds)
+        if hedged:
+            record_llm_hedge(hedge_won)
+        record_usage(response, budget, prompt_estimate)
+        response_content = response.choices[0].message.content
+        print(f"Response content: {response_content}")
+        try:
+            return json.loads(response_content), None
+        except (TypeError, ValueError) as e:
+            print(f"Error processing row: {e}")
+            return None, "Error in processing"
+
+def process_batch(client: "OpenAI", rows: List[Dict[str, str]], budget: TokenBudget = None,
+                  rules: list = None, coverage: RuleCoverage = None,
+                  clusters: SinkClusterIndex = None, policy: RetryPolicy = None) -> List[Dict[str, Any]]:
     """
     Process a batch of rows using the OpenAI API.
     
+    Rows that a sink rule matches are labelled by the rule without a request,
+    and so are rows in the cluster of a row the model already labelled.
+    Rows whose request could exceed the token budget are not sent; they are
+    labelled "Token budget exceeded".
+    
     Args:
         client: OpenAI client.
         rows: List of dictionaries containing the row data.
+        budget: Token budget of the job. Defaults to an unlimited budget.
+        rules: Sink rules to try before the model. Defaults to none.
+        coverage: Collects which rows the rules labelled.
+        clusters: Near-duplicate clusters whose labels are reused. Defaults to none.
+        policy: Retry policy of the job. Defaults to a policy built from the configuration.
         
     Returns:
         List of dictionaries with the original row data plus the AI-generated sink label and code summary.
     """
+    budget = budget if budget is not None else TokenBudget()
+    policy = policy if policy is not None else RetryPolicy()
+    system_prompt = get_system_prompt()
+    max_completion_tokens = config.OPENAI_MAX_COMPLETION_TOKENS
     results = []
     for row in rows:
+        if rules:
+            rule = match_sink_rule(row, rules)
+            if coverage is not None:
+                coverage.record(row, rule)
+            if rule is not None:
+                add_count("rule_labelled")
+                sink_label, summary = rule.apply(row)
+                results.append(labelled_row(row, sink_label, summary, f"rule:{rule.name}"))
+                continue
+        
+        if clusters is not None:
+            match = clusters.find(row)
+            if match is not None:
+                (sink_label, summary), similarity = match
+                add_count("cluster_labelled")
+                results.append(labelled_row(row, sink_label, summary, "cluster", similarity))
+                continue
+        
         prompt = create_prompt(row)
-        max_retries = OPENAI_MAX_RETRIES
-        retry_count = 0
-
-        while retry_count < max_retries:
-            try:
-                response = client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": get_system_prompt()},
-                        {"role": "user", "content": prompt},
-                    ],
-                    response_format={"type": "json_schema", "json_schema": SCHEMA},
-                )
-                
-                response_content = response.choices[0].message.content
-                print(f"Processing row with Data Sink ID: {row.get('Data Sink ID', 'N/A')}")
-                print(f"Response content: {response_content}")
-                response_json = json.loads(response_content)
-                
-                row_with_response = row.copy()
-                row_with_response["AI Sink Label"] = response_json.get("sink_label", "N/A")
-                row_with_response["Code Summary"] = response_json.get("summary", "N/A")
-                results.append(row_with_response)
-                break
-                
-            except Exception as e:
-                retry_count += 1
-                if "rate limit" in str(e).lower():
-                    wait_time = 2 ** retry_count  # Exponential backoff
-                    print(f"Rate limit hit. Waiting for {wait_time} seconds before retrying...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"Error processing row: {e}")
-                    row_with_response = row.copy()
-                    row_with_response["AI Sink Label"] = "Error in processing"
-                    row_with_response["Code Summary"] = "Error in processing"
-                    results.append(row_with_response)
-                    break
+        prompt_estimate = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+        # Charge the hedged copies that answered since the last request
+        policy.settle_discarded()
+        if not budget.allows(prompt_estimate + max_completion_tokens):
+            add_count("budget_exceeded")
+            results.append(labelled_row(row, "Token budget exceeded", "Token budget exceeded", "none", 0.0))
+            continue
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+        response_json, failure = request_sink_labels(client, messages, policy, budget, prompt_estimate)
+        if failure is not None:
+            results.append(labelled_row(row, failure, failure, "none", 0.0))
+            continue
         
-        if retry_count == max_retries:
-            print(f"Max retries reached for row. Adding without AI analysis.")
-            row_with_response = row.copy()
-            row_with_response["AI Sink Label"] = "Max retries reached"
-            row_with_response["Code Summary"] = "Max retries reached"
-            results.append(row_with_response)
+        print(f"Processing row with Data Sink ID: {row.get('Data Sink ID', 'N/A')}")
+        sink_label = response_json.get("sink_label", "N/A")
+        summary = response_json.get("summary", "N/A")
+        results.append(labelled_row(row, sink_label, summary, "model"))
+        if clusters is not None:
+            clusters.add(row, sink_label, summary)
     
     return results
 
-def process_data(rows: List[Dict[str, str]], output_file: str = PRIVADO_CSV_FILE, batch_size: int = OPENAI_BATCH_SIZE):
+def report_rule_coverage(coverage: RuleCoverage):
+    """
+    Print the coverage of the sink rules and write it to SINK_RULES_COVERAGE_FILE.
+    
+    Args:
+        coverage: Coverage collected during the enrichment.
+    """
+    print(coverage.report())
+    try:
+        write_json(coverage.to_dict(), config.SINK_RULES_COVERAGE_FILE, pretty=True)
+    except Exception as e:
+        print(f"Error writing sink rule coverage: {e}")
+
+def seed_clusters(clusters: SinkClusterIndex, output_file: str):
+    """
+    Make the rows the model labelled before an interruption cluster representatives again.
+    
+    Args:
+        clusters: Cluster index of the resumed enrichment.
+        output_file: CSV written so far.
+    """
+    with open(output_file, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get("Label Source") == "model":
+                clusters.add(row, row["AI Sink Label"], row["Code Summary"])
+
+def process_data(rows: Iterable[Dict[str, str]], output_file: str = None, batch_size: int = None,
+                 progress: EnrichmentProgress = None):
     """
     Process the extracted data by sending it to the OpenAI API in batches,
     then write the final results (with additional AI Sink Label and Code Summary columns)
     to an output CSV file.
     
+    Rows are consumed lazily and each batch is written as soon as it is processed.
+    Rows matched by a sink rule (see src.processors.sink_rules) are labelled
+    without a request, and only one row per cluster of near-duplicate sinks
+    (see src.processors.sink_clusters) is sent to the model. The job spends
+    at most ENRICH_TOKEN_BUDGET tokens, and reports the tokens it used and
+    the coverage of the rules when it finishes. With a progress checkpoint,
+    the rows covered by its last save are skipped and the results are
+    appended to the CSV written so far.
+    
     Args:
-        rows: List of dictionaries representing the extracted data.
-        output_file: Path to the final output CSV file.
-        batch_size: Number of rows to process in each batch.
+        rows: Iterable of dictionaries representing the extracted data.
+        output_file: Path to the final output CSV file. Defaults to PRIVADO_CSV_FILE.
+        batch_size: Number of rows to process in each batch. Defaults to OPENAI_BATCH_SIZE.
+        progress: Checkpoint to resume from and to save progress to.
+        
+    Returns:
+        Path to the output CSV file, or None if nothing was written.
     """
+    output_file = output_file or config.PRIVADO_CSV_FILE
+    batch_size = batch_size or config.OPENAI_BATCH_SIZE
+
     # Check if OpenAI API key is set
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         print("Error: OPENAI_API_KEY environment variable not set.")
         return
 
-    client = OpenAI()
+    # Imported here so that only the enrichment stage pays for loading the client
+    from openai import OpenAI
+    # Retries are left to the RetryPolicy
+    client = OpenAI(max_retries=0, timeout=config.OPENAI_TIMEOUT)
+    
+    rows = iter(rows)
+    rows_done, csv_bytes = progress.load() if progress is not None else (0, 0)
+    resumed = rows_done > 0
+    if resumed:
+        print(f"Resuming enrichment after {rows_done} rows from the last checkpoint.")
+        # Drop the results written after the checkpoint; those rows are processed again
+        with open(output_file, 'r+', encoding='utf-8') as f:
+            f.truncate(csv_bytes)
+        rows = itertools.islice(rows, rows_done, None)
     
-    if not rows:
+    batch = list(itertools.islice(rows, batch_size))
+    if not batch:
+        if resumed:
+            print(f"All rows were already enriched. Results saved to {output_file}")
+            return output_file
         print("No data to process.")
-        return
-        
-    all_results = []
-    for i in range(0, len(rows), batch_size):
-        batch = rows[i:i+batch_size]
-        print(f"Processing batch {i // batch_size + 1} of {(len(rows) + batch_size - 1) // batch_size}...")
-        batch_results = process_batch(client, batch)
-        all_results.extend(batch_results)
-        
-        # Small delay between batches to avoid rate limits
-        if i + batch_size < len(rows):
-            time.sleep(1)
-    
-    if all_results:
-        headers = list(all_results[0].keys())
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(all_results)
+        return None
+    
+    budget = TokenBudget(config.ENRICH_TOKEN_BUDGET)
+    rules = load_sink_rules() if config.SINK_RULES else []
+    coverage = RuleCoverage()
+    clusters = SinkClusterIndex() if config.SINK_CLUSTERING else None
+    policy = RetryPolicy()
+    if clusters is not None and resumed:
+        seed_clusters(clusters, output_file)
+    csvfile = None
+    writer = None
+    batch_number = 0
+    try:
+        while batch:
+            batch_number += 1
+            print(f"Processing batch {batch_number}...")
+            batch_results = process_batch(client, batch, budget, rules, coverage, clusters, policy)
+            
+            if batch_results:
+                if writer is None:
+                    fieldnames = list(batch_results[0].keys())
+                    if resumed:
+                        # The header was written before the interruption
+                        csvfile = open(output_file, 'a', newline='', encoding='utf-8')
+                        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                    else:
+                        csvfile = open(output_file, 'w', newline='', encoding='utf-8')
+                        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                        writer.writeheader()
+                writer.writerows(batch_results)
+            
+            rows_done += len(batch)
+            if progress is not None and csvfile is not None:
+                progress.update(rows_done, csvfile)
+            
+            batch = list(itertools.islice(rows, batch_size))
+            # Small delay between batches to avoid rate limits; not needed if no row of the batch was sent
+            if batch and any(result["Label Source"] in ("model", "none") for result in batch_results):
+                time.sleep(1)
+        # Hedged copies still running use tokens too; charge them before reporting the usage
+        policy.settle_discarded(wait_for_running=True)
+    finally:
+        if csvfile is not None:
+            csvfile.close()
+        policy.settle_discarded()
+        print(f"LLM token usage: {budget.summary()}")
+        if rules:
+            report_rule_coverage(coverage)
+        if clusters is not None:
+            print(clusters.report())
+    
+    if writer is not None or resumed:
         print(f"Processing complete. Results saved to {output_file}")
-    else:
-        print("No results to write to CSV.")
+        return output_file
+    print("No results to write to CSV.")
+    return None
 
 def update_sink_details(json_tree, csv_file):
     """
     Update the JSON tree with sink details from the CSV file.
     
     Args:
-        json_tree (dict): JSON tree to update
+        json_tree (DirNode): JSON tree to update
         csv_file (str): Path to the CSV file
         
     Returns:
-        dict: Updated JSON tree
+        DirNode: Updated JSON tree
     """
     def find_file_node(node, target_path, current_path=""):
         """
         Find a file node in the JSON tree.
         
         Args:
-            node (dict): Current node
+            node (DirNode | FileNode): Current node
             target_path (str): Target file path
             current_path (str, optional): Current path. Defaults to "".
             
         Returns:
-            dict: File node if found, None otherwise
+            FileNode: File node if found, None otherwise
         """
         # Normalize paths for comparison
         target_path = target_path.replace('\\', '/')
@@ -303,29 +666,29 @@ def update_sink_details(json_tree, csv_file):
         target_basename = os.path.basename(target_path)
         target_dirname = os.path.dirname(target_path)
         
-        # If this is a file node (has "structure"), check if it matches
-        if "structure" in node:
-            full_path = current_path + node["name"]
+        # If this is a file node, check if it matches
+        if isinstance(node, FileNode):
+            full_path = current_path + node.name
             
             # Try exact match first
             if full_path == target_path:
                 return node
                 
             # Try matching just the basename if paths don't match exactly
-            if node["name"] == target_basename:
+            if node.name == target_basename:
                 # Check if the parent directory matches the end of the target directory
                 parent_path = current_path.rstrip('/')
                 if parent_path and target_dirname.endswith(parent_path):
                     return node
         
         # If this node has children, recursively search them
-        if "children" in node:
-            for child in node["children"]:
+        if isinstance(node, DirNode):
+            for child in node.children:
                 # Build the new path based on whether this is a directory or file
-                new_path = current_path + child["name"] + "/" if "children" in child else current_path
+                new_path = current_path + child.name + "/" if isinstance(child, DirNode) else current_path
                 
                 # Recursively search in the child
-                result = find_file_node(child, target_path, current_path + (child["name"] + "/") if "children" in child else current_path)
+                result = find_file_node(child, target_path, new_path)
                 if result:
                     return result
         
@@ -339,13 +702,13 @@ def update_sink_details(json_tree, csv_file):
             # 0: Data Sink ID, 1: Sink Label, 2: Code Snippet, 3: File Path,
             # 4: Line Number, 5: Column Number, 6: Data Flow Path, 7: AI Sink Label, 8: Code Summary
             file_path = row[3]
-            sink_detail = {
-                "ai_sink_label": row[7],
-                "code_summary": row[8],
-                "code_snippet": row[2],
-                "line_number": row[4],
-                "column_number": row[5]
-            }
+            sink_detail = SinkDetail(
+                ai_sink_label=row[7],
+                code_summary=row[8],
+                code_snippet=row[2],
+                line_number=row[4],
+                column_number=row[5]
+            )
             
             # Try to find the file node in the JSON tree
             node = find_file_node(json_tree, file_path, current_path="")
@@ -363,40 +726,80 @@ def update_sink_details(json_tree, csv_file):
             
             if node is not None:
                 # Append the sink_detail to the node's "sink_details" list.
-                node["sink_details"].append(sink_detail)
+                node.add_sink_detail(sink_detail)
+                add_count("sinks")
             else:
                 print(f"Warning: File path '{file_path}' not found in JSON tree.")
+                add_count("unmatched")
     
     return json_tree
 
-def process_privado_data():
+def enrichment_inputs() -> Dict[str, Any]:
+    """
+    Digests of the inputs of the enrichment: privado.json, the model, the sink
+    rules and the clustering threshold. A change to any of them invalidates
+    both the privado_enrich checkpoint and the progress of an interrupted run.
+    
+    Returns:
+        dict: Inputs of the enrichment
+    """
+    return {
+        "privado": file_digest(config.PRIVADO_OUTPUT_FILE),
+        "model": config.OPENAI_MODEL,
+        "sink_rules": config.SINK_RULES and (file_digest(config.SINK_RULES_FILE) or "builtin"),
+        "sink_clusters": config.SINK_CLUSTERING and config.SINK_CLUSTER_THRESHOLD,
+    }
+
+def process_privado_data(resume=False, inputs=None):
     """
     Process Privado data and create a CSV file.
+    
+    Progress is checkpointed every ENRICH_CHECKPOINT_ROWS rows.
+    
+    Args:
+        resume (bool, optional): Continue from the last checkpoint of an
+            interrupted enrichment with the same inputs. Defaults to False.
+        inputs (dict, optional): Inputs of the enrichment, as returned by
+            enrichment_inputs. Defaults to the current ones.
+    
+    Returns:
+        str: Path to the CSV file or None if an error occurred
     """
     try:
         # Extract data from privado.json
         rows = extract_privado_data()
-        if not rows:
+        first_row = next(rows, None)
+        if first_row is None:
             print("No data extracted from privado.json")
-            return
+            return None
+        
+        progress = EnrichmentProgress(config.PRIVADO_CSV_FILE, inputs or enrichment_inputs())
+        if not resume:
+            progress.clear()
         
         # Process the data and create CSV
-        process_data(rows)
+        output_file = process_data(counted(itertools.chain([first_row], rows), "rows"), progress=progress)
         
-        if os.path.exists(PRIVADO_CSV_FILE):
-            print(f"Successfully created: {PRIVADO_CSV_FILE}")
-        else:
-            print(f"Error: {PRIVADO_CSV_FILE} was not created")
+        if output_file is not None and os.path.exists(output_file):
+            progress.clear()
+            print(f"Successfully created: {output_file}")
+            return output_file
+        print(f"Error: {config.PRIVADO_CSV_FILE} was not created")
+        return None
     except Exception as e:
         print(f"Error processing privado data: {e}")
+        return None
 
 def update_json_with_sink_details():
     """
     Update the JSON tree with sink details from the CSV file.
+    
+    Returns:
+        str: Path to the updated JSON file or None if an error occurred
     """
     try:
-        output_json_file = AIDER_JSON_FILE  # JSON file generated in Task 2
-        csv_file = PRIVADO_CSV_FILE         # CSV file from privado processing
+        output_json_file = config.AIDER_JSON_FILE  # JSON file generated in Task 2
+        csv_file = config.PRIVADO_CSV_FILE         # CSV file from privado processing
         
         # Check if both files exist
         if not os.path.exists(output_json_file):
@@ -408,16 +811,16 @@ def update_json_with_sink_details():
             return
         
         # Load the current JSON tree
-        with open(output_json_file, 'r', encoding='utf-8') as f:
-            json_tree = json.load(f)
+        json_tree = load_tree(output_json_file)
         
         # Update the tree with sink details from the CSV
         updated_tree = update_sink_details(json_tree, csv_file)
         
         # Write the updated tree back to the JSON file
-        with open(output_json_file, 'w', encoding='utf-8') as f:
-            json.dump(updated_tree, f, indent=4, ensure_ascii=False)
+        dump_tree(updated_tree, output_json_file)
         
         print(f"Successfully updated {output_json_file} with sink details from {csv_file}")
+        return output_json_file
     except Exception as e:
-        print(f"Error updating JSON with sink details: {e}") 
\ No newline at end of file
+        print(f"Error updating JSON with sink details: {e}")
+        return None 
\ No newline at end of file
@@ -1,13 +1,41 @@
 import os
 import sys
-import json
 import re
-from src.config import AIDER_JSON_FILE
+import mmap
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from src import config
+from src.models import DirNode, FileNode, dump_tree
+from src.utils.metrics import counted
+
+# Patterns to detect class and method definitions.
+CLASS_PATTERN = re.compile(r'^[\s│]*class\s+(\w+)\s*[:\(]')
+METHOD_PATTERN = re.compile(r'^[\s│]*def\s+(\w+)\s*\(')
+
+# File headers in the repo map; updated regex to include more file extensions
+FILE_HEADER_RE = re.compile(r'^([a-zA-Z0-9._/\-]+(?:\.gitignore|\.py|\.sh|\.json|\.js|\.jsx|\.ts|\.tsx|\.css|\.html|\.md|\.svg|\.mjs))\:?\s*$')
+# The same headers matched across a whole memory-mapped file, one line at a time
+FILE_HEADER_BYTES_RE = re.compile(FILE_HEADER_RE.pattern[:-len(r'\s*$')].encode() + rb'[^\S\n]*$', re.MULTILINE)
+
+# Repo maps smaller than this are parsed in-process; a pool does not pay off
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+# Shards per worker, so uneven shards still keep every worker busy
+SHARDS_PER_WORKER = 4
+
+def _join_lines(lines):
+    """
+    Join collected lines the way the repo map JSON stores code blocks,
+    with every line terminated by a newline.
+    """
+    return "\n".join(lines) + "\n"
 
 def parse_file_content(content: str) -> dict:
     """
     Parses the content of a file summary and extracts classes and their methods.
     
+    Class bodies and method code are collected as lists of lines and joined once
+    when the block closes, so parsing stays linear in the size of the content.
+    
     Args:
         content (str): Content of the file summary
         
@@ -20,53 +48,62 @@ def parse_file_content(content: str) -> dict:
     
     current_class = None
     current_method = None
+    # Lines of the open class body and method code.
+    class_body_lines = []
+    method_code_lines = []
 
-    # Patterns to detect class and method definitions.
-    class_pattern = re.compile(r'^[\s│]*class\s+(\w+)\s*[:\(]')
-    method_pattern = re.compile(r'^[\s│]*def\s+(\w+)\s*\(')
+    def close_method():
+        current_method["code"] = _join_lines(method_code_lines)
+        current_class["methods"].append(current_method)
+
+    def close_class():
+        current_class["class_body"] = _join_lines(class_body_lines)
+        classes.append(current_class)
 
     for line in lines:
-        class_match = class_pattern.match(line)
-        method_match = method_pattern.match(line)
+        class_match = CLASS_PATTERN.match(line)
+        method_match = METHOD_PATTERN.match(line)
         
         if class_match:
             # Close any open method.
             if current_method is not None and current_class is not None:
-                current_class["methods"].append(current_method)
+                close_method()
                 current_method = None
             # Save the previous class if exists.
             if current_class is not None:
-                classes.append(current_class)
+                close_class()
             # Start a new class.
             class_name = class_match.group(1)
             current_class = {
                 "name": class_name,
-                "class_body": line + "\n",
+                "class_body": "",
                 "methods": []
             }
+            class_body_lines = [line]
         elif method_match and current_class is not None:
             # Found a method within a class.
             if current_method is not None:
-                current_class["methods"].append(current_method)
+                close_method()
             method_name = method_match.group(1)
             current_method = {
                 "name": method_name,
-                "code": line + "\n"
+                "code": ""
             }
+            method_code_lines = [line]
         else:
             # Ordinary line.
             if current_method is not None:
-                current_method["code"] += line + "\n"
+                method_code_lines.append(line)
             elif current_class is not None:
-                current_class["class_body"] += line + "\n"
+                class_body_lines.append(line)
             else:
                 file_other_lines.append(line)
 
     # Close any open blocks.
     if current_method is not None and current_class is not None:
-        current_class["methods"].append(current_method)
+        close_method()
     if current_class is not None:
-        classes.append(current_class)
+        close_class()
 
     result = {}
     if classes:
@@ -77,99 +114,206 @@ def parse_file_content(content: str) -> dict:
 
 def parse_input_file(input_file: str):
     """
-    Parses the input file and returns a list of tuples (filepath, content).
+    Parses the input file in a single streaming pass.
+    
+    Only the lines of the file section being read are held in memory.
     
     Args:
         input_file (str): Path to the input file
         
-    Returns:
-        list: List of tuples (filepath, content)
+    Yields:
+        tuple: (filepath, content) for each file section
     """
-    # Updated regex to include more file extensions
-    file_header_re = re.compile(r'^([a-zA-Z0-9._/\-]+(?:\.gitignore|\.py|\.sh|\.json|\.js|\.jsx|\.ts|\.tsx|\.css|\.html|\.md|\.svg|\.mjs))\:?\s*$')
-    
-    files = []
     current_filepath = None
     current_content_lines = []
     
     with open(input_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    in_file_section = False
-    for line in lines:
-        stripped_line = line.rstrip('\n')
-        header_match = file_header_re.match(stripped_line)
-        if not in_file_section:
+        for line in f:
+            stripped_line = line.rstrip('\n')
+            header_match = FILE_HEADER_RE.match(stripped_line)
             if header_match:
-                in_file_section = True
-            else:
-                continue  # Skip preamble lines
-        if header_match:
-            if current_filepath is not None:
-                files.append((current_filepath, "\n".join(current_content_lines).strip()))
-            current_filepath = header_match.group(1)
-            current_content_lines = []
-        else:
-            if current_filepath is not None:
+                if current_filepath is not None:
+                    yield current_filepath, "\n".join(current_content_lines).strip()
+                current_filepath = header_match.group(1)
+                current_content_lines = []
+            elif current_filepath is not None:
                 current_content_lines.append(stripped_line)
+            # Lines before the first header are preamble and skipped.
     if current_filepath is not None:
-        files.append((current_filepath, "\n".join(current_content_lines).strip()))
+        yield current_filepath, "\n".join(current_content_lines).strip()
+
+def find_file_sections(data) -> list:
+    """
+    Scans a repo map once for file headers and returns the byte range of
+    every file section.
     
-    return files
+    Args:
+        data (bytes | mmap.mmap): Contents of the repo map
+        
+    Returns:
+        list: Tuples (filepath, start, end) of each section's content, in file order
+    """
+    sections = []
+    filepath = None
+    start = 0
+    for match in FILE_HEADER_BYTES_RE.finditer(data):
+        if filepath is not None:
+            sections.append((filepath, start, match.start()))
+        filepath = match.group(1).decode('utf-8')
+        # Content starts on the line after the header
+        newline = data.find(b'\n', match.end())
+        start = len(data) if newline == -1 else newline + 1
+    if filepath is not None:
+        sections.append((filepath, start, len(data)))
+    return sections
 
-def insert_into_tree(root: dict, filepath: str, content: str) -> None:
+def shard_sections(sections: list, shards: int) -> list:
+    """
+    Splits file sections into contiguous shards of roughly equal byte size.
+    
+    Args:
+        sections (list): Tuples (filepath, start, end) in file order
+        shards (int): Number of shards to aim for
+        
+    Returns:
+        list: Lists of sections, in file order
+    """
+    if not sections:
+        return []
+    total = sections[-1][2] - sections[0][1]
+    target = max(1, total // max(1, shards))
+    result = []
+    current = []
+    current_size = 0
+    for section in sections:
+        current.append(section)
+        current_size += section[2] - section[1]
+        if current_size >= target:
+            result.append(current)
+            current = []
+            current_size = 0
+    if current:
+        result.append(current)
+    return result
+
+def parse_sections(input_file: str, sections: list) -> list:
+    """
+    Parses a shard of file sections from the memory-mapped repo map.
+    
+    Args:
+        input_file (str): Path to the input file
+        sections (list): Tuples (filepath, start, end)
+        
+    Returns:
+        list: Tuples (filepath, structure) in shard order
+    """
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        results = []
+        for filepath, start, end in sections:
+            # Text mode reads of the repo map translate line endings the same way
+            content = mm[start:end].decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+            results.append((filepath, parse_file_content(content.strip())))
+        return results
+
+def iter_file_structures_parallel(input_file: str, workers: int):
+    """
+    Parses the repo map across a process pool.
+    
+    The file is memory-mapped and scanned once for file headers; contiguous
+    byte ranges of file sections are then parsed by the workers and the
+    results are yielded in their original order.
+    
+    Args:
+        input_file (str): Path to the input file
+        workers (int): Number of worker processes
+        
+    Yields:
+        tuple: (filepath, structure)
+    """
+    with open(input_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        sections = find_file_sections(mm)
+    shards = shard_sections(sections, workers * SHARDS_PER_WORKER)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for results in pool.map(functools.partial(parse_sections, input_file), shards):
+            yield from results
+
+def iter_file_structures(input_file: str, workers: int = None):
+    """
+    Streams the parsed structure of every file in the repo map.
+    
+    Large repo maps are parsed in parallel when more than one worker is
+    configured; the output is the same either way.
+    
+    Args:
+        input_file (str): Path to the input file
+        workers (int, optional): Number of worker processes. Defaults to REPOMAP_WORKERS.
+        
+    Yields:
+        tuple: (filepath, structure)
+    """
+    workers = workers or config.REPOMAP_WORKERS
+    if workers > 1 and os.path.getsize(input_file) >= PARALLEL_MIN_BYTES:
+        yield from iter_file_structures_parallel(input_file, workers)
+        return
+    for filepath, content in parse_input_file(input_file):
+        yield filepath, parse_file_content(content)
+
+def insert_into_tree(root: DirNode, filepath: str, structure: dict, dir_index: dict = None) -> None:
     """
     Inserts a file into the directory tree.
     
     Args:
-        root (dict): Root of the directory tree
+        root (DirNode): Root of the directory tree
         filepath (str): Path to the file
-        content (str): Content of the file
+        structure (dict): Parsed structure of the file
+        dir_index (dict, optional): Name-to-child index of directory nodes keyed
+            by directory path, shared across inserts into the same tree. Defaults to None.
     """
+    if dir_index is None:
+        dir_index = {}
+    
     # Normalize the filepath to handle different formats
     filepath = filepath.replace('\\', '/')
     
     parts = filepath.split('/')
     current_node = root
+    current_path = ""
     for i, part in enumerate(parts):
         if i == len(parts) - 1:
             # File leaf node.
-            file_node = {
-                "name": part,
-                "structure": parse_file_content(content),
-                "source": [],
-                "data_model": [],
-                "third_party_dependencies": [],
-                "sink_details": [],
-                "vulnerabilities": []
-            }
-            if "children" not in current_node:
-                current_node["children"] = []
-            current_node["children"].append(file_node)
+            current_node.children.append(FileNode.from_structure(part, structure))
         else:
             # Directory node.
-            if "children" not in current_node:
-                current_node["children"] = []
-            dir_node = next((child for child in current_node["children"] 
-                             if child["name"] == part and "children" in child), None)
+            child_dirs = dir_index.get(current_path)
+            if child_dirs is None:
+                # First visit: index the directories already under this node.
+                child_dirs = {}
+                for child in current_node.children:
+                    if isinstance(child, DirNode):
+                        child_dirs.setdefault(child.name, child)
+                dir_index[current_path] = child_dirs
+            dir_node = child_dirs.get(part)
             if dir_node is None:
-                dir_node = {"name": part, "children": []}
-                current_node["children"].append(dir_node)
+                dir_node = DirNode(part)
+                current_node.children.append(dir_node)
+                child_dirs[part] = dir_node
             current_node = dir_node
+            current_path = f"{current_path}/{part}"
 
 def build_directory_tree(files):
     """
     Builds and returns the full directory tree.
     
     Args:
-        files (list): List of tuples (filepath, content)
+        files (iterable): Tuples (filepath, structure)
         
     Returns:
-        dict: Directory tree
+        DirNode: Directory tree
     """
-    root = {"name": "root", "children": []}
-    for filepath, content in files:
-        insert_into_tree(root, filepath, content)
+    root = DirNode("root")
+    dir_index = {}
+    for filepath, structure in files:
+        insert_into_tree(root, filepath, structure, dir_index)
     return root
 
 def convert_to_json(input_file):
@@ -182,15 +326,14 @@ def convert_to_json(input_file):
     Returns:
         str: Path to the output JSON file
     """
-    output_file = AIDER_JSON_FILE
+    output_file = config.AIDER_JSON_FILE
     try:
         # Parse the input file and build the directory tree
-        files = parse_input_file(input_file)
+        files = counted(iter_file_structures(input_file), "files")
         tree = build_directory_tree(files)
         
         # Write the tree to the output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(tree, f, indent=4, ensure_ascii=False)
+        dump_tree(tree, output_file)
         
         print(f"Successfully created: {output_file}")
         return output_file
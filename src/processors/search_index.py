@@ -0,0 +1,130 @@
+"""
+Full-text search over the analysis database.
+
+Method code, sink labels and summaries, and vulnerability fix messages are
+indexed in an SQLite FTS5 table inside analysis.db while the database is
+written, so users can find every sink whose summary mentions S3 or every
+method that references a function without grepping output.csv.
+"""
+
+import sqlite3
+
+# Kinds of indexed documents
+SEARCH_KINDS = ("method", "sink", "vulnerability")
+
+CREATE_SEARCH_TABLE = """
+CREATE VIRTUAL TABLE search_index USING fts5(
+    kind UNINDEXED, ref_id UNINDEXED, path UNINDEXED, label, content
+)
+"""
+
+# One statement per kind, filled from the tables written by the SQLite export
+POPULATE_SEARCH_TABLE = [
+    """INSERT INTO search_index (kind, ref_id, path, label, content)
+       SELECT 'method', method_id, path, class_name || '.' || name, code FROM methods""",
+    """INSERT INTO search_index (kind, ref_id, path, label, content)
+       SELECT 'sink', sink_id, path, ai_sink_label, code_summary FROM sinks""",
+    """INSERT INTO search_index (kind, ref_id, path, label, content)
+       SELECT 'vulnerability', vulnerability_id, path, risk_level, message_to_fix FROM vulnerabilities"""
+]
+
+# Matches weigh a hit in the label (sink label, method name) above the content
+_RANK = "bm25(search_index, 4.0, 1.0)"
+
+
+def fts5_available():
+    """
+    Check whether the SQLite library was built with FTS5.
+
+    Returns:
+        bool: True if FTS5 tables can be created
+    """
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE probe USING fts5(content)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def build_search_index(cursor):
+    """
+    Create and fill the full-text index from the methods, sinks and
+    vulnerabilities tables of an open analysis database.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor inside the export transaction
+    """
+    cursor.execute(CREATE_SEARCH_TABLE)
+    for statement in POPULATE_SEARCH_TABLE:
+        cursor.execute(statement)
+    # Merge the index segments written by the bulk insert for faster queries
+    cursor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+
+def build_match_query(text):
+    """
+    Turn free text into an FTS5 query that matches documents containing every term.
+
+    Each term is quoted, so characters such as '.', '-' or '(' in code search
+    for the phrase of its tokens instead of being read as query syntax. A
+    trailing '*' on a term is kept as a prefix search.
+
+    Args:
+        text (str): Search text, e.g. "put_object bucket"
+
+    Returns:
+        str: FTS5 match expression or None if the text has no terms
+    """
+    terms = []
+    for term in text.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', '""')
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+
+def search(db_file, text, kind=None, limit=20, offset=0):
+    """
+    Search the full-text index.
+
+    Args:
+        db_file (str): Path to the analysis database
+        text (str): Search text
+        kind (str, optional): Restrict hits to "method", "sink" or "vulnerability"
+        limit (int, optional): Maximum number of hits. Defaults to 20.
+        offset (int, optional): Number of hits to skip. Defaults to 0.
+
+    Returns:
+        dict: Total number of hits and the requested page, best match first
+    """
+    match = build_match_query(text)
+    if match is None:
+        return {"total": 0, "results": []}
+    if kind is not None and kind not in SEARCH_KINDS:
+        raise ValueError(f"Unknown search kind '{kind}'. Expected one of: {', '.join(SEARCH_KINDS)}")
+
+    where = "search_index MATCH ?"
+    params = [match]
+    if kind:
+        where += " AND kind = ?"
+        params.append(kind)
+
+    conn = sqlite3.connect(db_file)
+    try:
+        conn.row_factory = sqlite3.Row
+        total = conn.execute(f"SELECT count(*) FROM search_index WHERE {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT kind, ref_id, path, label, "
+            f"snippet(search_index, 4, '[', ']', '...', 16) AS snippet, {_RANK} AS score "
+            f"FROM search_index WHERE {where} ORDER BY score LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+    finally:
+        conn.close()
+    # bm25 scores are negative, lower is better; report them as positive relevance
+    results = [dict(row, score=-row["score"]) for row in rows]
+    return {"total": total, "results": results}
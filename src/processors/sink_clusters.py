@@ -0,0 +1,188 @@
+"""
+Clustering of near-duplicate sink occurrences for the enrichment.
+
+Large codebases repeat the same sink call in many places with only the
+variable names changed (``logger.info(user.email)`` and
+``logger.info(customer.email)``). Snippets are normalized by replacing
+identifiers, string and number literals with placeholders; attribute and
+method names are kept, since they say what the call does. Rows of the same
+sink id whose normalized snippets are equal, or whose MinHash signatures
+estimate a Jaccard similarity of at least SINK_CLUSTER_THRESHOLD over token
+shingles, form a cluster. The first row of a cluster that the model labels
+becomes its representative, and later members reuse its label.
+"""
+
+import re
+import random
+import hashlib
+
+from src import config
+
+# Strings, numbers, identifiers and single punctuation characters
+TOKEN_RE = re.compile(r"""
+    "(?:\\.|[^"\\])*"
+  | '(?:\\.|[^'\\])*'
+  | `[^`]*`
+  | \d+(?:\.\d+)?
+  | [A-Za-z_$][\w$]*
+  | \S
+""", re.VERBOSE)
+
+# Snippets are fingerprinted on at most this many tokens
+MAX_TOKENS = 2000
+
+# Tokens per shingle
+SHINGLE_SIZE = 3
+
+# MinHash signature of NUM_BANDS bands of BAND_ROWS values each; rows whose
+# signatures agree on a whole band become candidates and are then compared on
+# the full signature
+NUM_BANDS = 8
+BAND_ROWS = 4
+NUM_PERMUTATIONS = NUM_BANDS * BAND_ROWS
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)]
+
+
+def normalize_snippet(snippet):
+    """
+    Reduce a code snippet to its shape.
+
+    Args:
+        snippet (str): Code snippet
+
+    Returns:
+        list: Tokens, with literals replaced by STR or NUM and identifiers by
+            ID unless they follow a "."
+    """
+    tokens = []
+    for match in TOKEN_RE.finditer(snippet):
+        token = match.group()
+        first = token[0]
+        if first in "\"'`":
+            token = "STR"
+        elif first.isdigit():
+            token = "NUM"
+        elif (first.isalpha() or first in "_$") and not (tokens and tokens[-1] == "."):
+            token = "ID"
+        tokens.append(token)
+        if len(tokens) == MAX_TOKENS:
+            break
+    return tokens
+
+
+def _hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash_signature(tokens):
+    """
+    MinHash signature of the token shingles of a normalized snippet.
+
+    Args:
+        tokens (list): Normalized tokens
+
+    Returns:
+        tuple: NUM_PERMUTATIONS minimum hash values
+    """
+    if len(tokens) <= SHINGLE_SIZE:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    hashes = [_hash(shingle) for shingle in shingles]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimate_similarity(signature, other):
+    """
+    Estimate the Jaccard similarity of two snippets from their signatures.
+
+    Args:
+        signature (tuple): MinHash signature
+        other (tuple): MinHash signature
+
+    Returns:
+        float: Share of equal signature values
+    """
+    return sum(1 for a, b in zip(signature, other) if a == b) / NUM_PERMUTATIONS
+
+
+class SinkClusterIndex:
+    """
+    Representatives of the sink clusters seen so far and their labels.
+
+    Args:
+        threshold (float, optional): Minimum estimated similarity for a near
+            match. Defaults to SINK_CLUSTER_THRESHOLD.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold if threshold is not None else config.SINK_CLUSTER_THRESHOLD
+        self.exact = {}  # (sink id, normalized snippet) -> representative
+        self.bands = {}  # (sink id, band, band values) -> representatives
+        self.representatives = 0
+        self.members = 0
+
+    @staticmethod
+    def _key(row):
+        tokens = normalize_snippet(str(row.get("Code Snippet") or ""))
+        return str(row.get("Data Sink ID") or ""), tokens
+
+    def find(self, row):
+        """
+        Find the cluster of a row.
+
+        Args:
+            row (dict): Extracted Privado row
+
+        Returns:
+            tuple: (labels of the representative as (sink label, code summary),
+                estimated similarity), or None if the row starts a new cluster
+        """
+        sink_id, tokens = self._key(row)
+        labels = self.exact.get((sink_id, " ".join(tokens)))
+        if labels is not None:
+            self.members += 1
+            return labels, 1.0
+        signature = minhash_signature(tokens)
+        best, best_similarity = None, 0.0
+        for band in range(NUM_BANDS):
+            values = signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]
+            for candidate_signature, labels in self.bands.get((sink_id, band, values), ()):
+                similarity = estimate_similarity(signature, candidate_signature)
+                if similarity > best_similarity:
+                    best, best_similarity = labels, similarity
+        if best is None or best_similarity < self.threshold:
+            return None
+        self.members += 1
+        return best, best_similarity
+
+    def add(self, row, sink_label, summary):
+        """
+        Make a labelled row the representative of its cluster.
+
+        Args:
+            row (dict): Extracted Privado row
+            sink_label (str): Label the model gave the row
+            summary (str): Code summary the model gave the row
+        """
+        sink_id, tokens = self._key(row)
+        labels = (sink_label, summary)
+        self.exact.setdefault((sink_id, " ".join(tokens)), labels)
+        signature = minhash_signature(tokens)
+        for band in range(NUM_BANDS):
+            values = signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]
+            self.bands.setdefault((sink_id, band, values), []).append((signature, labels))
+        self.representatives += 1
+
+    def report(self):
+        """
+        Describe the clustering for the end-of-run report.
+
+        Returns:
+            str: Representatives labelled by the model and members labelled from them
+        """
+        return (f"Sink clusters: {self.representatives} representatives labelled by the model, "
+                f"{self.members} rows labelled from a representative")
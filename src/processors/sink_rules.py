@@ -0,0 +1,236 @@
+"""
+Rules that label well-known Privado sinks without asking the model.
+
+A rule matches a row by a regular expression on its Data Sink ID, on its code
+snippet, or on both, and gives the row a sink label and a code summary. Both
+are templates filled in with the fields of the row:
+
+    {sink_id}      Data Sink ID, e.g. "Storages.AmazonS3.Write"
+    {sink_name}    Sink Label reported by Privado
+    {file_path}    File Path of the sink
+    {line_number}  Line Number of the sink
+
+Rules are tried in order and the first match wins. Rules read from
+SINK_RULES_FILE (a JSON list of objects with the keys of BUILTIN_RULES) are
+tried before the built-in ones, so they can add sinks or override them.
+"""
+
+import re
+import json
+from collections import Counter
+
+from src import config
+
+BUILTIN_RULES = [
+    # Logging
+    {"name": "log", "sink_id": r"^Leakages\.Log\.",
+     "label": "Application log",
+     "summary": "Writes data to the application log ({sink_name}) at {file_path}:{line_number}."},
+    {"name": "console_log", "snippet": r"\bconsole\.(log|info|warn|error|debug)\s*\(",
+     "label": "Application log",
+     "summary": "Writes data to the console log at {file_path}:{line_number}."},
+    # Object storage
+    {"name": "s3", "sink_id": r"^Storages\.AmazonS3\.",
+     "label": "S3 bucket",
+     "summary": "Accesses an Amazon S3 bucket ({sink_name}) at {file_path}:{line_number}."},
+    {"name": "gcs", "sink_id": r"^Storages\.Google\.?CloudStorage\.",
+     "label": "Google Cloud Storage bucket",
+     "summary": "Accesses a Google Cloud Storage bucket ({sink_name}) at {file_path}:{line_number}."},
+    {"name": "azure_blob", "sink_id": r"^Storages\.Azure\.?(Blob|Storage)",
+     "label": "Azure Blob Storage container",
+     "summary": "Accesses an Azure Blob Storage container ({sink_name}) at {file_path}:{line_number}."},
+    # Databases and caches
+    {"name": "dynamodb", "sink_id": r"^Storages\.Amazon\.?DynamoDB\.",
+     "label": "DynamoDB table",
+     "summary": "Reads or writes a DynamoDB table ({sink_name}) at {file_path}:{line_number}."},
+    {"name": "mongodb", "sink_id": r"^Storages\.MongoDB\.",
+     "label": "MongoDB collection",
+     "summary": "Reads or writes a MongoDB collection ({sink_name}) at {file_path}:{line_number}."},
+    {"name": "redis", "sink_id": r"^Storages\.Redis\.",
+     "label": "Redis cache",
+     "summary": "Reads or writes a Redis cache ({sink_name}) at {file_path}:{line_number}."},
+    {"name": "elasticsearch", "sink_id": r"^Storages\.Elasticsearch\.",
+     "label": "Elasticsearch index",
+     "summary": "Reads or writes an Elasticsearch index ({sink_name}) at {file_path}:{line_number}."},
+    {"name": "firestore", "sink_id": r"^Storages\.(Google\.)?Firebase",
+     "label": "Firebase database",
+     "summary": "Reads or writes a Firebase database ({sink_name}) at {file_path}:{line_number}."},
+    {"name": "relational_db", "sink_id": r"^Storages\.(Postgres|PostgreSQL|MySQL|MariaDB|SQLite|Oracle|MSSQL|SqlServer)",
+     "label": "Relational database",
+     "summary": "Reads or writes a relational database ({sink_name}) at {file_path}:{line_number}."},
+    {"name": "orm", "sink_id": r"^Storages\.(SpringFramework\.Jdbc|Hibernate|JPA|Sequelize|TypeORM|Prisma|Django|SQLAlchemy)",
+     "label": "Database via ORM",
+     "summary": "Reads or writes a database through an ORM ({sink_name}) at {file_path}:{line_number}."},
+    # Third parties
+    {"name": "third_party_sdk", "sink_id": r"^ThirdParties\.SDK\.",
+     "label": "Third-party SDK: {sink_name}",
+     "summary": "Sends data to the third-party SDK {sink_name} at {file_path}:{line_number}."},
+]
+
+_TEMPLATE_FIELDS = {"sink_id": "", "sink_name": "", "file_path": "", "line_number": ""}
+
+
+class SinkRule:
+    """
+    A rule that labels the rows it matches.
+
+    Args:
+        name (str): Name reported in the coverage
+        label (str): Sink label template
+        summary (str): Code summary template
+        sink_id (str, optional): Regular expression searched in the Data Sink ID
+        snippet (str, optional): Regular expression searched in the Code Snippet
+    """
+    __slots__ = ("name", "label", "summary", "sink_id", "snippet")
+
+    def __init__(self, name, label, summary, sink_id=None, snippet=None):
+        if sink_id is None and snippet is None:
+            raise ValueError(f"Sink rule '{name}' needs a sink_id or a snippet pattern")
+        self.name = name
+        self.label = label
+        self.summary = summary
+        self.sink_id = re.compile(sink_id, re.IGNORECASE) if sink_id is not None else None
+        self.snippet = re.compile(snippet) if snippet is not None else None
+        # Fail on unknown placeholders when the rule is loaded rather than on the first match
+        label.format_map(_TEMPLATE_FIELDS)
+        summary.format_map(_TEMPLATE_FIELDS)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["label"], data["summary"], data.get("sink_id"), data.get("snippet"))
+
+    def matches(self, row):
+        """
+        Check whether the rule applies to a row.
+
+        Args:
+            row (dict): Extracted Privado row
+
+        Returns:
+            bool: True if every pattern of the rule matches
+        """
+        if self.sink_id is not None and not self.sink_id.search(str(row.get("Data Sink ID") or "")):
+            return False
+        if self.snippet is not None and not self.snippet.search(str(row.get("Code Snippet") or "")):
+            return False
+        return True
+
+    def apply(self, row):
+        """
+        Fill in the rule's templates for a row.
+
+        Args:
+            row (dict): Extracted Privado row
+
+        Returns:
+            tuple: (sink label, code summary)
+        """
+        fields = {
+            "sink_id": row.get("Data Sink ID", "N/A"),
+            "sink_name": row.get("Sink Label", "N/A"),
+            "file_path": row.get("File Path", "N/A"),
+            "line_number": row.get("Line Number", "N/A"),
+        }
+        return self.label.format_map(fields), self.summary.format_map(fields)
+
+
+def load_sink_rules(rules_file=None):
+    """
+    Load the rules from SINK_RULES_FILE followed by the built-in rules.
+
+    A rules file that cannot be read is reported and skipped.
+
+    Args:
+        rules_file (str, optional): JSON file with extra rules. Defaults to SINK_RULES_FILE.
+
+    Returns:
+        list: SinkRule objects in matching order
+    """
+    rules_file = rules_file or config.SINK_RULES_FILE
+    extra = []
+    if rules_file:
+        try:
+            with open(rules_file, "r", encoding="utf-8") as f:
+                extra = [SinkRule.from_dict(rule) for rule in json.load(f)]
+            print(f"Loaded {len(extra)} sink rules from {rules_file}")
+        except (OSError, ValueError, KeyError, TypeError, re.error) as e:
+            print(f"Error loading sink rules from {rules_file}: {e}")
+            extra = []
+    return extra + [SinkRule.from_dict(rule) for rule in BUILTIN_RULES]
+
+
+def match_sink_rule(row, rules):
+    """
+    Find the first rule that applies to a row.
+
+    Args:
+        row (dict): Extracted Privado row
+        rules (list): SinkRule objects in matching order
+
+    Returns:
+        SinkRule: The matching rule, or None
+    """
+    for rule in rules:
+        if rule.matches(row):
+            return rule
+    return None
+
+
+class RuleCoverage:
+    """
+    How many rows the rules labelled, by rule, and which sinks they missed.
+    """
+
+    def __init__(self):
+        self.rules = Counter()
+        self.unmatched = Counter()
+
+    def record(self, row, rule):
+        """
+        Record the outcome of matching a row.
+
+        Args:
+            row (dict): Extracted Privado row
+            rule (SinkRule): The matching rule, or None
+        """
+        if rule is not None:
+            self.rules[rule.name] += 1
+        else:
+            self.unmatched[row.get("Data Sink ID") or "N/A"] += 1
+
+    @property
+    def matched_rows(self):
+        return sum(self.rules.values())
+
+    @property
+    def total_rows(self):
+        return self.matched_rows + sum(self.unmatched.values())
+
+    def report(self, top=10):
+        """
+        Describe the coverage for the end-of-run report.
+
+        Args:
+            top (int, optional): Unmatched sink ids to list. Defaults to 10.
+
+        Returns:
+            str: Coverage summary
+        """
+        total = self.total_rows
+        share = self.matched_rows / total if total else 0.0
+        lines = [f"Sink rules labelled {self.matched_rows} of {total} rows ({share:.0%})"]
+        for name, count in self.rules.most_common():
+            lines.append(f"  {name}: {count}")
+        if self.unmatched:
+            lines.append("Most frequent sinks sent to the model:")
+            for sink_id, count in self.unmatched.most_common(top):
+                lines.append(f"  {sink_id}: {count}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "rows": self.total_rows,
+            "rule_labelled": self.matched_rows,
+            "rules": dict(self.rules.most_common()),
+            "unmatched_sink_ids": dict(self.unmatched.most_common()),
+        }
@@ -0,0 +1,249 @@
+"""
+SQLite analysis database.
+
+Writes the normalized tables of aider_repomap.json, plus the Privado data-flow
+paths, to an indexed SQLite database so questions like "all HIGH
+vulnerabilities under services/payments" are answered with an indexed query
+instead of loading and walking the whole JSON tree.
+"""
+
+import os
+import csv
+import sqlite3
+import itertools
+
+from src import config
+from src.models import load_tree
+from src.utils.metrics import add_count
+from src.processors.tables import TABLE_COLUMNS, iter_table_rows, to_int
+from src.processors.search_index import build_search_index, fts5_available
+
+# Rows inserted per executemany call
+INSERT_BATCH_SIZE = 10000
+
+# Data Flow Path values that describe a direct sink location rather than a path
+NON_PATH_FLOWS = ("Sink Processing Occurrence - Direct Location", "No Data Flow Path Available")
+
+_SQL_TYPES = {"int": "INTEGER", "str": "TEXT", "dict": "TEXT"}
+
+DATA_FLOW_COLUMNS = [
+    ("flow_id", "int"), ("sink_id", "int"), ("data_sink_id", "str"), ("sink_label", "str"),
+    ("path", "str"), ("line_number", "int"), ("column_number", "int"),
+    ("data_flow_path", "str"), ("hop_count", "int")
+]
+
+# Foreign keys per table, appended to the column definitions
+FOREIGN_KEYS = {
+    "classes": ["FOREIGN KEY (file_id) REFERENCES files(file_id)"],
+    "methods": ["FOREIGN KEY (class_id) REFERENCES classes(class_id)",
+                "FOREIGN KEY (file_id) REFERENCES files(file_id)"],
+    "sinks": ["FOREIGN KEY (file_id) REFERENCES files(file_id)"],
+    "vulnerabilities": ["FOREIGN KEY (file_id) REFERENCES files(file_id)"],
+    "data_flow_paths": ["FOREIGN KEY (sink_id) REFERENCES sinks(sink_id)"]
+}
+
+# Created after the bulk load, which is faster than maintaining them per insert
+INDEXES = [
+    "CREATE INDEX idx_files_path ON files (path)",
+    "CREATE INDEX idx_classes_file ON classes (file_id)",
+    "CREATE INDEX idx_methods_class ON methods (class_id)",
+    "CREATE INDEX idx_methods_file ON methods (file_id)",
+    "CREATE INDEX idx_sinks_label ON sinks (ai_sink_label, path)",
+    "CREATE INDEX idx_sinks_path ON sinks (path)",
+    "CREATE INDEX idx_sinks_location ON sinks (file_id, line_number)",
+    "CREATE INDEX idx_vulnerabilities_risk ON vulnerabilities (risk_level, path)",
+    "CREATE INDEX idx_vulnerabilities_path ON vulnerabilities (path)",
+    "CREATE INDEX idx_vulnerabilities_location ON vulnerabilities (file_id, line_number)",
+    "CREATE INDEX idx_data_flow_paths_sink ON data_flow_paths (sink_id)",
+    "CREATE INDEX idx_data_flow_paths_location ON data_flow_paths (path, line_number)"
+]
+
+# Links each data-flow path to the sink recorded at the same file location
+LINK_DATA_FLOW_PATHS = """
+UPDATE data_flow_paths SET sink_id = (
+    SELECT s.sink_id FROM sinks s
+    WHERE s.path = data_flow_paths.path
+      AND s.line_number IS data_flow_paths.line_number
+      AND s.column_number IS data_flow_paths.column_number
+    ORDER BY s.sink_id LIMIT 1
+)
+"""
+
+# Largest code point, used as the exclusive upper bound of a path prefix range
+_PREFIX_END = "\U0010ffff"
+
+
+def _create_table(cursor, table, columns):
+    definitions = [f"{name} {_SQL_TYPES[kind]}" for name, kind in columns]
+    definitions[0] += " PRIMARY KEY"
+    definitions.extend(FOREIGN_KEYS.get(table, []))
+    cursor.execute(f"CREATE TABLE {table} ({', '.join(definitions)})")
+
+
+def _insert_sql(table, columns):
+    placeholders = ", ".join("?" for _ in columns)
+    return f"INSERT INTO {table} VALUES ({placeholders})"
+
+
+def iter_data_flow_rows(csv_file):
+    """
+    Read the data-flow paths from the processed Privado CSV.
+
+    Args:
+        csv_file (str): Path to privado_output.csv
+
+    Yields:
+        tuple: Row in DATA_FLOW_COLUMNS order, with sink_id left empty
+    """
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # skip header row
+        for flow_id, row in enumerate(reader, 1):
+            # 0: Data Sink ID, 1: Sink Label, 2: Code Snippet, 3: File Path,
+            # 4: Line Number, 5: Column Number, 6: Data Flow Path
+            flow = row[6]
+            hop_count = 0 if flow in NON_PATH_FLOWS else len(flow.split(" -> "))
+            yield (flow_id, None, row[0], row[1], row[3].replace('\\', '/'),
+                   to_int(row[4]), to_int(row[5]), flow, hop_count)
+
+
+def write_analysis_db(tree, db_file, privado_csv_file=None, search_index=None):
+    """
+    Write the analysis tree to a new SQLite database.
+
+    The database is built in a temporary file inside a single transaction and
+    moved into place once complete, so readers never see a partial database.
+
+    Args:
+        tree (DirNode): Root of the tree
+        db_file (str): Path to the database file
+        privado_csv_file (str, optional): Processed Privado CSV with the
+            data-flow paths. Skipped when None or missing.
+        search_index (bool, optional): Build the full-text search index.
+            Defaults to SEARCH_INDEX.
+
+    Returns:
+        dict: Number of rows written per table
+    """
+    if search_index is None:
+        search_index = config.SEARCH_INDEX
+    if search_index and not fts5_available():
+        print("Warning: SQLite was built without FTS5. Skipping the full-text search index.")
+        search_index = False
+
+    tmp_file = db_file + ".tmp"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    counts = dict.fromkeys(TABLE_COLUMNS, 0)
+    counts["data_flow_paths"] = 0
+    conn = sqlite3.connect(tmp_file)
+    try:
+        # The temporary file is discarded on failure, so durability is not needed while loading
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        cursor = conn.cursor()
+        cursor.execute("BEGIN")
+        for table, columns in TABLE_COLUMNS.items():
+            _create_table(cursor, table, columns)
+        _create_table(cursor, "data_flow_paths", DATA_FLOW_COLUMNS)
+
+        # Rows of all tables arrive interleaved; insert them per table in batches
+        pending = {table: [] for table in TABLE_COLUMNS}
+        statements = {table: _insert_sql(table, columns) for table, columns in TABLE_COLUMNS.items()}
+        for table, row in iter_table_rows(tree):
+            rows = pending[table]
+            rows.append(row)
+            if len(rows) >= INSERT_BATCH_SIZE:
+                cursor.executemany(statements[table], rows)
+                counts[table] += len(rows)
+                rows.clear()
+        for table, rows in pending.items():
+            cursor.executemany(statements[table], rows)
+            counts[table] += len(rows)
+
+        if privado_csv_file and os.path.exists(privado_csv_file):
+            statement = _insert_sql("data_flow_paths", DATA_FLOW_COLUMNS)
+            flows = iter_data_flow_rows(privado_csv_file)
+            while True:
+                rows = list(itertools.islice(flows, INSERT_BATCH_SIZE))
+                if not rows:
+                    break
+                cursor.executemany(statement, rows)
+                counts["data_flow_paths"] += len(rows)
+
+        for statement in INDEXES:
+            cursor.execute(statement)
+        cursor.execute(LINK_DATA_FLOW_PATHS)
+        if search_index:
+            build_search_index(cursor)
+        cursor.execute("COMMIT")
+        cursor.execute("ANALYZE")
+    except Exception:
+        conn.close()
+        os.remove(tmp_file)
+        raise
+    conn.close()
+    os.replace(tmp_file, db_file)
+    return counts
+
+
+def query_vulnerabilities(db_file, risk_level=None, path_prefix=None, limit=100, offset=0):
+    """
+    Look up vulnerabilities by risk level and directory.
+
+    Args:
+        db_file (str): Path to the database file
+        risk_level (str, optional): Risk level such as "HIGH"
+        path_prefix (str, optional): Directory to search under, e.g. "services/payments"
+        limit (int, optional): Maximum number of rows. Defaults to 100.
+        offset (int, optional): Number of rows to skip. Defaults to 0.
+
+    Returns:
+        list: Vulnerabilities as dictionaries, ordered by path and line number
+    """
+    conditions = []
+    params = []
+    if risk_level:
+        conditions.append("risk_level = ?")
+        params.append(risk_level.upper())
+    if path_prefix:
+        # A range on path uses the index, unlike LIKE
+        prefix = path_prefix.strip("/") + "/"
+        conditions.append("path >= ? AND path < ?")
+        params.extend([prefix, prefix + _PREFIX_END])
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = (f"SELECT path, line_number, risk_level, code_snippet, ref_link, message_to_fix "
+           f"FROM vulnerabilities {where} ORDER BY path, line_number LIMIT ? OFFSET ?")
+    conn = sqlite3.connect(db_file)
+    try:
+        conn.row_factory = sqlite3.Row
+        return [dict(row) for row in conn.execute(sql, params + [limit, offset])]
+    finally:
+        conn.close()
+
+
+def export_sqlite():
+    """
+    Export aider_repomap.json and the Privado data-flow paths to the analysis database.
+
+    Returns:
+        str: Path to the database file or None if an error occurred
+    """
+    json_file = config.AIDER_JSON_FILE
+    if not os.path.exists(json_file):
+        print(f"Error: {json_file} not found")
+        return None
+
+    try:
+        tree = load_tree(json_file)
+        counts = write_analysis_db(tree, config.ANALYSIS_DB_FILE, config.PRIVADO_CSV_FILE)
+        for table, count in counts.items():
+            add_count(table, count)
+    except Exception as e:
+        print(f"Error writing analysis database: {e}")
+        return None
+
+    summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(f"Analysis database generated successfully at: {config.ANALYSIS_DB_FILE} ({summary})")
+    return config.ANALYSIS_DB_FILE
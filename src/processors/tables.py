@@ -0,0 +1,82 @@
+"""
+Normalized tables of the analysis tree.
+
+The tabular exporters (Parquet, SQLite) share these table definitions and the
+walk that flattens aider_repomap.json into files, classes, methods, sinks and
+vulnerabilities rows.
+"""
+
+from src.models import iter_files
+
+# Columns of each table as (name, kind). "dict" columns repeat a small set of
+# values (paths, names, labels) and are dictionary encoded.
+TABLE_COLUMNS = {
+    "files": [
+        ("file_id", "int"), ("path", "dict"), ("name", "dict"), ("other", "str"),
+        ("class_count", "int"), ("sink_count", "int"), ("vulnerability_count", "int")
+    ],
+    "classes": [
+        ("class_id", "int"), ("file_id", "int"), ("path", "dict"), ("name", "dict"),
+        ("class_body", "str")
+    ],
+    "methods": [
+        ("method_id", "int"), ("class_id", "int"), ("file_id", "int"), ("path", "dict"),
+        ("class_name", "dict"), ("name", "dict"), ("code", "str")
+    ],
+    "sinks": [
+        ("sink_id", "int"), ("file_id", "int"), ("path", "dict"), ("ai_sink_label", "dict"),
+        ("code_summary", "str"), ("code_snippet", "str"), ("line_number", "int"),
+        ("column_number", "int")
+    ],
+    "vulnerabilities": [
+        ("vulnerability_id", "int"), ("file_id", "int"), ("path", "dict"), ("risk_level", "dict"),
+        ("ref_link", "dict"), ("message_to_fix", "str"), ("code_snippet", "str"),
+        ("line_number", "int")
+    ]
+}
+
+
+def to_int(value):
+    """
+    Convert a line or column number read from a CSV report to an int.
+
+    Args:
+        value: Number, numeric string or empty value
+
+    Returns:
+        int: Parsed number or None if the value is not numeric
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_table_rows(tree):
+    """
+    Flatten the analysis tree into rows of the normalized tables.
+
+    Args:
+        tree (DirNode): Root of the tree
+
+    Yields:
+        tuple: (table name, row tuple in TABLE_COLUMNS order)
+    """
+    class_id = method_id = sink_id = vulnerability_id = 0
+    for file_id, (path, node) in enumerate(iter_files(tree), 1):
+        yield "files", (file_id, path, node.name, node.other, len(node.classes),
+                        len(node.sink_details), len(node.vulnerabilities))
+        for cls in node.classes:
+            class_id += 1
+            yield "classes", (class_id, file_id, path, cls.name, cls.class_body)
+            for method in cls.methods:
+                method_id += 1
+                yield "methods", (method_id, class_id, file_id, path, cls.name, method.name, method.code)
+        for sink in node.sink_details:
+            sink_id += 1
+            yield "sinks", (sink_id, file_id, path, sink.ai_sink_label, sink.code_summary,
+                            sink.code_snippet, to_int(sink.line_number), to_int(sink.column_number))
+        for vuln in node.vulnerabilities:
+            vulnerability_id += 1
+            yield "vulnerabilities", (vulnerability_id, file_id, path, vuln.risk_level, vuln.ref_link,
+                                      vuln.message_to_fix, vuln.code_snippet, to_int(vuln.line_number))
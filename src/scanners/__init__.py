@@ -1,6 +1,7 @@
 from src.scanners.aider_scanner import create_aider_script, run_aider_scan
 from src.scanners.privado_scanner import create_privado_script, run_privado_scan, handle_existing_privado_folder
 from src.scanners.bearer_scanner import create_bearer_script, run_bearer_scan
+from src.scanners.ast_scanner import run_ast_scan
 
 __all__ = [
     'create_aider_script',
@@ -9,5 +10,6 @@ __all__ = [
     'run_privado_scan',
     'handle_existing_privado_folder',
     'create_bearer_script',
-    'run_bearer_scan'
+    'run_bearer_scan',
+    'run_ast_scan'
 ] 
\ No newline at end of file
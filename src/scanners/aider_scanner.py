@@ -1,7 +1,7 @@
 import os
 import sys
 from src.utils import create_script, run_script, copy_file
-from src.config import AIDER_MAP_TOKENS, AIDER_OUTPUT_FILE, FILES_DIR
+from src import config
 
 # Default Privado CLI path if not specified in config
 DEFAULT_PRIVADO_CLI_PATH = "/home/prajwalak/Documents/privado-cli"
@@ -21,11 +21,11 @@ def create_aider_script():
         print("  export OPENAI_API_KEY=your_api_key_here")
         sys.exit(1)
     
-    script_name = os.path.join(FILES_DIR, "run_aider.sh")
+    script_name = os.path.join(config.FILES_DIR, "run_aider.sh")
     script_content = f"""#!/bin/bash
 cd "$1"
 # Run aider and save output to the target directory
-aider --map-tokens {AIDER_MAP_TOKENS} --4o --api-key openai={openai_api_key} --show-repo-map > aider_repomap.txt
+aider --map-tokens {config.AIDER_MAP_TOKENS} --4o --api-key openai={openai_api_key} --show-repo-map > aider_repomap.txt
 """
     
     # Create the script
@@ -55,8 +55,8 @@ def run_aider_scan(project_dir):
         if os.path.exists(remote_output_file):
             print(f"Successfully created: {remote_output_file}")
             # Copy the file to the files directory
-            copy_file(remote_output_file, AIDER_OUTPUT_FILE)
-            return AIDER_OUTPUT_FILE
+            copy_file(remote_output_file, config.AIDER_OUTPUT_FILE)
+            return config.AIDER_OUTPUT_FILE
         else:
             print(f"Error: aider_repomap.txt was not created.")
             return None
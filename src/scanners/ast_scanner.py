@@ -0,0 +1,296 @@
+"""
+Local structure extractor used instead of the Aider repo map.
+
+Python sources are parsed with the ast module; JavaScript and TypeScript
+sources are split into classes and methods with light regexes and brace
+counting. Files are processed across a process pool and every file ends up
+in the same structure shape that parse_file_content builds from the repo map:
+
+    {"classes": [{"name": ..., "class_body": ..., "methods": [{"name": ..., "code": ...}]}],
+     "other": ...}
+
+No external tool or API key is needed and, unlike the repo map, no file is
+dropped to fit a token budget.
+"""
+
+import os
+import re
+import ast
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+from src import config
+from src.models import dump_tree
+from src.utils.metrics import counted
+from src.processors.repomap_processor import parse_file_content, build_directory_tree
+
+PYTHON_EXTENSIONS = (".py",)
+SCRIPT_EXTENSIONS = (".js", ".jsx", ".mjs", ".ts", ".tsx")
+
+# Directories that hold dependencies, build output or VCS data rather than project sources
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", "env", "dist", "build",
+             ".next", ".tox", ".mypy_cache", ".pytest_cache"}
+
+# Larger files are usually generated or minified and are skipped
+MAX_FILE_SIZE = 1024 * 1024
+
+# Files handed to a worker process at a time
+POOL_CHUNK_SIZE = 64
+
+SCRIPT_CLASS_PATTERN = re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(\w+)')
+SCRIPT_METHOD_PATTERN = re.compile(
+    r'^\s*(?:(?:public|private|protected|static|async|readonly|override|abstract|get|set)\s+)*'
+    r'\*?\s*(#?\w+)\s*(?:<[^>]*>)?\s*\([^)]*\)?'
+)
+SCRIPT_KEYWORDS = {"if", "for", "while", "switch", "catch", "return", "function", "new", "super"}
+
+
+def _join_lines(lines):
+    return "\n".join(lines) + "\n"
+
+
+def extract_python_structure(source):
+    """
+    Extract classes, methods and other code from Python source with ast.
+
+    Top-level classes become classes; functions defined directly in a class
+    body become its methods, and every other line of the class stays in its
+    class body. Lines outside classes make up "other". Sources that do not
+    parse fall back to the line-based repo map parser.
+
+    Args:
+        source (str): Python source code
+
+    Returns:
+        dict: Dictionary with classes and other code
+    """
+    try:
+        module = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return parse_file_content(source)
+
+    lines = source.splitlines()
+    classes = []
+    class_ranges = []
+    for node in module.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        end = node.end_lineno
+        class_ranges.append((start, end))
+
+        methods = []
+        method_lines = set()
+        for item in node.body:
+            if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            method_start = min([item.lineno] + [d.lineno for d in item.decorator_list])
+            methods.append({"name": item.name, "code": _join_lines(lines[method_start - 1:item.end_lineno])})
+            method_lines.update(range(method_start, item.end_lineno + 1))
+
+        body = [lines[number - 1] for number in range(start, end + 1) if number not in method_lines]
+        classes.append({"name": node.name, "class_body": _join_lines(body), "methods": methods})
+
+    other_lines = []
+    position = 1
+    for start, end in class_ranges:
+        other_lines.extend(lines[position - 1:start - 1])
+        position = end + 1
+    other_lines.extend(lines[position - 1:])
+
+    result = {}
+    if classes:
+        result["classes"] = classes
+    other = "\n".join(other_lines).strip()
+    if other:
+        result["other"] = other
+    return result
+
+
+def _brace_delta(line):
+    # Braces inside strings and comments are rare enough in practice to ignore
+    return line.count("{") - line.count("}")
+
+
+def extract_script_structure(source):
+    """
+    Extract classes, methods and other code from JavaScript or TypeScript source.
+
+    Class and method boundaries are found with regexes and followed by
+    counting braces, which is enough for the formatting of typical sources.
+
+    Args:
+        source (str): JavaScript or TypeScript source code
+
+    Returns:
+        dict: Dictionary with classes and other code
+    """
+    classes = []
+    other_lines = []
+    current_class = None
+    class_lines = []
+    class_depth = 0
+    method = None
+    method_lines = []
+    method_depth = 0
+
+    for line in source.splitlines():
+        if current_class is None:
+            class_match = SCRIPT_CLASS_PATTERN.match(line)
+            if class_match and "{" in line:
+                current_class = {"name": class_match.group(1), "class_body": "", "methods": []}
+                class_lines = [line]
+                class_depth = _brace_delta(line)
+                if class_depth <= 0:
+                    current_class["class_body"] = _join_lines(class_lines)
+                    classes.append(current_class)
+                    current_class = None
+            else:
+                other_lines.append(line)
+            continue
+
+        delta = _brace_delta(line)
+        if method is not None:
+            method_lines.append(line)
+            method_depth += delta
+            if method_depth <= 0:
+                method["code"] = _join_lines(method_lines)
+                current_class["methods"].append(method)
+                method = None
+            class_depth += delta
+            continue
+
+        method_match = SCRIPT_METHOD_PATTERN.match(line)
+        if (method_match and class_depth == 1 and "{" in line
+                and method_match.group(1) not in SCRIPT_KEYWORDS):
+            method = {"name": method_match.group(1), "code": ""}
+            method_lines = [line]
+            method_depth = delta
+            class_depth += delta
+            if method_depth <= 0:
+                # Method opened and closed on one line
+                method["code"] = _join_lines(method_lines)
+                current_class["methods"].append(method)
+                method = None
+            continue
+
+        class_depth += delta
+        class_lines.append(line)
+        if class_depth <= 0:
+            current_class["class_body"] = _join_lines(class_lines)
+            classes.append(current_class)
+            current_class = None
+
+    # Close blocks left open by unbalanced braces
+    if method is not None:
+        method["code"] = _join_lines(method_lines)
+        current_class["methods"].append(method)
+    if current_class is not None:
+        current_class["class_body"] = _join_lines(class_lines)
+        classes.append(current_class)
+
+    result = {}
+    if classes:
+        result["classes"] = classes
+    other = "\n".join(other_lines).strip()
+    if other:
+        result["other"] = other
+    return result
+
+
+def extract_file_structure(project_dir, relative_path):
+    """
+    Read one source file and extract its structure.
+
+    Args:
+        project_dir (str): Path to the project directory
+        relative_path (str): "/" separated path of the file in the project
+
+    Returns:
+        tuple: (relative_path, structure); structure is None if the file could not be read
+    """
+    file_path = os.path.join(project_dir, *relative_path.split("/"))
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+            source = f.read()
+    except OSError as e:
+        print(f"Warning: Skipping unreadable file '{relative_path}': {e}")
+        return relative_path, None
+    if relative_path.endswith(PYTHON_EXTENSIONS):
+        return relative_path, extract_python_structure(source)
+    return relative_path, extract_script_structure(source)
+
+
+def iter_source_files(project_dir):
+    """
+    Walk the project in sorted order and yield the supported source files.
+    Anything that is not a regular file, such as a dangling symlink, is skipped.
+
+    Args:
+        project_dir (str): Path to the project directory
+
+    Yields:
+        str: "/" separated path of each file relative to the project
+    """
+    extensions = PYTHON_EXTENSIONS + SCRIPT_EXTENSIONS
+    for dir_path, dir_names, file_names in os.walk(project_dir):
+        dir_names[:] = sorted(name for name in dir_names if name not in SKIP_DIRS)
+        relative_dir = os.path.relpath(dir_path, project_dir).replace(os.sep, "/")
+        for name in sorted(file_names):
+            if not name.endswith(extensions):
+                continue
+            file_path = os.path.join(dir_path, name)
+            try:
+                if not os.path.isfile(file_path) or os.path.getsize(file_path) > MAX_FILE_SIZE:
+                    continue
+            except OSError:
+                # Removed while the project was being walked
+                continue
+            yield name if relative_dir == "." else f"{relative_dir}/{name}"
+
+
+def extract_structures(project_dir, workers=None):
+    """
+    Extract the structure of every source file in the project.
+
+    Args:
+        project_dir (str): Path to the project directory
+        workers (int, optional): Number of worker processes. Defaults to
+            STRUCTURE_WORKERS; 1 extracts in the current process.
+
+    Yields:
+        tuple: (relative_path, structure) in walk order, leaving out unreadable files
+    """
+    workers = workers or config.STRUCTURE_WORKERS
+    extract = functools.partial(extract_file_structure, project_dir)
+    files = iter_source_files(project_dir)
+    if workers <= 1:
+        results = map(extract, files)
+        yield from (result for result in results if result[1] is not None)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(extract, files, chunksize=POOL_CHUNK_SIZE)
+        yield from (result for result in results if result[1] is not None)
+
+
+def run_ast_scan(project_dir, workers=None):
+    """
+    Build aider_repomap.json from the project sources without running Aider.
+
+    Args:
+        project_dir (str): Path to the project directory
+        workers (int, optional): Number of worker processes. Defaults to STRUCTURE_WORKERS.
+
+    Returns:
+        str: Path to the output JSON file or None if an error occurred
+    """
+    output_file = config.AIDER_JSON_FILE
+    try:
+        print(f"Extracting code structure from: {project_dir}")
+        tree = build_directory_tree(counted(extract_structures(project_dir, workers), "files"))
+        dump_tree(tree, output_file)
+        print(f"Successfully created: {output_file}")
+        return output_file
+    except Exception as e:
+        print(f"Error extracting code structure: {e}")
+        return None
@@ -1,7 +1,7 @@
 import os
 import sys
 from src.utils import create_script, run_script, delete_script, copy_file
-from src.config import BEARER_OUTPUT_FILE, FILES_DIR
+from src import config
 
 def create_bearer_script():
     """
@@ -10,21 +10,27 @@ def create_bearer_script():
     Returns:
         str: Name of the created script
     """
-    script_name = os.path.join(FILES_DIR, "run_bearer.sh")
+    script_name = os.path.join(config.FILES_DIR, "run_bearer.sh")
+    report_name = os.path.basename(config.BEARER_REPORT_FILE)
+    # Ask Bearer for a machine-readable report unless the text format was requested
+    if config.BEARER_FORMAT == "json":
+        scan_command = f"bearer scan ./ --quiet --format json --output {report_name}"
+    else:
+        scan_command = f"bearer scan ./ > {report_name}"
     script_content = f"""#!/bin/bash
 # Navigate to the target project directory
 cd "$1"
 
-# Run bearer scan and save output to bearer_output.txt
-bearer scan ./ > bearer_output.txt
+# Run bearer scan and save the report to {report_name}
+{scan_command}
 
-# Check if bearer_output.txt was created
-if [ -f "bearer_output.txt" ]; then
+# Check if {report_name} was created
+if [ -f "{report_name}" ]; then
     # Copy the file to the original directory
-    cp bearer_output.txt "$2/bearer_output.txt"
-    echo "Copied bearer_output.txt to $2"
+    cp {report_name} "$2/{report_name}"
+    echo "Copied {report_name} to $2"
 else
-    echo "Error: bearer_output.txt was not created"
+    echo "Error: {report_name} was not created"
     exit 1
 fi
 """
@@ -50,26 +56,27 @@ def run_bearer_scan(project_dir):
         print("This may take some time. Please wait...")
         
         # Run the script with files directory as the second argument
-        run_script(script_name, project_dir, FILES_DIR)
+        run_script(script_name, project_dir, config.FILES_DIR)
         
-        # Verify bearer_output.txt exists in files directory
-        if os.path.exists(BEARER_OUTPUT_FILE):
-            print(f"Successfully copied bearer_output.txt to {FILES_DIR}")
-            return BEARER_OUTPUT_FILE
+        # Verify the report exists in files directory
+        report_name = os.path.basename(config.BEARER_REPORT_FILE)
+        if os.path.exists(config.BEARER_REPORT_FILE):
+            print(f"Successfully copied {report_name} to {config.FILES_DIR}")
+            return config.BEARER_REPORT_FILE
         else:
-            print(f"Error: bearer_output.txt was not copied to {FILES_DIR}")
+            print(f"Error: {report_name} was not copied to {config.FILES_DIR}")
             
             # Check if the file exists in the target directory
-            bearer_output_path = os.path.join(project_dir, "bearer_output.txt")
+            bearer_output_path = os.path.join(project_dir, report_name)
             if os.path.exists(bearer_output_path):
-                print(f"Found bearer_output.txt in {project_dir}")
-                print(f"Copying to {BEARER_OUTPUT_FILE}...")
+                print(f"Found {report_name} in {project_dir}")
+                print(f"Copying to {config.BEARER_REPORT_FILE}...")
                 
                 # Copy the file manually
-                copy_file(bearer_output_path, BEARER_OUTPUT_FILE)
-                return BEARER_OUTPUT_FILE
+                copy_file(bearer_output_path, config.BEARER_REPORT_FILE)
+                return config.BEARER_REPORT_FILE
             else:
-                print(f"Error: bearer_output.txt not found in {project_dir}")
+                print(f"Error: {report_name} not found in {project_dir}")
                 return None
     except Exception as e:
         print(f"Error running Bearer scan: {e}")
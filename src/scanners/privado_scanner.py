@@ -2,7 +2,7 @@ import os
 import sys
 import uuid
 from src.utils import create_script, run_script, copy_file
-from src.config import PRIVADO_CLI_PATH, PRIVADO_OUTPUT_FILE, FILES_DIR
+from src import config
 
 # Default Privado CLI path if not specified in config
 DEFAULT_PRIVADO_CLI_PATH = "/home/prajwalak/Documents/privado-cli"
@@ -14,7 +14,7 @@ def create_privado_script():
     Returns:
         str: Name of the created script
     """
-    script_name = os.path.join(FILES_DIR, "run_privado.sh")
+    script_name = os.path.join(config.FILES_DIR, "run_privado.sh")
     script_content = f"""#!/bin/bash
 # Navigate to the privado-cli directory
 cd "$1"
@@ -58,7 +58,7 @@ def run_privado_scan(project_dir):
     """
     try:
         # Get privado-cli path from config or use default
-        privado_cli_path = PRIVADO_CLI_PATH
+        privado_cli_path = config.PRIVADO_CLI_PATH
         if not privado_cli_path:
             privado_cli_path = DEFAULT_PRIVADO_CLI_PATH
             print(f"Using default Privado CLI path: {privado_cli_path}")
@@ -86,11 +86,11 @@ def run_privado_scan(project_dir):
         print("This may take some time. Please wait...")
         
         # Run the privado scan with files directory as third argument
-        run_script(script_name, privado_cli_path, project_dir, FILES_DIR)
+        run_script(script_name, privado_cli_path, project_dir, config.FILES_DIR)
         
         # Check if the output file exists in the files directory
-        if not os.path.exists(PRIVADO_OUTPUT_FILE):
-            print(f"Warning: {PRIVADO_OUTPUT_FILE} not found after running privado scan.")
+        if not os.path.exists(config.PRIVADO_OUTPUT_FILE):
+            print(f"Warning: {config.PRIVADO_OUTPUT_FILE} not found after running privado scan.")
             
             # Check if .privado directory exists in target directory
             privado_dir = os.path.join(project_dir, ".privado")
@@ -101,11 +101,11 @@ def run_privado_scan(project_dir):
                 
                 if os.path.exists(privado_json_path):
                     print(f"Found privado.json in {privado_dir}")
-                    print(f"Copying to {PRIVADO_OUTPUT_FILE}...")
+                    print(f"Copying to {config.PRIVADO_OUTPUT_FILE}...")
                     
                     # Copy the file manually
-                    copy_file(privado_json_path, PRIVADO_OUTPUT_FILE)
-                    return PRIVADO_OUTPUT_FILE
+                    copy_file(privado_json_path, config.PRIVADO_OUTPUT_FILE)
+                    return config.PRIVADO_OUTPUT_FILE
                 else:
                     print(f"Error: privado.json not found in {privado_dir}")
                     print("The scan might still be running or failed to create the file.")
@@ -115,8 +115,8 @@ def run_privado_scan(project_dir):
                 print("The scan might have failed or is still running.")
                 return None
         
-        print(f"Successfully created: {PRIVADO_OUTPUT_FILE}")
-        return PRIVADO_OUTPUT_FILE
+        print(f"Successfully created: {config.PRIVADO_OUTPUT_FILE}")
+        return config.PRIVADO_OUTPUT_FILE
     
     except Exception as e:
         print(f"Error running Privado scan: {e}")
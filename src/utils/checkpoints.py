@@ -0,0 +1,237 @@
+"""
+Stage checkpoints for resuming interrupted pipeline runs.
+
+When a stage succeeds, a marker is written atomically to CHECKPOINT_DIR with
+digests of the stage's inputs and outputs. A resumed run skips a stage only
+if its marker is present, its inputs still have the recorded digests and its
+outputs are unchanged; stages whose output a later stage rewrote in place
+(the tree JSON) are therefore redone, but the scans and the enrichment are not.
+
+The LLM enrichment additionally records its progress every
+ENRICH_CHECKPOINT_ROWS rows, so a resumed run continues after the last
+checkpointed row instead of starting over.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+
+from src import config
+
+# Files the scanners write into the project; they are not part of its contents
+GENERATED_NAMES = {".git", ".privado", "aider_repomap.txt", "bearer_output.txt", "bearer_output.json"}
+GENERATED_PREFIXES = (".aider", ".privado_")
+
+# Dependency and cache directories; their contents are not project sources
+DEPENDENCY_DIRS = {"node_modules", "__pycache__", ".venv", "venv", ".tox", ".mypy_cache", ".pytest_cache"}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _hash_file(digest, path):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+
+def file_digest(path):
+    """
+    SHA-256 digest of a file, or of every file in a directory.
+
+    Args:
+        path (str): File or directory
+
+    Returns:
+        str: Hex digest, or None if the path does not exist
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    if os.path.isfile(path):
+        _hash_file(digest, path)
+        return digest.hexdigest()
+    for dir_path, dir_names, file_names in os.walk(path):
+        dir_names.sort()
+        for name in sorted(file_names):
+            file_path = os.path.join(dir_path, name)
+            digest.update(os.path.relpath(file_path, path).encode("utf-8") + b"\0")
+            _hash_file(digest, file_path)
+    return digest.hexdigest()
+
+
+def project_digest(project_dir):
+    """
+    Digest of the project's file listing: path, size and modification time of
+    every file, leaving out .git, dependency directories, the files the scanners
+    write into the project and the files directory when it lies inside the project.
+    Symlinks are listed by their own metadata, so a dangling one is not an error.
+
+    Args:
+        project_dir (str): Path to the project directory
+
+    Returns:
+        str: Hex digest
+    """
+    files_dir = os.path.abspath(config.FILES_DIR)
+    digest = hashlib.sha256()
+    for dir_path, dir_names, file_names in os.walk(project_dir):
+        dir_names[:] = sorted(
+            name for name in dir_names
+            if name not in GENERATED_NAMES and name not in DEPENDENCY_DIRS
+            and not name.startswith(GENERATED_PREFIXES)
+            and os.path.abspath(os.path.join(dir_path, name)) != files_dir
+        )
+        for name in sorted(file_names):
+            if name in GENERATED_NAMES or name.startswith(GENERATED_PREFIXES):
+                continue
+            file_path = os.path.join(dir_path, name)
+            try:
+                stat = os.lstat(file_path)
+            except OSError:
+                # Removed while the project was being walked
+                continue
+            digest.update(f"{os.path.relpath(file_path, project_dir)}\0{stat.st_size}\0{stat.st_mtime_ns}\n"
+                          .encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def write_json_atomic(file_path, data):
+    """
+    Write JSON so that readers see either the old or the new file, never a partial one.
+
+    Args:
+        file_path (str): Destination path
+        data (dict): Data to write
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, file_path)
+
+
+def _read_json(file_path):
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _marker_path(name):
+    return os.path.join(config.CHECKPOINT_DIR, f"{name}.json")
+
+
+def is_stage_complete(name, inputs, outputs):
+    """
+    Check whether a stage completed earlier with the same inputs and untouched outputs.
+
+    Args:
+        name (str): Stage name
+        inputs (dict): Digests (or other identifying strings) of the stage's inputs
+        outputs (list): Paths of the files the stage writes
+
+    Returns:
+        bool: True if the stage can be skipped
+    """
+    marker = _read_json(_marker_path(name))
+    if marker is None or marker.get("inputs") != inputs:
+        return False
+    recorded = marker.get("outputs", {})
+    return all(path in recorded and recorded[path] == file_digest(path) for path in outputs)
+
+
+def mark_stage_complete(name, inputs, outputs):
+    """
+    Record that a stage completed.
+
+    Args:
+        name (str): Stage name
+        inputs (dict): Digests of the inputs, computed before the stage ran
+        outputs (list): Paths of the files the stage wrote
+    """
+    write_json_atomic(_marker_path(name), {
+        "stage": name,
+        "completed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "inputs": inputs,
+        "outputs": {path: file_digest(path) for path in outputs},
+    })
+
+
+def clear_checkpoints():
+    """
+    Remove the markers and progress files of a previous run.
+    """
+    checkpoint_dir = config.CHECKPOINT_DIR
+    if not os.path.isdir(checkpoint_dir):
+        return
+    for name in os.listdir(checkpoint_dir):
+        if name.endswith((".json", ".tmp")):
+            os.remove(os.path.join(checkpoint_dir, name))
+
+
+class EnrichmentProgress:
+    """
+    Progress of the LLM enrichment, saved every few rows.
+
+    The checkpoint holds the number of input rows whose results are in the
+    output CSV and the size of the CSV at that point. Rows written after the
+    last checkpoint are cut off when the enrichment resumes, so every row
+    appears exactly once.
+
+    Args:
+        output_file (str): CSV file the enrichment writes
+        inputs (dict): Digests of the enrichment inputs; a checkpoint taken
+            with different inputs is ignored
+        every (int, optional): Rows between checkpoints. Defaults to ENRICH_CHECKPOINT_ROWS.
+    """
+
+    def __init__(self, output_file, inputs, every=None):
+        self.output_file = output_file
+        self.inputs = inputs
+        self.every = every or config.ENRICH_CHECKPOINT_ROWS
+        self.file_path = _marker_path("privado_enrich.progress")
+        self.saved_rows = 0
+
+    def load(self):
+        """
+        Read the last checkpoint.
+
+        Returns:
+            tuple: (rows done, CSV size in bytes), or (0, 0) if there is
+                nothing to resume from
+        """
+        progress = _read_json(self.file_path)
+        if progress is None or progress.get("inputs") != self.inputs:
+            return 0, 0
+        rows, csv_bytes = progress.get("rows", 0), progress.get("csv_bytes", 0)
+        if not os.path.exists(self.output_file) or os.path.getsize(self.output_file) < csv_bytes:
+            return 0, 0
+        self.saved_rows = rows
+        return rows, csv_bytes
+
+    def update(self, rows, csvfile):
+        """
+        Save a checkpoint if enough rows were done since the last one.
+
+        Args:
+            rows (int): Input rows whose results are written to csvfile
+            csvfile (file): Open output CSV file
+        """
+        if rows - self.saved_rows < self.every:
+            return
+        csvfile.flush()
+        os.fsync(csvfile.fileno())
+        csv_bytes = os.fstat(csvfile.fileno()).st_size
+        write_json_atomic(self.file_path, {"inputs": self.inputs, "rows": rows, "csv_bytes": csv_bytes})
+        self.saved_rows = rows
+
+    def clear(self):
+        """
+        Remove the checkpoint once the enrichment has finished.
+        """
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
@@ -2,6 +2,7 @@ import os
 import json
 import csv
 import sys
+from src.utils.json_utils import write_json
 
 def ensure_file_exists(file_path, error_message=None):
     """
@@ -81,8 +82,7 @@ def write_json_file(file_path, data):
         bool: True if successful, False otherwise
     """
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        write_json(data, file_path)
         print(f"Successfully wrote to {file_path}")
         return True
     except Exception as e:
@@ -13,23 +13,18 @@ def initialize_git_repository(project_dir):
         bool: True if successful, False otherwise
     """
     try:
-        # Change to the project directory
-        os.chdir(project_dir)
-        
         # Initialize Git repository
-        subprocess.run(["git", "init"], check=True)
+        subprocess.run(["git", "init"], check=True, cwd=project_dir)
         print("Git repository initialized successfully.")
         
         # Create or update .gitignore file
         update_gitignore(project_dir)
         
         # Add all files and make initial commit
-        subprocess.run(["git", "add", "-A"], check=True)
-        subprocess.run(["git", "commit", "-m", "Aider Commit"], check=True)
+        subprocess.run(["git", "add", "-A"], check=True, cwd=project_dir)
+        subprocess.run(["git", "commit", "-m", "Aider Commit"], check=True, cwd=project_dir)
         print("Initial commit created successfully.")
         
-        # Change back to original directory
-        os.chdir(os.path.dirname(os.path.abspath(__file__)))
         return True
     except subprocess.CalledProcessError as e:
         print(f"Error setting up Git repository: {e}")
@@ -71,11 +66,11 @@ def verify_git_status(project_dir):
         bool: True if successful, False otherwise
     """
     try:
-        # Change to the project directory
-        os.chdir(project_dir)
-        
         # Check if there are uncommitted changes
-        result = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True)
+        # Git runs in the project directory rather than changing the working
+        # directory of the process, which parallel jobs share
+        result = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True,
+                                check=True, cwd=project_dir)
         if result.stdout.strip():
             print("Uncommitted changes found. Committing changes...")
             
@@ -83,8 +78,8 @@ def verify_git_status(project_dir):
             update_gitignore(project_dir)
             
             # Add all files and commit
-            subprocess.run(["git", "add", "-A"], check=True)
-            subprocess.run(["git", "commit", "-m", "Aider Commit"], check=True)
+            subprocess.run(["git", "add", "-A"], check=True, cwd=project_dir)
+            subprocess.run(["git", "commit", "-m", "Aider Commit"], check=True, cwd=project_dir)
             print("Changes committed successfully.")
         else:
             print("No uncommitted changes found.")
@@ -99,19 +94,17 @@ def verify_git_status(project_dir):
                     with open(gitignore_path, 'a') as f:
                         f.write("\n.aider*\n")
                     # Commit the .gitignore update
-                    subprocess.run(["git", "add", ".gitignore"], check=True)
-                    subprocess.run(["git", "commit", "-m", "Add .aider* to .gitignore"], check=True)
+                    subprocess.run(["git", "add", ".gitignore"], check=True, cwd=project_dir)
+                    subprocess.run(["git", "commit", "-m", "Add .aider* to .gitignore"], check=True, cwd=project_dir)
                     print("Added .aider* to .gitignore and committed.")
             else:
                 # Create new .gitignore file
                 update_gitignore(project_dir)
                 # Commit the new .gitignore
-                subprocess.run(["git", "add", ".gitignore"], check=True)
-                subprocess.run(["git", "commit", "-m", "Add .gitignore with .aider* entry"], check=True)
+                subprocess.run(["git", "add", ".gitignore"], check=True, cwd=project_dir)
+                subprocess.run(["git", "commit", "-m", "Add .gitignore with .aider* entry"], check=True, cwd=project_dir)
                 print("Created .gitignore with .aider* entry and committed.")
         
-        # Change back to original directory
-        os.chdir(os.path.dirname(os.path.abspath(__file__)))
         return True
     except subprocess.CalledProcessError as e:
         print(f"Error verifying Git repository: {e}")
@@ -0,0 +1,362 @@
+"""
+Incremental JSON reading helpers.
+
+The scanners we run (Bearer, Privado) can produce JSON documents that are far
+larger than we want to hold in memory. These helpers walk a document chunk by
+chunk and emit ijson-style ``(prefix, event, value)`` tuples, so callers only
+ever materialize the values they ask for.
+
+Prefixes are dotted paths from the document root: object keys are joined with
+``.`` and array elements are addressed as ``item`` (e.g. ``high.item`` or
+``dataFlow.storages.item.sinks.item.paths.item``).
+"""
+
+import re
+import json
+from json.decoder import scanstring
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+_NUMBER_RE = re.compile(r'-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?')
+_NUMBER_CHARS_RE = re.compile(r'[-+0-9.eE]*')
+# Runs of anything but brackets, with complete strings consumed whole
+_SKIP_RE = re.compile(r'(?:[^"\[\]{}]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+_STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_LITERALS = {"t": ("true", True), "f": ("false", False), "n": ("null", None)}
+
+# Parser states
+_VALUE = 0
+_KEY_OR_END = 1
+_KEY = 2
+_VALUE_OR_END = 3
+_AFTER_VALUE = 4
+
+
+class _ChunkReader:
+    """
+    Sliding window over a text file object.
+
+    Only the unconsumed tail of the buffer is kept between reads, so memory is
+    bounded by the chunk size plus the largest single token or decoded item.
+    """
+
+    def __init__(self, file_obj, chunk_size):
+        self.file_obj = file_obj
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        """
+        Read more data into the buffer, dropping what has been consumed.
+
+        Reads grow with the pending data so that decoding one large value
+        stays linear in its size.
+
+        Returns:
+            bool: False if the end of the file was reached
+        """
+        if self.eof:
+            return False
+        pending = self.buf[self.pos:]
+        data = self.file_obj.read(max(self.chunk_size, len(pending)))
+        self.buf = pending + data
+        self.pos = 0
+        if not data:
+            self.eof = True
+            return False
+        return True
+
+    def peek(self):
+        """
+        Skip whitespace and return the next character without consuming it.
+
+        Returns:
+            str: Next character or None at the end of the document
+        """
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, char):
+        """
+        Consume the given structural character.
+
+        Args:
+            char (str): Expected character
+        """
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} but found {found!r}")
+        self.pos += 1
+
+    def read_string(self):
+        """
+        Decode the string starting at the current position.
+
+        Returns:
+            str: Decoded string
+        """
+        while True:
+            try:
+                value, end = scanstring(self.buf, self.pos + 1, True)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+    def read_number(self):
+        """
+        Decode the number starting at the current position.
+
+        Returns:
+            int | float: Decoded number
+        """
+        # A number that runs to the end of the buffer may continue in the next chunk.
+        while _NUMBER_CHARS_RE.match(self.buf, self.pos).end() == len(self.buf) and self.fill():
+            pass
+        match = _NUMBER_RE.match(self.buf, self.pos)
+        if match is None or match.end() != _NUMBER_CHARS_RE.match(self.buf, self.pos).end():
+            raise ValueError(f"Invalid number at offset {self.pos}")
+        self.pos = match.end()
+        if match.group(1) or match.group(2):
+            return float(match.group(0))
+        return int(match.group(0))
+
+    def read_literal(self):
+        """
+        Decode a true, false or null literal at the current position.
+
+        Returns:
+            bool | None: Decoded literal
+        """
+        text, value = _LITERALS[self.buf[self.pos]]
+        while len(self.buf) - self.pos < len(text) and self.fill():
+            pass
+        if not self.buf.startswith(text, self.pos):
+            raise ValueError(f"Invalid literal at offset {self.pos}")
+        self.pos += len(text)
+        return value
+
+    def read_value(self):
+        """
+        Decode the complete JSON value starting at the current position.
+
+        Returns:
+            object: Decoded value
+        """
+        # Numbers are the only values without a closing delimiter.
+        if self.buf[self.pos] in "-0123456789":
+            return self.read_number()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+    def skip_value(self):
+        """
+        Move past the JSON value starting at the current position without
+        decoding it.
+        """
+        char = self.buf[self.pos]
+        if char == '"':
+            self._skip_string()
+            return
+        if char not in "{[":
+            if char in _LITERALS:
+                self.read_literal()
+            else:
+                self.read_number()
+            return
+        depth = 0
+        while True:
+            self.pos = _SKIP_RE.match(self.buf, self.pos).end()
+            if self.pos == len(self.buf) or self.buf[self.pos] == '"':
+                # The buffer ended, possibly in the middle of a string
+                if not self.fill():
+                    raise ValueError("Unexpected end of JSON document")
+                continue
+            depth += 1 if self.buf[self.pos] in "{[" else -1
+            self.pos += 1
+            if depth == 0:
+                return
+
+    def _skip_string(self):
+        while True:
+            match = _STRING_RE.match(self.buf, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return
+            if not self.fill():
+                raise ValueError(f"Unterminated string at offset {self.pos}")
+
+
+def _join(prefix, key):
+    return f"{prefix}.{key}" if prefix else key
+
+
+def _ancestors(prefixes):
+    """
+    Collect every prefix that encloses one of the given prefixes.
+
+    Args:
+        prefixes (iterable): Dotted prefixes
+
+    Returns:
+        set: Enclosing prefixes, including the document root ("")
+    """
+    ancestors = {""}
+    for prefix in prefixes:
+        parts = prefix.split(".")
+        for end in range(1, len(parts)):
+            ancestors.add(".".join(parts[:end]))
+    return ancestors
+
+
+def iter_events(file_obj, item_prefixes=(), follow_prefixes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Walk a JSON document and yield parse events.
+
+    Events are ``start_map``, ``map_key``, ``end_map``, ``start_array``,
+    ``end_array``, ``string``, ``number``, ``boolean`` and ``null``. Values
+    whose prefix is listed in ``item_prefixes`` are decoded in one go and
+    emitted as a single ``item`` event instead of their individual events.
+
+    When ``follow_prefixes`` is given, only those prefixes, the item prefixes
+    and the containers enclosing them produce events; every other value is
+    skipped with a fast scan that does not decode it.
+
+    Args:
+        file_obj: Text file object opened for reading
+        item_prefixes (iterable, optional): Prefixes to decode as whole values
+        follow_prefixes (iterable, optional): Prefixes to emit events for.
+            Defaults to None, which emits events for the whole document.
+        chunk_size (int, optional): Number of characters to read at a time
+
+    Yields:
+        tuple: (prefix, event, value)
+    """
+    reader = _ChunkReader(file_obj, chunk_size)
+    item_prefixes = frozenset(item_prefixes)
+    walked = None
+    if follow_prefixes is not None:
+        walked = set(follow_prefixes) | _ancestors(set(follow_prefixes) | item_prefixes)
+    stack = []  # (kind, prefix) of the open containers
+    value_prefix = ""
+    state = _VALUE
+
+    while True:
+        char = reader.peek()
+
+        if state == _AFTER_VALUE:
+            if not stack:
+                if char is not None:
+                    raise ValueError(f"Unexpected data after JSON document at offset {reader.pos}")
+                return
+            kind, container_prefix = stack[-1]
+            if char == ",":
+                reader.pos += 1
+                if kind == "map":
+                    state = _KEY
+                else:
+                    value_prefix = _join(container_prefix, "item")
+                    state = _VALUE
+            elif kind == "map" and char == "}":
+                reader.pos += 1
+                stack.pop()
+                yield container_prefix, "end_map", None
+            elif kind == "array" and char == "]":
+                reader.pos += 1
+                stack.pop()
+                yield container_prefix, "end_array", None
+            else:
+                raise ValueError(f"Unexpected {char!r} at offset {reader.pos}")
+            continue
+
+        if char is None:
+            raise ValueError("Unexpected end of JSON document")
+
+        if state == _KEY_OR_END or state == _KEY:
+            container_prefix = stack[-1][1]
+            if state == _KEY_OR_END and char == "}":
+                reader.pos += 1
+                stack.pop()
+                yield container_prefix, "end_map", None
+                state = _AFTER_VALUE
+                continue
+            if char != '"':
+                raise ValueError(f"Expected object key at offset {reader.pos}")
+            key = reader.read_string()
+            yield container_prefix, "map_key", key
+            reader.expect(":")
+            value_prefix = _join(container_prefix, key)
+            state = _VALUE
+            continue
+
+        if state == _VALUE_OR_END:
+            container_prefix = stack[-1][1]
+            if char == "]":
+                reader.pos += 1
+                stack.pop()
+                yield container_prefix, "end_array", None
+                state = _AFTER_VALUE
+                continue
+            value_prefix = _join(container_prefix, "item")
+
+        # state is _VALUE (or an array element following _VALUE_OR_END)
+        state = _AFTER_VALUE
+        if value_prefix in item_prefixes:
+            yield value_prefix, "item", reader.read_value()
+        elif walked is not None and value_prefix not in walked:
+            reader.skip_value()
+        elif char == "{":
+            reader.pos += 1
+            stack.append(("map", value_prefix))
+            yield value_prefix, "start_map", None
+            state = _KEY_OR_END
+        elif char == "[":
+            reader.pos += 1
+            stack.append(("array", value_prefix))
+            yield value_prefix, "start_array", None
+            state = _VALUE_OR_END
+        elif char == '"':
+            yield value_prefix, "string", reader.read_string()
+        elif char == "-" or char.isdigit():
+            yield value_prefix, "number", reader.read_number()
+        elif char in _LITERALS:
+            value = reader.read_literal()
+            yield value_prefix, "null" if value is None else "boolean", value
+        else:
+            raise ValueError(f"Unexpected {char!r} at offset {reader.pos}")
+
+
+def iter_items(file_path, item_prefixes, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream the values found at the given prefixes of a JSON file.
+
+    Args:
+        file_path (str): Path to the JSON file
+        item_prefixes (iterable): Prefixes of the values to decode
+        chunk_size (int, optional): Number of characters to read at a time
+
+    Yields:
+        tuple: (prefix, value) in document order
+    """
+    item_prefixes = frozenset(item_prefixes)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for prefix, event, value in iter_events(f, item_prefixes, item_prefixes, chunk_size):
+            if event == "item":
+                yield prefix, value
@@ -0,0 +1,150 @@
+"""
+JSON serialization backends.
+
+Output files are written through this module so the encoder can be chosen in
+one place. orjson is used when it is installed (and not disabled through
+JSON_BACKEND), otherwise the standard library encoder. Output is compact by
+default; pretty output is produced only when requested.
+"""
+
+import json
+
+from src import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ("orjson", "json")
+
+# Indentation width of pretty output per backend
+_INDENT = {"orjson": 2, "json": 4}
+
+
+def resolve_backend(backend=None):
+    """
+    Resolve the serialization backend to use.
+
+    Args:
+        backend (str, optional): "auto", "orjson" or "json". Defaults to JSON_BACKEND.
+
+    Returns:
+        str: Name of an available backend
+    """
+    backend = (backend or config.JSON_BACKEND).lower()
+    if backend == "auto":
+        return "orjson" if orjson is not None else "json"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{backend}'. Expected one of: auto, {', '.join(BACKENDS)}")
+    if backend == "orjson" and orjson is None:
+        print("Warning: orjson is not installed. Falling back to the json module.")
+        return "json"
+    return backend
+
+
+def _encode(obj, backend, pretty, default):
+    """
+    Encode a value in one call to the backend.
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if backend == "orjson":
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        text = json.dumps(obj, default=default, ensure_ascii=False, indent=_INDENT["json"])
+    else:
+        text = json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+class _Writer:
+    """
+    Writes a value piece by piece, descending into the objects selected by
+    ``split`` so that only one unsplit value is encoded in memory at a time.
+    """
+
+    def __init__(self, file_obj, backend, pretty, default, split):
+        self.write = file_obj.write
+        self.backend = backend
+        self.pretty = pretty
+        self.default = default
+        self.split = split
+        self.indent = b" " * _INDENT[backend] if pretty else b""
+
+    def _newline(self, level):
+        return b"\n" + self.indent * level if self.pretty else b""
+
+    def value(self, obj, level):
+        if self.split is None or not self.split(obj):
+            data = _encode(obj, self.backend, self.pretty, self.default)
+            if self.pretty and level:
+                # Encoded strings never contain raw newlines, so this only re-indents the layout.
+                data = data.replace(b"\n", self._newline(level))
+            self.write(data)
+            return
+        fields = self.default(obj)
+        if not fields:
+            self.write(b"{}")
+            return
+        separator = b": " if self.pretty else b":"
+        self.write(b"{")
+        for position, (key, field) in enumerate(fields.items()):
+            if position:
+                self.write(b",")
+            self.write(self._newline(level + 1))
+            self.write(_encode(key, self.backend, False, None) + separator)
+            if isinstance(field, list):
+                self.array(field, level + 1)
+            else:
+                self.value(field, level + 1)
+        self.write(self._newline(level) + b"}")
+
+    def array(self, items, level):
+        if not items:
+            self.write(b"[]")
+            return
+        self.write(b"[")
+        for position, item in enumerate(items):
+            if position:
+                self.write(b",")
+            self.write(self._newline(level + 1))
+            self.value(item, level + 1)
+        self.write(self._newline(level) + b"]")
+
+
+def dump_json(obj, file_obj, pretty=None, default=None, split=None, backend=None):
+    """
+    Serialize a value as UTF-8 JSON to a binary file handle.
+
+    Args:
+        obj: Value to serialize
+        file_obj: File object opened in binary write mode
+        pretty (bool, optional): Indent the output. Defaults to JSON_PRETTY.
+        default (callable, optional): Converts objects the encoder does not know.
+        split (callable, optional): Predicate selecting objects that are written
+            field by field instead of encoded whole; their converted form comes
+            from ``default``. Bounds memory to one unsplit value at a time.
+        backend (str, optional): "auto", "orjson" or "json". Defaults to JSON_BACKEND.
+    """
+    if pretty is None:
+        pretty = config.JSON_PRETTY
+    writer = _Writer(file_obj, resolve_backend(backend), pretty, default, split)
+    writer.value(obj, 0)
+
+
+def write_json(obj, file_path, pretty=None, default=None, split=None, backend=None):
+    """
+    Serialize a value as UTF-8 JSON to a file.
+
+    Args:
+        obj: Value to serialize
+        file_path (str): Path to the JSON file
+        pretty (bool, optional): Indent the output. Defaults to JSON_PRETTY.
+        default (callable, optional): Converts objects the encoder does not know.
+        split (callable, optional): See dump_json.
+        backend (str, optional): "auto", "orjson" or "json". Defaults to JSON_BACKEND.
+    """
+    with open(file_path, 'wb') as f:
+        dump_json(obj, f, pretty=pretty, default=default, split=split, backend=backend)
@@ -0,0 +1,296 @@
+"""
+Retry policy for LLM requests.
+
+Failed requests are classified before they are retried: rate limits (429),
+timeouts, connection errors and server errors (408, 409 and 5xx) are retried
+after a jittered exponential backoff, or after the delay the server asked
+for in Retry-After; any other error fails the row at once. A circuit breaker
+stops sending requests after a run of consecutive failures and lets a single
+probe through once it has cooled down. Optionally, a request that has not
+answered within a hedging delay is sent a second time, and whichever copy
+answers first is used; the usage of the other copy is still charged once it
+answers (see RetryPolicy.settle_discarded).
+
+The OpenAI client is created with its own retries disabled so that this
+policy is the only one in effect.
+"""
+
+import time
+import queue
+import random
+import threading
+import contextvars
+from email.utils import parsedate_to_datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src import config
+
+# Classes of request failures
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+FATAL = "fatal"
+
+# Exceptions of the OpenAI client that carry no status code but are worth retrying
+TRANSIENT_ERROR_NAMES = {"APITimeoutError", "APIConnectionError"}
+
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+
+def classify_error(error):
+    """
+    Decide whether a failed request should be retried.
+
+    Args:
+        error (Exception): Error raised by the request
+
+    Returns:
+        str: RATE_LIMITED, TRANSIENT or FATAL
+    """
+    status = getattr(error, "status_code", None)
+    if status == 429:
+        return RATE_LIMITED
+    if status is not None:
+        return TRANSIENT if status in (408, 409) or status >= 500 else FATAL
+    if type(error).__name__ in TRANSIENT_ERROR_NAMES or isinstance(error, (TimeoutError, ConnectionError)):
+        return TRANSIENT
+    if "rate limit" in str(error).lower():
+        return RATE_LIMITED
+    return FATAL
+
+
+def retry_after_seconds(error):
+    """
+    Read the delay the server asked for from the headers of an error response.
+
+    Args:
+        error (Exception): Error raised by the request
+
+    Returns:
+        float: Seconds to wait, or None if the response gives no delay
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Stops requests after too many consecutive failures.
+
+    The breaker opens after failure_threshold failed requests in a row. While
+    it is open, requests are refused; after reset_seconds one request is let
+    through, and the breaker closes again if it succeeds.
+
+    Args:
+        failure_threshold (int, optional): Consecutive failures that open the
+            breaker; 0 disables it. Defaults to CIRCUIT_BREAKER_FAILURES.
+        reset_seconds (float, optional): Seconds before a probe is let
+            through. Defaults to CIRCUIT_BREAKER_RESET.
+    """
+
+    def __init__(self, failure_threshold=None, reset_seconds=None):
+        self.failure_threshold = (failure_threshold if failure_threshold is not None
+                                  else config.CIRCUIT_BREAKER_FAILURES)
+        self.reset_seconds = reset_seconds if reset_seconds is not None else config.CIRCUIT_BREAKER_RESET
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        """
+        Check whether a request may be sent.
+
+        Returns:
+            bool: False while the breaker is open and not ready for a probe
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or (self.failure_threshold and self.failures >= self.failure_threshold):
+                if self.opened_at is None:
+                    print(f"Opening the LLM circuit breaker after {self.failures} consecutive failures.")
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+
+class RetryPolicy:
+    """
+    How failed LLM requests are retried, hedged and cut off.
+
+    Args:
+        max_retries (int, optional): Retries after the first attempt. Defaults to OPENAI_MAX_RETRIES.
+        base_delay (float, optional): Backoff before the first retry, doubled for every
+            further one. Defaults to OPENAI_RETRY_BASE_DELAY.
+        max_delay (float, optional): Longest wait before a retry. Defaults to OPENAI_RETRY_MAX_DELAY.
+        hedge_after (float, optional): Seconds after which a slow request is sent a
+            second time; 0 disables hedging. Defaults to OPENAI_HEDGE_AFTER.
+        breaker (CircuitBreaker, optional): Breaker shared by the requests of a job.
+            Defaults to a new breaker.
+    """
+
+    def __init__(self, max_retries=None, base_delay=None, max_delay=None, hedge_after=None, breaker=None):
+        self.max_retries = max_retries if max_retries is not None else config.OPENAI_MAX_RETRIES
+        self.base_delay = base_delay if base_delay is not None else config.OPENAI_RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else config.OPENAI_RETRY_MAX_DELAY
+        self.hedge_after = hedge_after if hedge_after is not None else config.OPENAI_HEDGE_AFTER
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._discarded = queue.SimpleQueue()  # (callback, response) of copies whose answer was not used
+        self._running_copies = set()
+        self._copies_done = threading.Condition()
+
+    def delay(self, retry, error):
+        """
+        Seconds to wait before a retry.
+
+        A Retry-After delay from the server is honored, plus up to 10% jitter so
+        that parallel requests do not return at the same instant; otherwise the
+        delay is drawn uniformly up to the exponential backoff ("full jitter").
+
+        Args:
+            retry (int): Number of the retry, starting at 1
+            error (Exception): Error of the failed attempt
+
+        Returns:
+            float: Seconds to wait
+        """
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after * random.uniform(1.0, 1.1))
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def call(self, request, on_discarded=None, on_loser=None):
+        """
+        Make one attempt of a request, hedged if the policy says so.
+
+        Args:
+            request (callable): Sends the request and returns its response
+            on_discarded (callable, optional): Called with the response of a hedged
+                copy that was not used, so that its tokens can be charged. The
+                call is made by settle_discarded, in the thread that calls it.
+            on_loser (callable, optional): Called with the future of the hedged copy
+                that was not used, which may still be running, before the call returns.
+
+        Returns:
+            tuple: (response, whether a hedged copy was sent, whether the copy answered first)
+        """
+        if not self.hedge_after:
+            return request(), False, False
+
+        def track(copy):
+            if on_loser is not None:
+                on_loser(copy)
+            if on_discarded is None:
+                return
+            with self._copies_done:
+                self._running_copies.add(copy)
+            copy.add_done_callback(lambda future: self._copy_done(future, on_discarded))
+
+        return hedged_call(request, self.hedge_after, track)
+
+    def _copy_done(self, future, on_discarded):
+        if not future.cancelled() and future.exception() is None:
+            self._discarded.put((on_discarded, future.result()))
+        with self._copies_done:
+            self._running_copies.discard(future)
+            self._copies_done.notify_all()
+
+    def settle_discarded(self, wait_for_running=False):
+        """
+        Pass the responses of the hedged copies that were not used to their callbacks.
+
+        Args:
+            wait_for_running (bool, optional): Wait for the copies that are still
+                running first, e.g. at the end of a job. Defaults to False.
+        """
+        if wait_for_running:
+            # Futures wake their waiters before running their callbacks, so wait for the callbacks
+            with self._copies_done:
+                self._copies_done.wait_for(lambda: not self._running_copies)
+        while True:
+            try:
+                callback, response = self._discarded.get_nowait()
+            except queue.Empty:
+                return
+            callback(response)
+
+
+def _pool():
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+        return _hedge_pool
+
+
+def hedged_call(request, hedge_after, on_loser=None):
+    """
+    Send a request, and send it again if it has not answered within hedge_after seconds.
+
+    The first copy to succeed is used; the other one is left to finish in the
+    background. If both fail, the error of the copy that failed last is raised.
+
+    Args:
+        request (callable): Sends the request and returns its response
+        hedge_after (float): Seconds to wait before sending the second copy
+        on_loser (callable, optional): Called with the future of the copy that
+            is not used, which may still be running
+
+    Returns:
+        tuple: (response, whether a second copy was sent, whether the second copy answered first)
+    """
+    pool = _pool()
+    # The copies run with the caller's context, so they resolve the settings of its run
+    first = pool.submit(contextvars.copy_context().run, request)
+    done, _ = wait([first], timeout=hedge_after)
+    if done:
+        return first.result(), False, False
+    second = pool.submit(contextvars.copy_context().run, request)
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if on_loser is not None:
+                    on_loser(second if future is first else first)
+                return future.result(), True, future is second
+            error = future.exception()
+    raise error
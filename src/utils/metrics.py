@@ -0,0 +1,351 @@
+"""
+Pipeline metrics.
+
+Stages of a run are wrapped in ``stage(name)``; inside a stage, processors add
+counts (files, rows, findings, ...) with ``add_count`` and the enrichment
+loop records every LLM request with ``record_llm_request``. Each run keeps its
+own record, written to metrics.json when the run finishes, while totals
+across all runs of the process are exposed in the Prometheus text format for
+the API server's /metrics endpoint.
+
+Runs are tracked per thread, so jobs the API server runs in parallel threads
+keep separate records.
+"""
+
+import json
+import time
+import threading
+import contextlib
+from collections import defaultdict
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from src.utils.profiling import is_selected, profile
+
+# Upper bounds in seconds of the LLM request latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_local = threading.local()
+_lock = threading.Lock()
+
+
+class _Totals:
+    """
+    Counters accumulated over every run of the process.
+    """
+
+    def __init__(self):
+        self.stage_seconds = defaultdict(float)
+        self.stage_runs = defaultdict(int)  # (stage, status)
+        self.items = defaultdict(int)  # (stage, kind)
+        self.llm_requests = defaultdict(int)  # outcome
+        self.llm_retries = 0
+        self.llm_tokens = defaultdict(int)  # kind
+        self.llm_hedges = defaultdict(int)  # whether the hedged copy answered first
+        self.llm_latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.llm_latency_sum = 0.0
+        self.llm_latency_count = 0
+        self.runs = defaultdict(int)  # status
+        self.last_run_seconds = None
+
+
+_totals = _Totals()
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of the process so far.
+
+    Returns:
+        int: Bytes, or None where the platform does not report it
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _current_run():
+    return getattr(_local, "run", None)
+
+
+def _current_stage():
+    stack = getattr(_local, "stages", None)
+    return stack[-1] if stack else None
+
+
+def start_run(**info):
+    """
+    Start recording a pipeline run in the current thread.
+
+    Args:
+        **info: Extra fields stored with the run (e.g. project_dir)
+    """
+    # Stages finished before the run started in this thread (e.g. the clone) belong to it
+    pending = getattr(_local, "pending", [])
+    _local.pending = []
+    _local.run = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **info,
+        "stages": pending,
+        "llm": {"requests": 0, "errors": 0, "rate_limited": 0, "retries": 0, "hedged": 0, "hedge_wins": 0,
+                "latency_seconds": {"total": 0.0, "max": 0.0},
+                "tokens": {"prompt": 0, "completion": 0, "cached": 0}},
+    }
+    _local.run_start = time.perf_counter()
+    _local.stages = []
+
+
+def finish_run(status="success"):
+    """
+    Finish the run of the current thread.
+
+    Args:
+        status (str, optional): Outcome of the run. Defaults to "success".
+
+    Returns:
+        dict: Record of the run, or None if no run was started
+    """
+    run = _current_run()
+    if run is None:
+        return None
+    seconds = time.perf_counter() - _local.run_start
+    run["status"] = status
+    run["duration_seconds"] = round(seconds, 3)
+    run["peak_rss_bytes"] = peak_rss_bytes()
+    llm = run["llm"]
+    if llm["requests"]:
+        llm["latency_seconds"]["mean"] = round(llm["latency_seconds"]["total"] / llm["requests"], 3)
+    with _lock:
+        _totals.runs[status] += 1
+        _totals.last_run_seconds = seconds
+    _local.run = None
+    return run
+
+
+@contextlib.contextmanager
+def stage(name):
+    """
+    Time a pipeline stage and collect the counts added while it runs.
+
+    Stages selected for profiling (see src.utils.profiling) also run under
+    cProfile and tracemalloc.
+
+    Args:
+        name (str): Stage name, e.g. "privado_merge"
+
+    Yields:
+        dict: Record of the stage
+    """
+    record = {"name": name, "status": "success", "counts": {}}
+    stack = getattr(_local, "stages", None)
+    if stack is None:
+        stack = _local.stages = []
+    stack.append(record)
+    profiler = profile(name) if is_selected(name) else contextlib.nullcontext()
+    start = time.perf_counter()
+    try:
+        with profiler:
+            yield record
+    except BaseException:
+        record["status"] = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        record["duration_seconds"] = round(seconds, 3)
+        record["peak_rss_bytes"] = peak_rss_bytes()
+        with _lock:
+            _totals.stage_seconds[name] += seconds
+            _totals.stage_runs[(name, record["status"])] += 1
+        run = _current_run()
+        if run is not None:
+            run["stages"].append(record)
+        elif not stack:
+            if not hasattr(_local, "pending"):
+                _local.pending = []
+            _local.pending.append(record)
+
+
+def add_count(kind, value=1):
+    """
+    Add to a count of the stage running in the current thread.
+
+    Args:
+        kind (str): What is counted, e.g. "files", "rows" or "findings"
+        value (int, optional): Amount to add. Defaults to 1.
+    """
+    record = _current_stage()
+    name = record["name"] if record is not None else "none"
+    if record is not None:
+        record["counts"][kind] = record["counts"].get(kind, 0) + value
+    with _lock:
+        _totals.items[(name, kind)] += value
+
+
+def counted(items, kind):
+    """
+    Pass items through while counting them for the current stage.
+
+    Args:
+        items (iterable): Items to pass through
+        kind (str): What is counted
+
+    Yields:
+        object: The items unchanged
+    """
+    count = 0
+    try:
+        for item in items:
+            count += 1
+            yield item
+    finally:
+        add_count(kind, count)
+
+
+def record_llm_request(seconds, outcome="success"):
+    """
+    Record one LLM request.
+
+    Args:
+        seconds (float): Latency of the request
+        outcome (str, optional): "success", "rate_limited" or "error". Defaults to "success".
+    """
+    run = _current_run()
+    if run is not None:
+        llm = run["llm"]
+        llm["requests"] += 1
+        if outcome == "error":
+            llm["errors"] += 1
+        elif outcome == "rate_limited":
+            llm["rate_limited"] += 1
+        latency = llm["latency_seconds"]
+        latency["total"] = round(latency["total"] + seconds, 3)
+        latency["max"] = round(max(latency["max"], seconds), 3)
+    with _lock:
+        _totals.llm_requests[outcome] += 1
+        _totals.llm_latency_sum += seconds
+        _totals.llm_latency_count += 1
+        for position, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                _totals.llm_latency_buckets[position] += 1
+
+
+def record_llm_retry():
+    """
+    Record that an LLM request is retried.
+    """
+    run = _current_run()
+    if run is not None:
+        run["llm"]["retries"] += 1
+    with _lock:
+        _totals.llm_retries += 1
+
+
+def record_llm_hedge(won):
+    """
+    Record that a slow LLM request was sent a second time.
+
+    Args:
+        won (bool): Whether the second copy answered first
+    """
+    run = _current_run()
+    if run is not None:
+        run["llm"]["hedged"] += 1
+        if won:
+            run["llm"]["hedge_wins"] += 1
+    with _lock:
+        _totals.llm_hedges[won] += 1
+
+
+def record_llm_tokens(prompt_tokens, completion_tokens, cached_tokens=0):
+    """
+    Record the token usage of one LLM request.
+
+    Args:
+        prompt_tokens (int): Prompt tokens, including cached ones
+        completion_tokens (int): Completion tokens
+        cached_tokens (int, optional): Prompt tokens served from the provider's prompt cache
+    """
+    usage = {"prompt": prompt_tokens, "completion": completion_tokens, "cached": cached_tokens}
+    run = _current_run()
+    if run is not None:
+        tokens = run["llm"]["tokens"]
+        for kind, count in usage.items():
+            tokens[kind] += count
+    with _lock:
+        for kind, count in usage.items():
+            _totals.llm_tokens[kind] += count
+
+
+def write_metrics(run, file_path):
+    """
+    Write the record of a run as JSON.
+
+    Args:
+        run (dict): Record returned by finish_run
+        file_path (str): Path to metrics.json
+    """
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+def render_prometheus():
+    """
+    Render the process-wide totals in the Prometheus text exposition format.
+
+    Returns:
+        str: Metrics text
+    """
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{labels} {value}")
+
+    with _lock:
+        metric("codeana_runs_total", "counter", "Pipeline runs by outcome.",
+               [("", _labels(status=status), count) for status, count in sorted(_totals.runs.items())])
+        if _totals.last_run_seconds is not None:
+            metric("codeana_last_run_duration_seconds", "gauge", "Duration of the last finished run.",
+                   [("", "", round(_totals.last_run_seconds, 3))])
+        metric("codeana_stage_duration_seconds_total", "counter", "Time spent in each pipeline stage.",
+               [("", _labels(stage=name), round(seconds, 3))
+                for name, seconds in sorted(_totals.stage_seconds.items())])
+        metric("codeana_stage_runs_total", "counter", "Pipeline stage executions by outcome.",
+               [("", _labels(stage=name, status=status), count)
+                for (name, status), count in sorted(_totals.stage_runs.items())])
+        metric("codeana_stage_items_total", "counter", "Files, rows and findings handled by each stage.",
+               [("", _labels(stage=name, kind=kind), count)
+                for (name, kind), count in sorted(_totals.items.items())])
+        metric("codeana_llm_requests_total", "counter", "LLM requests by outcome.",
+               [("", _labels(outcome=outcome), count) for outcome, count in sorted(_totals.llm_requests.items())])
+        metric("codeana_llm_retries_total", "counter", "LLM requests that were retried.",
+               [("", "", _totals.llm_retries)])
+        metric("codeana_llm_hedged_requests_total", "counter",
+               "LLM requests sent a second time, by whether the second copy answered first.",
+               [("", _labels(won=str(won).lower()), count) for won, count in sorted(_totals.llm_hedges.items())])
+        metric("codeana_llm_tokens_total", "counter", "LLM tokens used, by kind.",
+               [("", _labels(kind=kind), count) for kind, count in sorted(_totals.llm_tokens.items())])
+        # Bucket counts are kept cumulative as requests are recorded
+        buckets = [("_bucket", _labels(le=bound), count)
+                   for bound, count in zip(LATENCY_BUCKETS, _totals.llm_latency_buckets)]
+        buckets.append(("_bucket", _labels(le="+Inf"), _totals.llm_latency_count))
+        buckets.append(("_sum", "", round(_totals.llm_latency_sum, 3)))
+        buckets.append(("_count", "", _totals.llm_latency_count))
+        metric("codeana_llm_request_duration_seconds", "histogram", "Latency of LLM requests.", buckets)
+    rss = peak_rss_bytes()
+    if rss is not None:
+        metric("codeana_process_peak_rss_bytes", "gauge", "Peak resident set size of the process.",
+               [("", "", rss)])
+    return "\n".join(lines) + "\n"
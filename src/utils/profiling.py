@@ -0,0 +1,120 @@
+"""
+Opt-in CPU and allocation profiling of pipeline stages.
+
+Stages selected with PROFILE_STAGES (or ``--profile`` on the command line)
+run under cProfile and tracemalloc. For every profiled stage a
+``<stage>.pstats`` file and a ``<stage>_allocations.txt`` report of the top
+allocation sites are written to the profile directory.
+
+When no stage is selected, the only cost is a set lookup per stage.
+"""
+
+import os
+import time
+import cProfile
+import tracemalloc
+import threading
+import contextlib
+
+from src import config
+
+# Allocation sites listed in the allocation report
+TOP_ALLOCATIONS = 25
+
+# Read from PROFILE_STAGES on first use unless configure is called first
+_selected = None
+_output_dir = None
+# cProfile and tracemalloc are process-wide, so only one stage is profiled at a time
+_lock = threading.Lock()
+
+
+def configure(stages=None, output_dir=None):
+    """
+    Select the stages to profile.
+
+    Args:
+        stages (str | iterable, optional): Comma-separated stage names or an
+            iterable of names; "all" profiles every stage. Defaults to PROFILE_STAGES.
+        output_dir (str, optional): Directory for the reports. Defaults to PROFILE_DIR.
+    """
+    global _selected, _output_dir
+    if stages is None:
+        stages = config.PROFILE_STAGES
+    if isinstance(stages, str):
+        stages = stages.split(",")
+    _selected = {name.strip() for name in stages if name.strip()}
+    _output_dir = output_dir
+
+
+def is_selected(name):
+    """
+    Check whether a stage is selected for profiling.
+
+    Args:
+        name (str): Stage name
+
+    Returns:
+        bool: True if the stage should be profiled
+    """
+    if _selected is None:
+        configure()
+    return bool(_selected) and (name in _selected or "all" in _selected)
+
+
+def _write_allocations(snapshot, peak, file_path, name):
+    stats = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ]).statistics("lineno")
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(f"Stage: {name}\n")
+        f.write(f"Peak traced memory: {peak / (1024 * 1024):.1f} MiB\n")
+        f.write(f"Top {TOP_ALLOCATIONS} allocation sites still held at the end of the stage:\n\n")
+        for stat in stats[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}\n")
+
+
+@contextlib.contextmanager
+def profile(name):
+    """
+    Profile the enclosed code under cProfile and tracemalloc and write the reports.
+
+    Stages nested in a stage that is already being profiled are covered by
+    the outer profile and are not profiled separately.
+
+    Args:
+        name (str): Stage name, used for the report file names
+    """
+    if not _lock.acquire(blocking=False):
+        yield
+        return
+    output_dir = _output_dir or config.PROFILE_DIR
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            seconds = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+            stats_file = os.path.join(output_dir, f"{name}.pstats")
+            profiler.dump_stats(stats_file)
+            alloc_file = os.path.join(output_dir, f"{name}_allocations.txt")
+            _write_allocations(snapshot, peak, alloc_file, name)
+            print(f"Profiled stage '{name}' ({seconds:.2f}s): {stats_file}, {alloc_file}")
+            print(f"Inspect with: python -m pstats {stats_file}")
+    finally:
+        _lock.release()
+
@@ -0,0 +1,83 @@
+"""
+Concurrency limits shared by the pipeline processes of a batch.
+
+When several repositories are analyzed at once (see batch_process.py), each
+pipeline runs in its own process. The scanners and the LLM requests of all
+of them take a slot before they start: a slot is an exclusive lock on one of
+N lock files in RESOURCE_LIMITS_DIR, N being SCANNER_CONCURRENCY or
+LLM_CONCURRENCY. The locks are released by the operating system when a
+process dies, so a crashed pipeline never holds a slot. An LLM request holds
+its slot for the whole attempt. A hedged copy of it runs in the same slot and
+the copy that is not used keeps the slot until it finishes, so with hedging
+up to twice LLM_CONCURRENCY requests can be in flight.
+
+Without RESOURCE_LIMITS_DIR (a single pipeline run) taking a slot does nothing.
+"""
+
+import os
+import time
+import random
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from src import config
+
+# Longest pause between two rounds of attempts to take a slot
+MAX_POLL_SECONDS = 0.5
+
+
+def slot_count(kind):
+    """
+    Number of slots of a kind.
+
+    Args:
+        kind (str): "scanner" or "llm"
+
+    Returns:
+        int: Number of slots; 0 for no limit
+    """
+    if kind == "scanner":
+        return config.SCANNER_CONCURRENCY
+    if kind == "llm":
+        return config.LLM_CONCURRENCY
+    raise ValueError(f"Unknown resource kind: {kind}")
+
+
+@contextlib.contextmanager
+def slot(kind):
+    """
+    Hold one slot of a kind for the duration of the block, waiting for a free one.
+
+    Args:
+        kind (str): "scanner" or "llm"
+    """
+    limits_dir = config.RESOURCE_LIMITS_DIR
+    count = slot_count(kind) if limits_dir else 0
+    if count <= 0 or fcntl is None:
+        yield
+        return
+
+    os.makedirs(limits_dir, exist_ok=True)
+    pause = 0.01
+    while True:
+        # Start at a random slot so that waiting processes do not all contend for the first one
+        first = random.randrange(count)
+        for offset in range(count):
+            lock_file = open(os.path.join(limits_dir, f"{kind}.{(first + offset) % count}.lock"), "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                continue
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+            return
+        time.sleep(pause)
+        pause = min(MAX_POLL_SECONDS, pause * 2)
@@ -70,18 +70,9 @@ def run_script(script_name, *args):
         script_dir = os.path.dirname(script_name)
         script_basename = os.path.basename(script_name)
         
-        # Change to the script directory if it's not empty
-        if script_dir:
-            current_dir = os.getcwd()
-            os.chdir(script_dir)
-            try:
-                subprocess.run([f"./{script_basename}"] + list(args), check=True)
-            finally:
-                # Change back to the original directory
-                os.chdir(current_dir)
-        else:
-            # Run the script in the current directory
-            subprocess.run([f"./{script_name}"] + list(args), check=True)
+        # Run the script from its directory without changing the working
+        # directory of the process, which parallel jobs share
+        subprocess.run([f"./{script_basename}"] + list(args), cwd=script_dir or None, check=True)
             
         return True
     except subprocess.CalledProcessError as e:
@@ -0,0 +1,82 @@
+"""
+Token accounting for the LLM enrichment.
+
+Prompts are sized before they are sent at roughly four characters per token,
+which is close enough to decide whether a request still fits a job's budget;
+the budget is then charged with the usage the API reports for the request.
+"""
+
+import math
+
+# Average characters per token of English text and code for the GPT tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text (str): Text to estimate
+
+    Returns:
+        int: Estimated token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class TokenBudget:
+    """
+    Tokens a job may spend on LLM requests, and the tokens it used so far.
+
+    Args:
+        limit (int, optional): Total tokens allowed; 0 or None for no limit
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit or 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+
+    @property
+    def used(self):
+        return self.prompt_tokens + self.completion_tokens
+
+    def allows(self, tokens):
+        """
+        Check whether a request of the given size still fits the budget.
+
+        Args:
+            tokens (int): Tokens the request may use
+
+        Returns:
+            bool: True if the request can be sent
+        """
+        return not self.limit or self.used + tokens <= self.limit
+
+    def charge(self, prompt_tokens, completion_tokens, cached_tokens=0):
+        """
+        Charge the budget with the usage of a request.
+
+        Args:
+            prompt_tokens (int): Prompt tokens, including cached ones
+            completion_tokens (int): Completion tokens
+            cached_tokens (int, optional): Prompt tokens served from the provider's prompt cache
+        """
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_tokens += cached_tokens
+
+    def summary(self):
+        """
+        Describe the tokens used, for the end-of-run report.
+
+        Returns:
+            str: Token usage, and the budget if there is one
+        """
+        text = (f"{self.used} tokens ({self.prompt_tokens} prompt, of which {self.cached_tokens} cached, "
+                f"{self.completion_tokens} completion)")
+        if self.limit:
+            text += f" of a budget of {self.limit}"
+        return text